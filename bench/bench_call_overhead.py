@@ -0,0 +1,68 @@
+"""Per-call overhead: 1e6 calls of near-empty functions and methods"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from nexus.lexer import lexer
+from nexus.parser import Parser
+from nexus.interpreter import Interpreter
+
+CALLS = 1_000_000
+
+PROGRAMS = {
+    "function, 2 args": f'''
+func pick(a, b):
+    return a
+var total = 0
+for i in (0 to {CALLS} by 1):
+    total = pick(i, total)
+say(total)
+''',
+    "method, 1 arg": f'''
+class Box():
+    var v int
+    func init():
+        self.v = 0
+    func get(a):
+        return a
+var box = Box()
+var total = 0
+for i in (0 to {CALLS} by 1):
+    total = box.get(i)
+say(total)
+''',
+}
+
+# The bare loop, subtracted to leave the cost of the calls alone
+BASELINE = f'''
+var total = 0
+for i in (0 to {CALLS} by 1):
+    total = i
+say(total)
+'''
+
+
+def bench(code, tier_threshold, repeat=3):
+    best = None
+    for _ in range(repeat):
+        ast = Parser(lexer(code)).parse()
+        # Not optimized: the inliner would remove the calls being measured
+        interpreter = Interpreter(optimize=False, tier_threshold=tier_threshold)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter.run(ast)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    print(f"{'':18} {'interpreted':>12} {'compiled':>10}   (ns per call)")
+    loop = {tier: bench(BASELINE, tier) for tier in (0, 1)}
+    for name, code in PROGRAMS.items():
+        per_call = [(bench(code, tier) - loop[tier]) / CALLS * 1e9 for tier in (0, 1)]
+        print(f"{name:18} {per_call[0]:12.0f} {per_call[1]:10.0f}")
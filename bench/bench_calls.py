@@ -0,0 +1,48 @@
+"""Helper-heavy call benchmark: plain tree-walking vs. the inlining pass"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from nexus.lexer import lexer
+from nexus.parser import Parser
+from nexus.interpreter import Interpreter
+
+CODE = '''
+func add(a, b):
+    return a + b
+
+func scale(a, k):
+    return a * k
+
+func clamp_low(a):
+    return a % 1000
+
+var total = 0
+for i in (0 to 20000 by 1):
+    total = add(total, clamp_low(scale(i, 3)))
+say(total)
+'''
+
+
+def bench(optimize, repeat=3):
+    best = None
+    for _ in range(repeat):
+        ast = Parser(lexer(CODE)).parse()
+        interpreter = Interpreter(optimize=optimize)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter.run(ast)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    plain = bench(False)
+    inlined = bench(True)
+    print(f"calls:   {plain:.3f}s")
+    print(f"inlined: {inlined:.3f}s  ({plain / inlined:.1f}x)")
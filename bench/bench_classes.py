@@ -0,0 +1,70 @@
+"""Class allocation benchmark: per-instance memory and construction time"""
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from nexus.lexer import lexer
+from nexus.parser import Parser
+from nexus.interpreter import Interpreter
+
+CLASS = '''
+class Particle():
+    var x int
+    var y int
+    var alive bool
+    func init(x, y):
+        self.x = x
+        self.y = y
+        self.alive = True
+    func step(dx):
+        self.x = self.x + dx
+        return self.x
+    func kill():
+        self.alive = False
+    func energy():
+        return self.x * self.x + self.y * self.y
+'''
+
+CODE = CLASS + '''
+var last = 0
+for i in (0 to 20000 by 1):
+    var p = Particle(i, i + 1)
+    last = p.x
+say(last)
+'''
+
+
+def construction_time(repeat=3):
+    best = None
+    for _ in range(repeat):
+        ast = Parser(lexer(CODE)).parse()
+        interpreter = Interpreter(tier_threshold=0)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter.run(ast)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bytes_per_instance(count=20000):
+    interpreter = Interpreter(tier_threshold=0)
+    interpreter.run(Parser(lexer(CLASS)).parse())
+    new = Parser(lexer("var p = Particle(1, 2)")).parse()[0].value
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [interpreter.eval_expr(new) for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(instances)
+
+
+if __name__ == "__main__":
+    print(f"construct 20000: {construction_time():.3f}s")
+    print(f"memory/instance: {bytes_per_instance():.0f} bytes")
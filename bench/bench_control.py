@@ -0,0 +1,55 @@
+"""Control-flow benchmark: loops with continue and early-return functions"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from nexus.lexer import lexer
+from nexus.parser import Parser
+from nexus.interpreter import Interpreter
+
+PROGRAMS = {
+    "continue": '''
+var total = 0
+for i in (0 to 60000 by 1):
+    if i % 3 == 0:
+        continue
+    total = total + i
+say(total)
+''',
+    "early return": '''
+func classify(n):
+    if n % 2 == 0:
+        return 0
+    if n % 3 == 0:
+        return 1
+    return 2
+
+var total = 0
+for i in (0 to 30000 by 1):
+    total = total + classify(i)
+say(total)
+''',
+}
+
+
+def bench(code, tier_threshold, repeat=3):
+    best = None
+    for _ in range(repeat):
+        ast = Parser(lexer(code)).parse()
+        interpreter = Interpreter(tier_threshold=tier_threshold)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter.run(ast)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    print(f"{'program':<14}{'interpreted':>13}{'tiered':>10}")
+    for name, code in PROGRAMS.items():
+        print(f"{name:<14}{bench(code, 0):>12.3f}s{bench(code, 1000):>9.3f}s")
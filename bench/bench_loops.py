@@ -0,0 +1,59 @@
+"""Tight numeric loop benchmark"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from nexus.lexer import lexer
+from nexus.parser import Parser
+from nexus.interpreter import Interpreter
+
+PROGRAMS = {
+    "counted loop, i unused": '''
+var y = 0
+for i in (0 to 200000 by 1):
+    y = 1
+''',
+    "counted loop using i": '''
+var total = 0
+for i in (0 to 100000 by 1):
+    total = total + i
+say(total)
+''',
+    "invariant expression": '''
+var limit = 7
+var config{} = {"threshold": 3}
+var total = 0
+for i in (0 to 50000 by 1):
+    total = total + limit * 2 + config["threshold"]
+say(total)
+''',
+    "float loop": '''
+var total = 0
+for x in (0 to 10000 by 0.1):
+    total = total + 1
+say(total)
+''',
+}
+
+
+def bench(code, optimize=False, repeat=3):
+    best = None
+    for _ in range(repeat):
+        ast = Parser(lexer(code)).parse()
+        interpreter = Interpreter(optimize=optimize)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter.run(ast)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    print(f"{'':24} {'plain':>8} {'optimized':>10}")
+    for name, code in PROGRAMS.items():
+        print(f"{name:24} {bench(code):7.3f}s {bench(code, optimize=True):9.3f}s")
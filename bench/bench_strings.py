@@ -0,0 +1,34 @@
+"""Report-style string building with `s = s + x` in a loop"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from nexus.lexer import lexer
+from nexus.parser import Parser
+from nexus.interpreter import Interpreter
+
+CODE = '''
+var line = "0123456789012345678901234567890123456789012345678"
+var report = ""
+for i in (0 to {n} by 1):
+    report = report + line + "\\n"
+say(report[0])
+'''
+
+
+def bench(n):
+    ast = Parser(lexer(CODE.replace("{n}", str(n)))).parse()
+    interpreter = Interpreter()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter.run(ast)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    for n in (25000, 50000, 100000, 200000):
+        print(f"{n * 50 / 1e6:5.2f} MB  {bench(n):.3f}s")
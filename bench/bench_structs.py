@@ -0,0 +1,63 @@
+"""Struct allocation benchmark: per-instance memory and field access time"""
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from nexus.lexer import lexer
+from nexus.parser import Parser
+from nexus.interpreter import Interpreter
+
+STRUCT = '''
+struct Point():
+    var x int
+    var y int
+    var z int
+'''
+
+CODE = STRUCT + '''
+var total = 0
+for i in (0 to 20000 by 1):
+    var p = Point()
+    p.x = i
+    p.y = p.x + 1
+    total = total + p.y
+say(total)
+'''
+
+
+def access_time(strict, repeat=3):
+    best = None
+    for _ in range(repeat):
+        ast = Parser(lexer(CODE)).parse()
+        interpreter = Interpreter(tier_threshold=0, strict_structs=strict)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter.run(ast)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bytes_per_instance(strict, count=20000):
+    interpreter = Interpreter(tier_threshold=0, strict_structs=strict)
+    interpreter.run(Parser(lexer(STRUCT)).parse())
+    new = Parser(lexer("var p = Point()")).parse()[0].value
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [interpreter.eval_expr(new) for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(instances)
+
+
+if __name__ == "__main__":
+    for strict in (False, True):
+        mode = "strict" if strict else "default"
+        print(f"{mode:<8} memory/instance: {bytes_per_instance(strict):.0f} bytes  "
+              f"build+access 20000: {access_time(strict):.3f}s")
@@ -1,2 +1,21 @@
 __version__ = "0.1.0"
-__all__ = ['lexer', 'Parser', 'Interpreter']
\ No newline at end of file
+__all__ = ['lexer', 'Parser', 'Interpreter', 'Program', 'ProgramCache', 'compile', 'BudgetExceeded']
+
+# Public name -> submodule. Loaded on first use, so tools that only need one
+# submodule (such as the daemon client) don't pay for importing the rest.
+_EXPORTS = {
+    'lexer': 'lexer',
+    'Parser': 'parser',
+    'Interpreter': 'interpreter',
+    'Program': 'program',
+    'ProgramCache': 'program',
+    'compile': 'program',
+    'BudgetExceeded': 'limits',
+}
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(f".{module}", __name__), name)
@@ -0,0 +1,410 @@
+import copy
+import itertools
+import weakref
+
+from .parser import (
+    node_lines, Literal, VarDecl, SayStmt, IfStmt, ForStmt, AskStmt, FuncDecl,
+    FuncCall, ReturnStmt, AssignIndexStmt, ForEachStmt, StructDecl,
+    MemberAssignment, ClassDecl, MethodCall, ClassInstantiation, BinaryOp,
+    ArrayLiteral, DictLiteral, IndexExpr, MemberAccess
+)
+from .optimizer import walk, walk_all
+from .natives import NATIVE_FUNCTIONS, NATIVE_METHODS
+from .output import OutputSink
+from .tiering import numeric_range
+
+
+# Async execution of a program whose ask() answers arrive on an asyncio
+# stream. Only the statements and expressions that can reach an ask()
+# (directly or through a call) run here, all on the event loop; everything
+# else goes straight to the synchronous Interpreter.exec_stmt / eval_expr.
+# A waiting session holds nothing but its suspended coroutine: no thread.
+
+# Statements whose value expression can be computed first and then fed to
+# exec_stmt as a literal
+VALUE_ATTRS = {
+    VarDecl: "value",
+    SayStmt: "expr",
+    ReturnStmt: "expr",
+    AssignIndexStmt: "value",
+    MemberAssignment: "value_expr",
+}
+
+
+def asking_callables(ast):
+    """Names of the functions and methods that can reach an ask().
+
+    Calls are resolved by name only (any method of that name counts), so
+    the result errs on the side of suspending.
+    """
+    funcs, methods = {}, {}
+    for node in walk_all(ast):
+        if isinstance(node, FuncDecl):
+            funcs[node.name] = node.body
+        elif isinstance(node, ClassDecl):
+            for method in node.methods:
+                methods.setdefault(method.name, []).extend(method.body)
+            for field in node.fields:
+                if field.value is not None:
+                    methods.setdefault("init", []).append(field.value)
+
+    asking_funcs, asking_methods = set(), set()
+    changed = True
+    while changed:
+        changed = False
+        for table, asking in ((funcs, asking_funcs), (methods, asking_methods)):
+            for name, body in table.items():
+                if name in asking:
+                    continue
+                for node in walk_all(body):
+                    if isinstance(node, AskStmt) \
+                            or isinstance(node, FuncCall) and node.name in asking_funcs \
+                            or isinstance(node, MethodCall) and node.method_name in asking_methods \
+                            or isinstance(node, ClassInstantiation) and "init" in asking_methods:
+                        asking.add(name)
+                        changed = True
+                        break
+    return asking_funcs, asking_methods
+
+
+class AskAnalysis:
+    """Which nodes of one program can reach an ask(), shared by all its sessions"""
+
+    def __init__(self, ast):
+        self.statements = tuple(ast)
+        self.asking_funcs, self.asking_methods = asking_callables(ast)
+        self._asks = {}  # Node -> whether running it can reach an ask()
+
+    def asks(self, node):
+        """Check whether running a statement or expression can reach an ask()"""
+        asks = self._asks.get(node)
+        if asks is None:
+            if isinstance(node, (FuncDecl, ClassDecl, StructDecl)):
+                asks = False  # Declaring runs nothing
+            else:
+                asks = any(self._asking_node(n) for n in walk(node))
+            self._asks[node] = asks
+        return asks
+
+    def _asking_node(self, node):
+        if isinstance(node, AskStmt):
+            return True
+        if isinstance(node, FuncCall):
+            return node.name in self.asking_funcs
+        if isinstance(node, MethodCall):
+            return node.method_name in self.asking_methods
+        if isinstance(node, ClassInstantiation):
+            return "init" in self.asking_methods
+        return False
+
+
+# First statement of a program -> its AskAnalysis
+_analyses = weakref.WeakKeyDictionary()
+
+
+def analyze(ast):
+    """The AskAnalysis of a program, computed once per program"""
+    if not ast:
+        return AskAnalysis(ast)
+    analysis = _analyses.get(ast[0])
+    if analysis is None or analysis.statements != tuple(ast):
+        analysis = _analyses[ast[0]] = AskAnalysis(ast)
+    return analysis
+
+
+class StreamInput:
+    """Input source answering ask() from an asyncio StreamReader"""
+
+    def __init__(self, reader, prompts=True, encoding="utf-8"):
+        self.reader = reader
+        self.prompts = prompts
+        self.encoding = encoding
+
+    async def read_answer(self, prompt, output):
+        if self.prompts and prompt:
+            output.write(prompt)
+        output.flush()
+        await output.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise EOFError("ask() has no more input to read")
+        return line.decode(self.encoding).rstrip("\r\n")
+
+    def ask(self, prompt, output):
+        # Every asking node is awaited by AsyncRunner; a blocking read here
+        # would stall the event loop and every other session on it
+        raise RuntimeError("ask() reached outside the async runner")
+
+
+class StreamOutput(OutputSink):
+    """Output sink writing encoded text to an asyncio StreamWriter"""
+
+    def __init__(self, writer, buffer_size=None, encoding="utf-8"):
+        super().__init__(self._send, buffer_size)
+        self.writer = writer
+        self.encoding = encoding
+
+    def _send(self, text):
+        self.writer.write(text.encode(self.encoding))
+
+    async def drain(self):
+        drain = getattr(self.writer, "drain", None)
+        if drain is not None:
+            await drain()
+
+
+class AsyncRunner:
+    """Runs a program's statements for Interpreter.run_async"""
+
+    def __init__(self, interp, ast):
+        self.interp = interp
+        self.asks = analyze(ast).asks
+        self._with_values = {}  # Statement -> (copy, literal) for VALUE_ATTRS
+
+    # Statements -----------------------------------------------------------
+
+    async def exec_block(self, stmts, env):
+        for stmt in stmts:
+            status = await self.exec_stmt(stmt, env)
+            if status is not None:
+                return status
+        return None
+
+    async def exec_stmt(self, node, env):
+        interp = self.interp
+        if not self.asks(node):
+            return interp.exec_stmt(node, env)
+
+        if isinstance(node, AskStmt):
+            prompt = await self.eval_expr(node.prompt_expr, env)
+            await interp.input.read_answer(str(prompt), interp.output)
+
+        elif isinstance(node, VarDecl) and isinstance(node.value, AskStmt):
+            guard = interp.decl_guard(node)
+            if guard is not None or env.guards:
+                env.set_guard(node.name, guard)
+            prompt = await self.eval_expr(node.value.prompt_expr, env)
+            answer = await interp.input.read_answer(str(prompt), interp.output)
+            if guard is not None:
+                guard.check(answer)
+            env[node.name] = answer
+
+        elif isinstance(node, IfStmt):
+            if await self.eval_expr(node.condition, env):
+                return await self.exec_block(node.body, env)
+            elif node.else_body:
+                if isinstance(node.else_body, list):
+                    return await self.exec_block(node.else_body, env)
+                return await self.exec_stmt(node.else_body, env)
+
+        elif isinstance(node, ForStmt):
+            if node.infinite:
+                values = itertools.repeat(None)
+            else:
+                start = await self.eval_expr(node.start, env)
+                end = await self.eval_expr(node.end, env)
+                step = await self.eval_expr(node.step, env)
+                values = numeric_range(start, end, step, node.inclusive)
+            return await self.run_loop(node, env, values, None if node.infinite else node.var_name)
+
+        elif isinstance(node, ForEachStmt):
+            iterable = await self.eval_expr(node.iterable_expr, env)
+            if not isinstance(iterable, (dict, list)):
+                raise RuntimeError(f"Cannot iterate over {type(iterable).__name__}")
+            return await self.run_loop(node, env, iterable, node.var_name)
+
+        elif isinstance(node, (FuncCall, MethodCall, ClassInstantiation)):
+            await self.eval_expr(node, env)
+
+        elif isinstance(node, AssignIndexStmt) and node.index is not None:
+            collection, owner = await self.eval_receiver(node.collection, env)
+            index = await self.eval_expr(node.index, env)
+            value = await self.eval_expr(node.value, env)
+            interp.assign_item(node.collection, collection, owner, index, value, env)
+
+        elif isinstance(node, MemberAssignment) and self.asks(node.object_expr):
+            obj = await self.eval_expr(node.object_expr, env)
+            value = await self.eval_expr(node.value_expr, env)
+            interp.set_member(obj, node.member_name, value)
+
+        elif isinstance(node, AssignIndexStmt) and isinstance(node.collection, MemberAccess) \
+                and self.asks(node.collection):
+            value = await self.eval_expr(node.value, env)
+            obj = await self.eval_expr(node.collection.object_expr, env)
+            interp.set_member(obj, node.collection.member_name, value)
+
+        elif type(node) in VALUE_ATTRS:
+            value_expr = getattr(node, VALUE_ATTRS[type(node)])
+            value = await self.eval_expr(value_expr, env)
+            return interp.exec_stmt(self.with_value(node, value), env)
+
+        else:
+            return interp.exec_stmt(node, env)  # Nothing left in it can ask
+
+    def with_value(self, node, value):
+        """A copy of `node` whose value expression is the already computed `value`.
+
+        The copy is reused for every execution of `node`: it is consumed by
+        exec_stmt before anything else gets to run.
+        """
+        entry = self._with_values.get(node)
+        if entry is None:
+            stmt, literal = copy.copy(node), Literal(None)
+            setattr(stmt, VALUE_ATTRS[type(node)], literal)
+            if node in node_lines:
+                node_lines[stmt] = node_lines[node]
+            if node in self.interp._proven:
+                self.interp._proven.add(stmt)
+            entry = self._with_values[node] = (stmt, literal)
+        stmt, literal = entry
+        literal.value = value
+        return stmt
+
+    async def run_loop(self, node, env, values, var):
+        if not getattr(node, 'hoisted', None):
+            return await self.iterate(node, env, values, var)
+        self.interp.eval_hoisted(node, env)
+        try:
+            return await self.iterate(node, env, values, var)
+        finally:
+            self.interp.drop_hoisted(node, env)
+
+    async def iterate(self, node, env, values, var):
+        from .interpreter import BREAK, CONTINUE
+
+        for value in self.interp.meter(values, env):
+            if var is not None:
+                env.vars[var] = value
+            status = await self.exec_block(node.body, env)
+            if status is not None:
+                if status is BREAK:
+                    break
+                if status is not CONTINUE:
+                    return status
+        return None
+
+    # Expressions ----------------------------------------------------------
+
+    async def eval_expr(self, node, env):
+        from .interpreter import ClassInstance
+
+        interp = self.interp
+        if not self.asks(node):
+            return interp.eval_expr(node, env)
+
+        if isinstance(node, FuncCall):
+            func = interp.functions.get(node.name)
+            if func is not None:
+                return await self.call(func, node.args, env)
+            native = NATIVE_FUNCTIONS.get(node.name)
+            if native is None:
+                raise NameError(f"Undefined function '{node.name}'")
+            return interp.call_native(node.name, native,
+                                      [await self.eval_expr(arg, env) for arg in node.args])
+
+        elif isinstance(node, MethodCall):
+            obj, owner = await self.eval_receiver(node.object_expr, env)
+            method_name = node.method_name
+            native = NATIVE_METHODS.get(type(obj))
+            if native is not None:
+                args = [await self.eval_expr(arg, env) for arg in node.args]
+                return interp.call_native_method(node, obj, native, env, owner, args)
+            if not isinstance(obj, ClassInstance):
+                raise TypeError(f"Cannot call method '{method_name}' on {type(obj).__name__}")
+            method = obj.cls.methods.get(method_name)
+            if method is None:
+                raise AttributeError(f"Class '{obj.class_name}' has no method '{method_name}'")
+            return await self.call(method, node.args, env, obj)
+
+        elif isinstance(node, ClassInstantiation) and node.class_name in interp.classes:
+            cls = interp.classes[node.class_name]
+            instance = cls.new()
+            if cls.init is not None:
+                await self.call(cls.init, node.args, env, instance)
+            return instance
+
+        elif isinstance(node, BinaryOp):
+            left = await self.eval_expr(node.left, env) if node.left else None
+            right = await self.eval_expr(node.right, env)
+            return interp.apply_binary(node.op, left, right)
+
+        elif isinstance(node, MemberAccess):
+            return interp.member_value(await self.eval_expr(node.object_expr, env), node.member_name)
+
+        elif isinstance(node, IndexExpr):
+            collection = await self.eval_expr(node.collection, env)
+            index = await self.eval_expr(node.index, env)
+            try:
+                return collection[index]
+            except Exception as e:
+                raise RuntimeError(f"Index error: {e}")
+
+        elif isinstance(node, ArrayLiteral):
+            return [await self.eval_expr(elem, env) for elem in node.elements]
+
+        elif isinstance(node, DictLiteral):
+            result = {}
+            for key_expr, value_expr in node.pairs:
+                key = await self.eval_expr(key_expr, env)
+                result[key] = await self.eval_expr(value_expr, env)
+            return result
+
+        else:
+            return interp.eval_expr(node, env)
+
+    async def eval_receiver(self, target, env):
+        """Interpreter.eval_receiver() for a receiver that may ask()"""
+        if isinstance(target, MemberAccess):
+            owner = await self.eval_expr(target.object_expr, env)
+            return self.interp.member_value(owner, target.member_name), owner
+        return await self.eval_expr(target, env), None
+
+    async def call(self, decl, args, caller_env, obj=None):
+        """Interpreter.call() for a body that may ask()"""
+        interp = self.interp
+        interp.check_arity(decl, len(args))
+        frame = interp.new_frame()
+        try:
+            if obj is not None:
+                frame.vars["self"] = obj
+            for param, arg in zip(decl.params, args):
+                frame.vars[param] = await self.eval_expr(arg, caller_env)
+            return await self.run_body(decl, frame)
+        finally:
+            interp.free_frame(frame)
+
+    async def run_body(self, decl, local_env):
+        from .interpreter import ReturnValue
+
+        interp = self.interp
+        if interp.limits is not None:
+            interp.limits.tick(local_env)
+        depth = interp.depth + 1
+        if depth > interp.max_depth:
+            interp.too_deep()
+        interp.depth = depth
+        try:
+            status = await self.exec_block(decl.body, local_env)
+        finally:
+            interp.depth = depth - 1
+        if status is None:
+            return None
+        if type(status) is ReturnValue:
+            return status.value
+        interp.outside_loop(status.kind)
+
+    async def run(self, ast):
+        from .interpreter import ReturnValue
+
+        interp = self.interp
+        stmt = None
+        try:
+            for stmt in ast:
+                status = await self.exec_stmt(stmt, interp.env)
+                if status is not None:
+                    if type(status) is ReturnValue:
+                        interp.error("'return' used outside of a function",
+                                     hint="'return' only works inside a function or method body")
+                    interp.outside_loop(status.kind)
+        except Exception as e:
+            interp.report_error(e, stmt)
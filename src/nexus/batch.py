@@ -0,0 +1,84 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from pathlib import Path
+
+from .input import InputSource
+from .program import compile
+
+
+# Scripts handed to a worker per round trip: fewer, larger messages keep
+# the pool busy running scripts instead of pickling
+MAX_CHUNK = 16
+
+
+def collect_scripts(paths):
+    """Expand directories (recursively) and files into a sorted list of .nx scripts"""
+    scripts = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            scripts.extend(sorted(str(p) for p in path.rglob("*.nx")))
+        else:
+            scripts.append(str(path))
+    return scripts
+
+
+def run_one(path, options=None, answers=()):
+    """Run one script with its output captured; returns its report entry"""
+    out = StringIO()
+    start = time.perf_counter()
+    entry = {"script": path, "status": "ok"}
+    try:
+        if not path.lower().endswith(".nx"):
+            raise ValueError("Nexus scripts must have .nx extension")
+        with open(path, "r") as f:
+            source = f.read()
+        program = compile(source, **(options or {}))
+        program.run(stdin=InputSource(list(answers), prompts=False), stdout=out)
+    except Exception as e:
+        entry["status"] = "error"
+        entry["error"] = str(e).strip()
+    entry["seconds"] = round(time.perf_counter() - start, 6)
+    entry["output"] = out.getvalue()
+    return entry
+
+
+def _run_chunk(paths, options, answers):
+    return [run_one(path, options, answers) for path in paths]
+
+
+def run_batch(scripts, jobs=None, options=None, answers=()):
+    """Run many scripts, on a pool of `jobs` worker processes when jobs > 1.
+
+    Workers live for the whole batch, so each pays for Python start-up and
+    the nexus imports once. Returns the JSON-ready report.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    jobs = min(jobs, len(scripts)) or 1
+    answers = list(answers)
+    start = time.perf_counter()
+
+    if jobs == 1:
+        results = _run_chunk(scripts, options, answers)
+    else:
+        chunk = max(1, min(MAX_CHUNK, len(scripts) // (jobs * 4)))
+        chunks = [scripts[i:i + chunk] for i in range(0, len(scripts), chunk)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = []
+            for part in pool.map(_run_chunk, chunks, [options] * len(chunks),
+                                 [answers] * len(chunks)):
+                results.extend(part)
+
+    failed = sum(1 for entry in results if entry["status"] != "ok")
+    return {
+        "summary": {
+            "total": len(results),
+            "ok": len(results) - failed,
+            "failed": failed,
+            "workers": jobs,
+            "seconds": round(time.perf_counter() - start, 6),
+        },
+        "scripts": results,
+    }
@@ -1,33 +1,67 @@
 #!/usr/bin/env python3
 import sys
+import json
 import argparse
 from pathlib import Path
-from nexus.lexer import lexer
-from nexus.parser import Parser
-from nexus.interpreter import Interpreter
 
 def validate_file_extension(file_path):
     """Validate the file has .nx extension"""
     if not file_path.lower().endswith('.nx'):
         raise ValueError("Nexus scripts must have .nx extension")
 
-def run_script(file_path):
+def run_script(file_path, optimize=True, tier_threshold=None, trace_tiering=False,
+               strict_structs=False, unchecked=False, unbuffered=False,
+               input_path=None, prompts=True, restore_path=None, snapshot_path=None,
+               max_steps=None, time_limit=None, max_items=None, deep_recursion=False,
+               max_depth=None):
     """Execute a NexusV1 .nx script file"""
+    # Imported here so the other commands start without loading the interpreter
+    from nexus.lexer import lexer
+    from nexus.parser import Parser
+    from nexus.interpreter import Interpreter
+    from nexus.input import InputSource
+    
     try:
         validate_file_extension(file_path)
         
         with open(file_path, 'r') as f:
             code = f.read()
         
+        answers = None
+        if input_path is not None:
+            answers = InputSource.from_file(input_path, prompts)
+        
         tokens = lexer(code)
         parser = Parser(tokens)
         ast = parser.parse()
         
-        interpreter = Interpreter()
+        on_tier_event = None
+        if trace_tiering:
+            on_tier_event = lambda event: print(f"[nexus] {event}", file=sys.stderr)
+        
+        interpreter = Interpreter(
+            optimize=optimize,
+            tier_threshold=tier_threshold,
+            on_tier_event=on_tier_event,
+            strict_structs=strict_structs,
+            unchecked=unchecked,
+            buffer_size=0 if unbuffered else None,
+            input=answers,
+            prompts=prompts,
+            max_steps=max_steps,
+            time_limit=time_limit,
+            max_items=max_items,
+            deep_recursion=deep_recursion,
+            max_depth=max_depth
+        )
+        if restore_path is not None:
+            interpreter.restore(restore_path)
         interpreter.run(ast)
+        if snapshot_path is not None:
+            interpreter.snapshot(snapshot_path, sources=[file_path])
         
-    except FileNotFoundError:
-        print(f"Error: File not found - {file_path}", file=sys.stderr)
+    except FileNotFoundError as e:
+        print(f"Error: File not found - {e.filename or file_path}", file=sys.stderr)
         sys.exit(1)
     except ValueError as e:
         print(f"Error: {str(e)}", file=sys.stderr)
@@ -36,12 +70,232 @@ def run_script(file_path):
         print(f"Error executing script: {str(e)}", file=sys.stderr)
         sys.exit(1)
 
-def main():
+def add_interpreter_options(parser):
+    """Options shared by every command that runs scripts"""
+    parser.add_argument(
+        '--no-optimize',
+        action='store_true',
+        help='skip AST optimizations such as function inlining'
+    )
+    
+    parser.add_argument(
+        '--tier-threshold',
+        type=int,
+        metavar='N',
+        help='compile functions, methods and loops after N executions (0 disables; '
+             'default from NEXUS_TIER_THRESHOLD or 1000)'
+    )
+    
+    parser.add_argument(
+        '--strict-structs',
+        action='store_true',
+        help='only allow assigning fields a struct declares'
+    )
+    
+    parser.add_argument(
+        '--unchecked',
+        action='store_true',
+        help='type-check the script before running and skip runtime type checks '
+             'it proves unnecessary'
+    )
+    
+    parser.add_argument(
+        '--max-steps',
+        type=int,
+        metavar='N',
+        help='stop a script after N loop iterations and calls'
+    )
+    
+    parser.add_argument(
+        '--time-limit',
+        type=float,
+        metavar='SECONDS',
+        help='stop a script that runs longer than SECONDS'
+    )
+    
+    parser.add_argument(
+        '--max-items',
+        type=int,
+        metavar='N',
+        help='stop a script whose arrays and dicts hold more than about N items'
+    )
+    
+    parser.add_argument(
+        '--deep-recursion',
+        action='store_true',
+        help='run calls on an explicit stack so recursion is only limited by --max-depth'
+    )
+    
+    parser.add_argument(
+        '--max-depth',
+        type=int,
+        metavar='N',
+        help='stop a script after N nested function and method calls (default 100000)'
+    )
+
+def interpreter_options(args):
+    """Interpreter keyword arguments for the options above"""
+    return dict(
+        optimize=not args.no_optimize,
+        tier_threshold=args.tier_threshold,
+        strict_structs=args.strict_structs,
+        unchecked=args.unchecked,
+        max_steps=args.max_steps,
+        time_limit=args.time_limit,
+        max_items=args.max_items,
+        deep_recursion=args.deep_recursion,
+        max_depth=args.max_depth
+    )
+
+def run_many(argv):
+    """`nexus run-many`: run a batch of scripts on a pool of worker processes"""
+    from nexus.batch import collect_scripts, run_batch
+    
+    parser = argparse.ArgumentParser(
+        prog='nexus run-many',
+        description='Run many .nx scripts on a pool of warm worker processes '
+                    'and print a JSON report',
+        epilog='Example: nexus run-many scripts/ -j 8 --report report.json'
+    )
+    
+    parser.add_argument(
+        'paths',
+        metavar='PATH',
+        nargs='*',
+        help='.nx scripts, or directories searched recursively for them'
+    )
+    
+    parser.add_argument(
+        '--from',
+        dest='list_file',
+        metavar='FILE',
+        help='read more script paths from FILE, one per line ("-" for stdin)'
+    )
+    
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        metavar='N',
+        help='worker processes (default: one per CPU; 1 runs in this process)'
+    )
+    
+    parser.add_argument(
+        '--report',
+        metavar='FILE',
+        help='write the JSON report to FILE instead of stdout'
+    )
+    
+    parser.add_argument(
+        '--input',
+        metavar='FILE',
+        help='answer ask() in every script with the lines of FILE'
+    )
+    
+    parser.add_argument(
+        '--no-output',
+        action='store_true',
+        help="leave the scripts' captured output out of the report"
+    )
+    
+    add_interpreter_options(parser)
+    args = parser.parse_args(argv)
+    
+    paths = list(args.paths)
+    try:
+        if args.list_file:
+            if args.list_file == '-':
+                paths.extend(line.strip() for line in sys.stdin if line.strip())
+            else:
+                with open(args.list_file, 'r') as f:
+                    paths.extend(line.strip() for line in f if line.strip())
+        answers = []
+        if args.input:
+            with open(args.input, 'r') as f:
+                answers = f.read().splitlines()
+    except FileNotFoundError as e:
+        print(f"Error: File not found - {e.filename}", file=sys.stderr)
+        sys.exit(1)
+    
+    scripts = collect_scripts(paths)
+    if not scripts:
+        parser.error('no scripts to run')
+    
+    report = run_batch(scripts, jobs=args.jobs, options=interpreter_options(args),
+                       answers=answers)
+    if args.no_output:
+        for entry in report['scripts']:
+            del entry['output']
+    
+    text = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, 'w') as f:
+            f.write(text + '\n')
+        summary = report['summary']
+        print(f"{summary['ok']}/{summary['total']} scripts succeeded "
+              f"in {summary['seconds']:.2f}s", file=sys.stderr)
+    else:
+        print(text)
+    sys.exit(1 if report['summary']['failed'] else 0)
+
+def daemon(argv):
+    """`nexus daemon`: serve script runs from a warm process over a Unix socket"""
+    from nexus.client import default_socket_path
+    
+    parser = argparse.ArgumentParser(
+        prog='nexus daemon',
+        description='Keep a warm interpreter process that runs scripts for '
+                    '`nexus client` (or python -m nexus.client)',
+        epilog='Example: nexus daemon & nexus client sample.nx'
+    )
+    
+    parser.add_argument(
+        '--socket',
+        metavar='PATH',
+        help=f'Unix socket to listen on (default: {default_socket_path()})'
+    )
+    
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=256,
+        metavar='N',
+        help='compiled programs to keep between requests (default: 256)'
+    )
+    
+    args = parser.parse_args(argv)
+    
+    from nexus.daemon import serve
+    try:
+        serve(args.socket or default_socket_path(), cache_size=args.cache_size)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def client(argv):
+    """`nexus client`: run a script in the daemon"""
+    from nexus.client import main as client_main
+    sys.exit(client_main(argv))
+
+# Subcommands; anything else is a script to run
+COMMANDS = {
+    'run-many': run_many,
+    'daemon': daemon,
+    'client': client,
+}
+
+def main(argv=None):
     """Main CLI entry point for NexusV1 interpreter"""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+    if argv and argv[0] == 'run':
+        argv = argv[1:]  # `nexus run SCRIPT.nx` is the same as `nexus SCRIPT.nx`
+    
     parser = argparse.ArgumentParser(
         prog='nexus',
         description='NexusV1 Language Interpreter (.nx files)',
-        epilog='Example: nexus sample.nx'
+        epilog='Example: nexus sample.nx (more commands: run-many, daemon, client)'
     )
     
     # Make script argument optional when -v is used
@@ -58,7 +312,46 @@ def main():
         help='show version information'
     )
     
-    args = parser.parse_args()
+    add_interpreter_options(parser)
+    
+    parser.add_argument(
+        '--trace-tiering',
+        action='store_true',
+        help='print a line to stderr whenever code moves to the compiled tier'
+    )
+    
+    parser.add_argument(
+        '-u', '--unbuffered',
+        action='store_true',
+        help='write each say() line immediately instead of in batches'
+    )
+    
+    parser.add_argument(
+        '--input',
+        metavar='FILE',
+        help='answer ask() with the lines of FILE instead of reading the terminal'
+    )
+    
+    parser.add_argument(
+        '--no-prompts',
+        action='store_true',
+        help='do not print ask() prompts'
+    )
+    
+    parser.add_argument(
+        '--save-snapshot',
+        metavar='FILE',
+        help='after the script finishes, save its globals, functions, classes '
+             'and structs to FILE'
+    )
+    
+    parser.add_argument(
+        '--restore',
+        metavar='FILE',
+        help='start from the state saved with --save-snapshot instead of re-running it'
+    )
+    
+    args = parser.parse_args(argv)
     
     if args.version:
         from nexus import __version__
@@ -69,7 +362,24 @@ def main():
         parser.print_help()
         sys.exit(1)
         
-    run_script(args.script)
+    run_script(
+        args.script,
+        optimize=not args.no_optimize,
+        tier_threshold=args.tier_threshold,
+        trace_tiering=args.trace_tiering,
+        strict_structs=args.strict_structs,
+        unchecked=args.unchecked,
+        unbuffered=args.unbuffered,
+        input_path=args.input,
+        prompts=not args.no_prompts,
+        restore_path=args.restore,
+        snapshot_path=args.save_snapshot,
+        max_steps=args.max_steps,
+        time_limit=args.time_limit,
+        max_items=args.max_items,
+        deep_recursion=args.deep_recursion,
+        max_depth=args.max_depth
+    )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+import os
+import sys
+import socket
+import struct
+
+# Thin client for `nexus daemon`. It only imports the standard library:
+# lexing, parsing and running all happen in the warm daemon process.
+#
+# Wire format: frames of a 1-byte kind, a 4-byte big-endian length and a
+# payload. The client opens with a REQUEST frame; the daemon answers with
+# OUTPUT frames, an ASK frame whenever the script needs a line of input
+# (answered by INPUT, or NO_INPUT once stdin is exhausted) and a final EXIT.
+
+REQUEST = b"R"  # JSON: {"script", "cwd", "args"}
+OUTPUT = b"O"   # Text for stdout
+ASK = b"A"      # Script is waiting for an answer
+INPUT = b"I"    # One line of stdin
+NO_INPUT = b"D"  # stdin is exhausted
+EXIT = b"X"     # JSON: {"status", "error"}
+
+_HEADER = struct.Struct(">cI")
+
+
+def default_socket_path():
+    """Socket the daemon listens on: $NEXUS_DAEMON_SOCKET or one per user"""
+    path = os.environ.get("NEXUS_DAEMON_SOCKET")
+    if path:
+        return path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    return os.path.join(runtime_dir, f"nexus-{os.getuid()}.sock")
+
+
+def send_frame(sock, kind, payload=b""):
+    sock.sendall(_HEADER.pack(kind, len(payload)) + payload)
+
+
+def read_frame(stream):
+    """Read one frame from a binary file object; (None, b"") at end of stream"""
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None, b""
+    kind, length = _HEADER.unpack(header)
+    payload = stream.read(length) if length else b""
+    if len(payload) < length:
+        return None, b""
+    return kind, payload
+
+
+def run_remote(script, args=(), socket_path=None, stdin=None, stdout=None, stderr=None):
+    """Have the daemon run `script`, relaying stdin/stdout; returns the exit status"""
+    import json
+
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path or default_socket_path())
+    except OSError as e:
+        sock.close()
+        print(f"Error: cannot reach the nexus daemon ({e}); start it with `nexus daemon`",
+              file=stderr)
+        return 2
+
+    with sock, sock.makefile("rb") as stream:
+        request = {"script": os.path.abspath(script), "cwd": os.getcwd(), "args": list(args)}
+        send_frame(sock, REQUEST, json.dumps(request).encode())
+        while True:
+            kind, payload = read_frame(stream)
+            if kind == OUTPUT:
+                stdout.write(payload.decode())
+            elif kind == ASK:
+                stdout.flush()  # The prompt has to be visible before we block
+                line = stdin.readline()
+                if line:
+                    send_frame(sock, INPUT, line.rstrip("\r\n").encode())
+                else:
+                    send_frame(sock, NO_INPUT)
+            elif kind == EXIT:
+                stdout.flush()
+                result = json.loads(payload)
+                if result.get("error"):
+                    print(f"Error executing script: {result['error']}", file=stderr)
+                return result.get("status", 1)
+            else:
+                print("Error: the nexus daemon closed the connection", file=stderr)
+                return 2
+
+
+def main(argv=None):
+    """`python -m nexus.client [--socket PATH] SCRIPT.nx [OPTIONS]`"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    socket_path = None
+    if len(argv) >= 2 and argv[0] == "--socket":
+        socket_path, argv = argv[1], argv[2:]
+    if not argv or argv[0].startswith("-"):
+        print("usage: nexus-client [--socket PATH] SCRIPT.nx [interpreter options]",
+              file=sys.stderr)
+        return 2
+    return run_remote(argv[0], argv[1:], socket_path)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
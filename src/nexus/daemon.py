@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+
+from .client import (
+    REQUEST, OUTPUT, ASK, INPUT, NO_INPUT, EXIT, send_frame, read_frame
+)
+from .input import InputSource
+from .output import OutputSink
+from .program import ProgramCache
+from .cli import add_interpreter_options, interpreter_options, validate_file_extension
+
+
+# `nexus daemon`: a warm process that compiles and runs scripts for thin
+# clients (see client.py for the wire format). Compiled programs stay in a
+# ProgramCache between requests; each request runs with its own Interpreter.
+
+
+class RemoteInput(InputSource):
+    """ask() answered by the client's stdin, one ASK/INPUT round trip per answer"""
+
+    def __init__(self, conn, stream, prompts=True):
+        super().__init__(None, prompts)
+        self.interactive = False
+        self.conn = conn
+        self.stream = stream
+
+    def ask(self, prompt, output):
+        if self.prompts and prompt:
+            output.write(prompt)
+        output.flush()
+        send_frame(self.conn, ASK)
+        kind, payload = read_frame(self.stream)
+        if kind == INPUT:
+            return payload.decode()
+        if kind == NO_INPUT:
+            raise EOFError("ask() has no more input to read")
+        raise ConnectionError("the client disconnected")
+
+
+def request_parser():
+    """Parser for the options a client passes along with its script"""
+    parser = argparse.ArgumentParser(prog='nexus client', add_help=False)
+    add_interpreter_options(parser)
+    parser.add_argument('-u', '--unbuffered', action='store_true')
+    parser.add_argument('--no-prompts', action='store_true')
+    return parser
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        kind, payload = read_frame(self.rfile)
+        if kind != REQUEST:
+            return
+        try:
+            status, error = self.server.run_request(json.loads(payload), self.request, self.rfile)
+            send_frame(self.request, EXIT, json.dumps({"status": status, "error": error}).encode())
+        except OSError:
+            pass  # Client went away mid-run
+
+
+class NexusDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server running one script per connection"""
+    daemon_threads = True
+
+    def __init__(self, path, cache_size=256):
+        self.cache = ProgramCache(max_entries=cache_size)
+        self.parser = request_parser()
+        super().__init__(path, RequestHandler)
+
+    def run_request(self, request, conn, stream):
+        """Run one client's script; returns (exit status, error message or None)"""
+        path = os.path.join(request.get("cwd", "/"), request["script"])
+        try:
+            args, unknown = self.parser.parse_known_args(request.get("args", []))
+            if unknown:
+                raise ValueError(f"unrecognized arguments: {' '.join(unknown)}")
+            validate_file_extension(path)
+            with open(path, "r") as f:
+                source = f.read()
+            program = self.cache.compile(source, **interpreter_options(args))
+
+            send = lambda text: send_frame(conn, OUTPUT, text.encode())
+            output = OutputSink(send, buffer_size=0 if args.unbuffered else None)
+            program.run(stdin=RemoteInput(conn, stream, not args.no_prompts), stdout=output)
+        except FileNotFoundError:
+            return 1, f"File not found - {path}"
+        except SystemExit:
+            return 2, "invalid options"  # argparse reports bad option values by exiting
+        except Exception as e:
+            return 1, str(e).strip()
+        return 0, None
+
+
+def _terminate(signum, frame):
+    raise SystemExit(0)
+
+
+def serve(path, cache_size=256):
+    """Listen on `path` until interrupted or terminated"""
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)  # Left behind by a daemon that died
+        else:
+            raise RuntimeError(f"a nexus daemon is already listening on {path}")
+        finally:
+            probe.close()
+
+    old_umask = os.umask(0o177)  # Only our user may connect
+    try:
+        server = NexusDaemon(path, cache_size)
+    finally:
+        os.umask(old_umask)
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _terminate)  # Clean up the socket on `kill` too
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
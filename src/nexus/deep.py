@@ -0,0 +1,285 @@
+import itertools
+
+from .parser import (
+    VarDecl, SayStmt, IfStmt, ForStmt, AskStmt, FuncDecl, FuncCall, ReturnStmt,
+    AssignIndexStmt, ForEachStmt, StructDecl, ClassDecl,
+    MethodCall, ClassInstantiation, BinaryOp, ArrayLiteral, DictLiteral,
+    IndexExpr, MemberAccess
+)
+from .optimizer import walk, CALL_TYPES
+from .natives import NATIVE_FUNCTIONS, NATIVE_METHODS
+from .tiering import numeric_range
+from .aio import AsyncRunner, VALUE_ATTRS
+from .interpreter import ClassInstance, ReturnValue, BREAK, CONTINUE, _NODE_FRAMES
+
+
+# Deep recursion: Nexus calls run on an explicit stack instead of Python's.
+# Every statement and expression that can make a call is a generator here;
+# it yields the generator whose result it needs, and run() drives them all
+# from one flat list, so a Nexus call costs no Python frames and recursion
+# is limited only by max_depth. Everything that can't call (most of any
+# program, including whole call-free function bodies) goes straight to the
+# synchronous Interpreter.exec_stmt / eval_expr, tiering included. The rare
+# shapes this runner doesn't unfold (a call in an index being assigned, say)
+# run synchronously too, with a few Python frames per call.
+
+
+class DeepRunner:
+    """Runs a program's statements for Interpreter.execute with deep_recursion"""
+
+    def __init__(self, interp):
+        self.interp = interp
+        self._calls = {}        # Node -> whether running it can make a call
+        self._with_values = {}  # Statement -> (copy, literal) for VALUE_ATTRS
+
+    def calls(self, node):
+        """Check whether running a statement or expression can call a function or method"""
+        calls = self._calls.get(node)
+        if calls is None:
+            if isinstance(node, (FuncDecl, ClassDecl, StructDecl)):
+                calls = False  # Declaring runs nothing
+            else:
+                calls = any(isinstance(n, CALL_TYPES) for n in walk(node))
+            self._calls[node] = calls
+        return calls
+
+    # Same trick as the async runner: feed a computed value to exec_stmt
+    with_value = AsyncRunner.with_value
+
+    def exec_stmt(self, node, env):
+        """Run one statement; returns its completion like Interpreter.exec_stmt"""
+        if not self.calls(node):
+            return self.interp.exec_stmt(node, env)
+        return self.run(self.run_stmt(node, env))
+
+    @staticmethod
+    def run(gen):
+        """Drive `gen` and every generator it yields to completion; returns its result.
+
+        A yielded generator runs until it returns, then its value is sent
+        back to the one that yielded it; an error is thrown into it instead.
+        """
+        stack = []
+        value = error = None
+        while True:
+            try:
+                if error is None:
+                    child = gen.send(value)
+                else:
+                    child = gen.throw(error)
+            except StopIteration as e:
+                if not stack:
+                    return e.value
+                gen, value, error = stack.pop(), e.value, None
+                continue
+            except BaseException as e:
+                if not stack:
+                    raise
+                gen, value, error = stack.pop(), None, e
+                continue
+            stack.append(gen)
+            gen, value, error = child, None, None
+
+    # Statements -----------------------------------------------------------
+
+    def run_block(self, stmts, env):
+        interp = self.interp
+        calls = self.calls
+        for stmt in stmts:
+            if calls(stmt):
+                status = yield self.run_stmt(stmt, env)
+            else:
+                status = interp.exec_stmt(stmt, env)
+            if status is not None:
+                return status
+        return None
+
+    def run_stmt(self, node, env):
+        interp = self.interp
+        if not self.calls(node):
+            return interp.exec_stmt(node, env)
+
+        if isinstance(node, IfStmt):
+            if (yield self.eval_expr(node.condition, env)):
+                return (yield self.run_block(node.body, env))
+            elif node.else_body:
+                if isinstance(node.else_body, list):
+                    return (yield self.run_block(node.else_body, env))
+                return (yield self.run_stmt(node.else_body, env))
+
+        elif isinstance(node, ForStmt):
+            if node.infinite:
+                values = itertools.repeat(None)
+            else:
+                start = yield self.eval_expr(node.start, env)
+                end = yield self.eval_expr(node.end, env)
+                step = yield self.eval_expr(node.step, env)
+                values = numeric_range(start, end, step, node.inclusive)
+            return (yield self.run_loop(node, env, values, None if node.infinite else node.var_name))
+
+        elif isinstance(node, ForEachStmt):
+            iterable = yield self.eval_expr(node.iterable_expr, env)
+            if not isinstance(iterable, (dict, list)):
+                raise RuntimeError(f"Cannot iterate over {type(iterable).__name__}")
+            return (yield self.run_loop(node, env, iterable, node.var_name))
+
+        elif isinstance(node, (FuncCall, MethodCall, ClassInstantiation)):
+            yield self.eval_expr(node, env)
+
+        elif isinstance(node, ReturnStmt):
+            return ReturnValue((yield self.eval_expr(node.expr, env)))
+
+        elif isinstance(node, SayStmt):
+            interp.output.say((yield self.eval_expr(node.expr, env)))
+
+        elif type(node) in VALUE_ATTRS and not (
+                isinstance(node, VarDecl) and isinstance(node.value, AskStmt)
+                or isinstance(node, AssignIndexStmt) and self.calls(node.collection)
+                or isinstance(node, AssignIndexStmt) and node.index is not None
+                and self.calls(node.index)):
+            value_expr = getattr(node, VALUE_ATTRS[type(node)])
+            value = yield self.eval_expr(value_expr, env)
+            return interp.exec_stmt(self.with_value(node, value), env)
+
+        else:
+            return interp.exec_stmt(node, env)
+
+    def run_loop(self, node, env, values, var):
+        interp = self.interp
+        hoisted = getattr(node, 'hoisted', None)
+        if hoisted:
+            interp.eval_hoisted(node, env)
+        try:
+            for value in interp.meter(values, env):
+                if var is not None:
+                    env.vars[var] = value
+                status = yield self.run_block(node.body, env)
+                if status is not None:
+                    if status is BREAK:
+                        break
+                    if status is not CONTINUE:
+                        return status
+            return None
+        finally:
+            if hoisted:
+                interp.drop_hoisted(node, env)
+
+    # Expressions ----------------------------------------------------------
+
+    def eval_expr(self, node, env):
+        interp = self.interp
+        if not self.calls(node):
+            return interp.eval_expr(node, env)
+
+        if isinstance(node, FuncCall):
+            func = interp.functions.get(node.name)
+            if func is not None:
+                return (yield self.call(func, node.args, env, "function"))
+            native = NATIVE_FUNCTIONS.get(node.name)
+            if native is None:
+                raise NameError(f"Undefined function '{node.name}'")
+            return interp.call_native(node.name, native, (yield self.eval_list(node.args, env)))
+
+        elif isinstance(node, MethodCall):
+            target = node.object_expr
+            if isinstance(target, MemberAccess):
+                owner = yield self.eval_expr(target.object_expr, env)
+                obj = interp.member_value(owner, target.member_name)
+            else:
+                owner, obj = None, (yield self.eval_expr(target, env))
+            native = NATIVE_METHODS.get(type(obj))
+            if native is not None:
+                args = yield self.eval_list(node.args, env)
+                return interp.call_native_method(node, obj, native, env, owner, args)
+            if not isinstance(obj, ClassInstance):
+                raise TypeError(f"Cannot call method '{node.method_name}' on {type(obj).__name__}")
+            method = obj.cls.methods.get(node.method_name)
+            if method is None:
+                raise AttributeError(f"Class '{obj.class_name}' has no method '{node.method_name}'")
+            return (yield self.call(method, node.args, env, "method", obj))
+
+        elif isinstance(node, ClassInstantiation) and node.class_name in interp.classes:
+            cls = interp.classes[node.class_name]
+            instance = cls.new()
+            if cls.init is not None:
+                yield self.call(cls.init, node.args, env, "method", instance)
+            return instance
+
+        elif isinstance(node, BinaryOp):
+            left = (yield self.eval_expr(node.left, env)) if node.left else None
+            right = yield self.eval_expr(node.right, env)
+            return interp.apply_binary(node.op, left, right)
+
+        elif isinstance(node, MemberAccess):
+            return interp.member_value((yield self.eval_expr(node.object_expr, env)),
+                                       node.member_name)
+
+        elif isinstance(node, IndexExpr):
+            collection = yield self.eval_expr(node.collection, env)
+            index = yield self.eval_expr(node.index, env)
+            try:
+                return collection[index]
+            except Exception as e:
+                raise RuntimeError(f"Index error: {e}")
+
+        elif isinstance(node, ArrayLiteral):
+            return (yield self.eval_list(node.elements, env))
+
+        elif isinstance(node, DictLiteral):
+            result = {}
+            for key_expr, value_expr in node.pairs:
+                key = yield self.eval_expr(key_expr, env)
+                result[key] = yield self.eval_expr(value_expr, env)
+            return result
+
+        else:
+            return interp.eval_expr(node, env)
+
+    def eval_list(self, exprs, env):
+        values = []
+        for expr in exprs:
+            values.append((yield self.eval_expr(expr, env)))
+        return values
+
+    def call(self, decl, args, caller_env, kind, obj=None):
+        """Interpreter.call() on the explicit stack"""
+        interp = self.interp
+        interp.check_arity(decl, len(args))
+        frame = interp.new_frame()
+        try:
+            if obj is not None:
+                frame.vars["self"] = obj
+            for param, arg in zip(decl.params, args):
+                if self.calls(arg):
+                    frame.vars[param] = yield self.eval_expr(arg, caller_env)
+                else:
+                    frame.vars[param] = interp.eval_expr(arg, caller_env)
+            return (yield self.run_body(decl, frame, kind))
+        finally:
+            interp.free_frame(frame)
+
+    def run_body(self, decl, local_env, kind):
+        interp = self.interp
+        if not any(self.calls(stmt) for stmt in decl.body):
+            return interp.run_body(decl, local_env, kind)  # Can't go any deeper
+
+        if interp.limits is not None:
+            interp.limits.tick(local_env)
+        depth = interp.depth + 1
+        if depth > interp.max_depth:
+            interp.too_deep()
+        interp.depth = depth
+        try:
+            status = yield self.run_block(decl.body, local_env)
+        finally:
+            interp.depth = depth - 1
+        if status is None:
+            return None
+        if type(status) is ReturnValue:
+            return status.value
+        interp.outside_loop(status.kind)
+
+
+# Error lines are found from the `node` of these frames too
+_NODE_FRAMES[DeepRunner.run_stmt.__code__] = True
+_NODE_FRAMES[DeepRunner.eval_expr.__code__] = False
@@ -0,0 +1,39 @@
+import builtins
+
+
+class InputSource:
+    """Where ask() answers come from.
+
+    `answers` is None to read from the terminal with input(), a list of
+    answers, a string holding one answer per line, or a readable stream or
+    file (one answer per line). Prompts are written to the interpreter's
+    output unless `prompts` is False.
+    """
+
+    def __init__(self, answers=None, prompts=True):
+        self.prompts = prompts
+        self.interactive = answers is None
+        if isinstance(answers, str):
+            answers = answers.splitlines()
+        elif answers is not None and hasattr(answers, "read"):
+            # Read the whole stream at once: far cheaper than a readline per ask
+            answers = answers.read().splitlines()
+        self._answers = iter(answers) if answers is not None else None
+
+    @classmethod
+    def from_file(cls, path, prompts=True):
+        with open(path, "r") as f:
+            return cls(f, prompts)
+
+    def ask(self, prompt, output):
+        """Answer one ask(), showing the prompt through the output sink"""
+        output.flush()  # Everything said so far comes before the prompt
+        if self.interactive:
+            return builtins.input(prompt if self.prompts else "")
+
+        if self.prompts and prompt:
+            output.write(prompt)
+        answer = next(self._answers, None)
+        if answer is None:
+            raise EOFError("ask() has no more input to read")
+        return answer
@@ -1,72 +1,329 @@
+import itertools
+import threading
 from platform import node
 from .lexer import lexer
 from .parser import (
-    Parser, Literal, SyntaxErrorWithContext, VarRef, BinaryOp, VarDecl, SayStmt, IfStmt, ForStmt,
+    Parser, line_of, Literal, SyntaxErrorWithContext, VarRef, BinaryOp, VarDecl, SayStmt, IfStmt, ForStmt,
     BreakStmt, ContinueStmt, AskStmt, FuncDecl, FuncCall, ReturnStmt,
     ArrayLiteral, IndexExpr, AssignIndexStmt, ForEachStmt, DictLiteral,
     StructDecl, StructInstantiation, MemberAccess, MemberAssignment,
     ClassDecl, MethodCall, ClassInstantiation, MethodDecl, SelfRef
 )
+from .optimizer import optimize, walk, walk_all, HoistedExpr, CALL_TYPES
+from .quicken import observe, quicken_mode_from_env, QuickeningMismatch
+from .typeguards import guard_for_decl
+from .typecheck import check_types
+from .output import OutputSink
+from .input import InputSource
+from .limits import Limits, DEFAULT_MAX_DEPTH
+from .natives import NATIVE_FUNCTIONS, NATIVE_METHODS, NATIVE_SIZES
+from .tiering import (
+    compile_unit, numeric_range, tier_threshold_from_env, TierEvent
+)
+
+
+# Completion signals for control flow. exec_stmt returns None when a
+# statement completes normally, or one of these to unwind a loop or call.
+class Completion:
+    __slots__ = ("kind",)
 
+    def __init__(self, kind):
+        self.kind = kind
 
-# Custom exceptions for control flow
-class BreakException(Exception):
-    pass
+    def __repr__(self):
+        return f"<{self.kind}>"
 
-class ContinueException(Exception):
-    pass
+BREAK = Completion("break")
+CONTINUE = Completion("continue")
+
+class ReturnValue:
+    """Completion of a `return` statement, carrying the returned value"""
+    __slots__ = ("value",)
 
-class ReturnException(Exception):
     def __init__(self, value):
         self.value = value
 
+# Default value of a struct field declared with a type and no initializer
+TYPE_DEFAULTS = {"int": 0, "float": 0.0, "str": "", "bool": False}
+
 class StructInstance:
-    """Represents an instance of a struct"""
-    def __init__(self, struct_name, fields):
-        self.struct_name = struct_name
-        self.fields = {}
-        # Initialize fields with None or empty collections
-        for field in fields:
-            if field.is_array:
-                self.fields[field.name] = []
-            elif field.is_dict:
-                self.fields[field.name] = {}
-            else:
-                self.fields[field.name] = None
+    """Represents an instance of a struct.
+
+    Every StructDecl generates a slotted subclass (see StructType); this base
+    class holds the field access shared by all of them.
+    """
+    __slots__ = ()
+    struct_type = None  # Set on each generated subclass
+
+    @property
+    def struct_name(self):
+        return self.struct_type.name
+
+    @property
+    def fields(self):
+        """Snapshot of field name -> value (read-only; use set_field to assign)"""
+        fields = {name: slot.__get__(self) for name, slot in self.struct_type.slots.items()}
+        if self._extra:
+            fields.update(self._extra)
+        return fields
+
+    def has_field(self, name):
+        return name in self.struct_type.slots or bool(self._extra) and name in self._extra
+
+    def get_field(self, name, default=None):
+        slot = self.struct_type.slots.get(name)
+        if slot is not None:
+            return slot.__get__(self)  # Fixed offset into the instance
+        if self._extra:
+            return self._extra.get(name, default)
+        return default
+
+    def set_field(self, name, value):
+        struct_type = self.struct_type
+        if struct_type.guards and name in struct_type.guards:
+            struct_type.guards[name].check(value)
+        slot = struct_type.slots.get(name)
+        if slot is not None:
+            slot.__set__(self, value)
+        elif struct_type.strict:
+            raise AttributeError(f"Struct '{struct_type.name}' has no field '{name}' "
+                                 f"(strict structs only allow declared fields)")
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[name] = value
     
+    def __reduce__(self):
+        # Generated types can't be pickled by name: rebuild through the StructType
+        values = tuple(slot.__get__(self) for slot in self.struct_type.slots.values())
+        return _restore_struct_instance, (self.struct_type, values, self._extra)
+
     def __str__(self):
         return f"<struct {self.struct_name} instance>"
 
-class ClassInstance:
-    """Represents an instance of a class"""
-    def __init__(self, class_name, class_decl, interpreter):
-        self.class_name = class_name
-        self.interpreter = interpreter
-        self.fields = {}
-        self.methods = {}
-        
-        # Initialize fields
+
+def _restore_struct_instance(struct_type, values, extra):
+    instance = struct_type.instance_type.__new__(struct_type.instance_type)
+    for slot, value in zip(struct_type.slots.values(), values):
+        slot.__set__(instance, value)
+    if not struct_type.strict:
+        instance._extra = extra
+    return instance
+
+class StructType:
+    """Runtime struct: a generated slotted instance type with a fixed field order.
+
+    In strict mode only declared fields can be assigned; otherwise undeclared
+    fields go into a per-instance dict created on first use. Fields in
+    `unguarded` were proven well-typed statically and get no type guard.
+    """
+    def __init__(self, struct_decl, strict=False, unguarded=()):
+        self.decl = struct_decl
+        self.name = struct_decl.name
+        self.strict = strict
+        self.field_names = tuple(field.name for field in struct_decl.fields)
+        self.guards = {}  # field name -> TypeGuard for typed fields
+        for field in struct_decl.fields:
+            guard = guard_for_decl(field) if field not in unguarded else None
+            if guard is not None:
+                self.guards[field.name] = guard
+
+        # Generate __init__ so a new instance is one call with inline defaults
+        namespace = {}
+        lines = ["def __init__(self):"]
+        for field in struct_decl.fields:
+            lines.append(f"    self.f_{field.name} = {self._default(field, namespace)}")
+        if not strict:
+            lines.append("    self._extra = None")
+        if len(lines) == 1:
+            lines.append("    pass")
+        exec("\n".join(lines), namespace)
+
+        attrs = {
+            "__slots__": tuple(f"f_{name}" for name in self.field_names),
+            "__init__": namespace["__init__"],
+            "struct_type": self,
+        }
+        if strict:
+            attrs["_extra"] = None  # No dict slot: nothing to add fields to
+        else:
+            attrs["__slots__"] += ("_extra",)
+        self.instance_type = type(self.name, (StructInstance,), attrs)
+
+        # Field name -> slot descriptor, which reads and writes at a fixed offset
+        self.slots = {name: self.instance_type.__dict__[f"f_{name}"] for name in self.field_names}
+
+    @staticmethod
+    def _default(field, namespace):
+        """Source for a field's initial value"""
+        if field.is_array:
+            return "[]"
+        if field.is_dict:
+            return "{}"
+        if isinstance(field.value, Literal):
+            value = field.value.value
+        else:
+            value = TYPE_DEFAULTS.get(field.var_type)
+        name = f"_default_{len(namespace)}"
+        namespace[name] = value
+        return name
+
+    def new(self):
+        return self.instance_type()
+
+    def __reduce__(self):
+        unguarded = tuple(f for f in self.decl.fields if f.name not in self.guards)
+        return StructType, (self.decl, self.strict, unguarded)
+
+    def __str__(self):
+        return f"<struct {self.name}>"
+
+# Marks a slot an instance has no value for: a field another instance of
+# the class added by assignment
+class _MissingType:
+    __slots__ = ()
+
+    def __reduce__(self):
+        return "_MISSING"  # Unpickles as this same object
+
+_MISSING = _MissingType()
+
+# Serializes layout changes of classes shared between threads (compiled Programs)
+_layout_lock = threading.Lock()
+
+class ClassObject:
+    """Runtime class: method table and field layout shared by all instances"""
+    def __init__(self, class_decl, unguarded=()):
+        self.decl = class_decl
+        self.name = class_decl.name
+        self.methods = {method.name: method for method in class_decl.methods}
+        self.init = self.methods.get("init")
+
+        # Field name -> slot index. Declared fields come first; assigning an
+        # undeclared field appends a slot for the whole class.
+        self.layout = {}
+        self.defaults = []
+        self.collections = []  # (slot, list or dict) needing a fresh value per instance
+        self.guards = {}       # field name -> TypeGuard for typed fields
         for field in class_decl.fields:
+            guard = guard_for_decl(field) if field not in unguarded else None
+            if guard is not None:
+                self.guards[field.name] = guard
+            slot = self.layout[field.name] = len(self.defaults)
             if field.is_array:
-                self.fields[field.name] = []
+                self.collections.append((slot, list))
             elif field.is_dict:
-                self.fields[field.name] = {}
-            else:
-                self.fields[field.name] = None
-        
-        # Store methods
-        for method in class_decl.methods:
-            self.methods[method.name] = method
+                self.collections.append((slot, dict))
+            self.defaults.append(None)
+
+    def new(self):
+        """Allocate an instance with every declared field at its default"""
+        values = self.defaults[:]
+        for slot, factory in self.collections:
+            values[slot] = factory()
+        return ClassInstance(self, values)
+
+    def add_field(self, name):
+        with _layout_lock:
+            slot = self.layout.get(name)
+            if slot is None:
+                slot = len(self.defaults)
+                self.defaults.append(_MISSING)
+                # Copy on write: other threads may be iterating the layout
+                layout = dict(self.layout)
+                layout[name] = slot
+                self.layout = layout
+        return slot
+
+    def __reduce__(self):
+        unguarded = tuple(f for f in self.decl.fields if f.name not in self.guards)
+        return _restore_class, (self.decl, unguarded, self.layout, self.defaults)
+
+    def __str__(self):
+        return f"<class {self.name}>"
+
+
+def _restore_class(class_decl, unguarded, layout, defaults):
+    cls = ClassObject(class_decl, unguarded)
+    cls.layout, cls.defaults = layout, defaults  # Keeps fields added by assignment
+    return cls
+
+class ClassInstance:
+    """Represents an instance of a class: its class plus one value per slot"""
+    __slots__ = ("cls", "values")
+
+    def __init__(self, cls, values):
+        self.cls = cls
+        self.values = values
+
+    @property
+    def class_name(self):
+        return self.cls.name
+
+    @property
+    def methods(self):
+        return self.cls.methods
+
+    @property
+    def fields(self):
+        """Snapshot of field name -> value (read-only; use set_field to assign)"""
+        values = self.values
+        return {name: values[slot] for name, slot in self.cls.layout.items()
+                if slot < len(values) and values[slot] is not _MISSING}
+
+    def has_field(self, name):
+        slot = self.cls.layout.get(name)
+        return slot is not None and slot < len(self.values) and self.values[slot] is not _MISSING
+
+    def get_field(self, name, default=None):
+        slot = self.cls.layout.get(name)
+        if slot is None or slot >= len(self.values):
+            return default
+        value = self.values[slot]
+        return default if value is _MISSING else value
+
+    def set_field(self, name, value):
+        cls = self.cls
+        if cls.guards and name in cls.guards:
+            cls.guards[name].check(value)
+        slot = cls.layout.get(name)
+        if slot is None:
+            slot = cls.add_field(name)
+        values = self.values
+        if slot >= len(values):
+            values.extend([_MISSING] * (slot + 1 - len(values)))
+        values[slot] = value
+
+
+class StrBuilder:
+    """Pending string built by repeated `s = s + x`, joined when the variable is read"""
+    __slots__ = ("parts",)
+
+    def __init__(self, parts):
+        self.parts = parts
+
+    def build(self):
+        return "".join(self.parts)
+
+    def __str__(self):
+        return self.build()
 
 
 class Env:
+    __slots__ = ("vars", "parent", "guards")
+
     def __init__(self, parent=None):
         self.vars = {}
         self.parent = parent
+        self.guards = None  # name -> TypeGuard for typed bindings, created on demand
 
     def __getitem__(self, key):
         if key in self.vars:
-            return self.vars[key]
+            value = self.vars[key]
+            if type(value) is StrBuilder:
+                # Someone is looking at the string, so it has to exist now
+                value = self.vars[key] = value.build()
+            return value
         elif self.parent:
             return self.parent[key]
         else:
@@ -87,16 +344,102 @@ class Env:
         """Define a variable in this environment"""
         self.vars[key] = value
 
+    def set_guard(self, key, guard):
+        """Attach a type guard to a binding in this environment (None removes it)"""
+        if guard is not None:
+            if self.guards is None:
+                self.guards = {}
+            self.guards[key] = guard
+        elif self.guards:
+            self.guards.pop(key, None)
+
+    def guard_for(self, key):
+        """Type guard of the binding `key` resolves to, if any"""
+        env = self
+        while env is not None:
+            if key in env.vars:
+                return env.guards.get(key) if env.guards else None
+            env = env.parent
+        return None
+
+    def flatten_strings(self):
+        """Join any pending string builders in this environment"""
+        for key, value in self.vars.items():
+            if type(value) is StrBuilder:
+                self.vars[key] = value.build()
+
+    def items(self):
+        """(name, value) pairs defined in this environment, pending strings joined.
+
+        Anything reading `vars` wholesale goes through here: the string
+        builders stored there are an internal detail.
+        """
+        self.flatten_strings()
+        return self.vars.items()
+
+
+# Marks a body whose compilation failed so it is never retried
+_TIER_FAILED = float("-inf")
+
+# Placeholder for "the loop hasn't produced a value yet"
+_NO_VALUE = object()
+
+# Free call frames kept per interpreter; deeper recursion allocates new ones
+MAX_POOLED_FRAMES = 64
+
 
 class Interpreter:
-    def __init__(self):
+    def __init__(self, optimize=False, tier_threshold=None, on_tier_event=None, quicken=None,
+                 strict_structs=False, unchecked=False, output=None, buffer_size=None,
+                 input=None, prompts=True, max_steps=None, time_limit=None, max_items=None,
+                 deep_recursion=False, max_depth=None):
         self.env = Env()          # global environment
+        # Where `say` writes: a file-like object, a callable or None for sys.stdout
+        self.output = output if isinstance(output, OutputSink) else OutputSink(output, buffer_size)
+        # Where ask() answers come from: None for the terminal, answers or a stream
+        self.input = input if isinstance(input, InputSource) else InputSource(input, prompts)
         self.functions = {}       # function name -> FuncDecl node
-        self.var_types = {}       # Store variable type information
-        self.classes = {}         # class name -> ClassDecl node
-        self.structs = {}
+        self.guarded = False      # Set once any typed variable is declared
+        self._guard_cache = {}    # VarDecl node -> its TypeGuard (or None)
+        self.unchecked = unchecked  # Skip guards the static checker proved unnecessary
+        self._proven = set()      # VarDecl nodes (variables and fields) needing no guard
+        self.classes = {}         # class name -> ClassObject
+        self.structs = {}         # struct name -> StructType
+        self._declared = {}       # ClassDecl / StructDecl node -> its ClassObject / StructType
+        self._frames = []         # Free call frames (Envs over the globals), see call()
         self.had_error = False
-        self.current_line = 1    # Track error line
+        self.current_line = None # Line of the last runtime error
+        self.optimize = optimize # Run the AST optimization passes before executing
+        self.strict_structs = strict_structs  # Only declared struct fields are assignable
+        self._loop_var_cache = {} # ForStmt node -> whether its body can see the loop variable
+        self._pure_cache = {}     # Expression node -> whether it is free of calls
+
+        # Self-specializing BinaryOp nodes: True, False or "verify"
+        if quicken is None:
+            quicken = quicken_mode_from_env()
+        self.quicken = quicken
+
+        # Tiered execution: hot bodies get compiled to Python functions
+        if tier_threshold is None:
+            tier_threshold = tier_threshold_from_env()
+        self.tier_threshold = tier_threshold  # 0 disables tiering
+        self.on_tier_event = on_tier_event    # Called with each TierEvent
+        self.tier_events = []
+        self._tier_units = {}     # FuncDecl / MethodDecl / loop node -> compiled unit
+        self._tier_counts = {}    # Same nodes -> executions seen so far
+        self._tier_lock = threading.Lock()  # Serializes _tier_counts updates
+
+        # Nested Nexus calls allowed. Without deep recursion Python's own
+        # recursion limit usually stops the program first; with it, calls
+        # run on an explicit stack (see deep.py) and only this limit applies.
+        self.deep_recursion = deep_recursion
+        self.max_depth = DEFAULT_MAX_DEPTH if max_depth is None else max_depth
+        self.depth = 0
+
+        # Execution budgets (see limits.py); None runs without any counting
+        self.limits = None
+        if max_steps is not None or time_limit is not None or max_items is not None:
+            self.limits = Limits(max_steps, time_limit, max_items)
 
 
     def error(self, message, line=None, hint=None, context=None, error_type=None):
@@ -106,9 +449,10 @@ class Interpreter:
             error_type = SyntaxErrorWithContext
         
         if error_type == SyntaxErrorWithContext:
+            # A missing line is filled in by run() from the traceback
             raise error_type(
                 message,
-                line or self.current_line,
+                line,
                 hint,
                 context
             )
@@ -117,490 +461,930 @@ class Interpreter:
         
     
 
-    def check_type(self, var_name, value):
-        """Check if value matches declared type"""
-        if var_name not in self.var_types:
-            return
-
-        expected_type = self.var_types[var_name]
-        if not expected_type:
-            return
-
-        type_check = {
-            'int': lambda x: isinstance(x, int),
-            'float': lambda x: isinstance(x, (int, float)),
-            'str': lambda x: isinstance(x, str),
-            'bool': lambda x: isinstance(x, bool)
-        }
-
-        if expected_type in type_check and not type_check[expected_type](value):
-            raise TypeError(f"Expected {expected_type}, got {type(value).__name__}")
-
-    def eval_expr(self, node, env=None):
+    def decl_guard(self, node):
+        """Type guard for a VarDecl, built the first time it runs"""
+        guard = self._guard_cache.get(node, _NO_VALUE)
+        if guard is _NO_VALUE:
+            guard = None if node in self._proven else guard_for_decl(node)
+            self._guard_cache[node] = guard
+        if guard is not None:
+            self.guarded = True
+        return guard
+
+    # Caches keyed by AST node. They depend only on the program and the
+    # interpreter options, so every run of a compiled Program shares them
+    # (with the lock its runs on other threads update the tier counts under).
+    SHARED_CACHES = ("_guard_cache", "_proven", "_declared", "_loop_var_cache",
+                     "_pure_cache", "_tier_units", "_tier_counts", "_tier_lock")
+
+    def share_caches(self, other):
+        """Use the per-node caches of `other`, which runs the same program"""
+        for name in self.SHARED_CACHES:
+            setattr(self, name, getattr(other, name))
+
+    def check_write(self, env, var_name, value):
+        """Run the type guard of `var_name` in `env` on a value about to be stored"""
+        if env.guards:
+            guard = env.guards.get(var_name)
+            if guard is not None:
+                guard.check(value)
+
+    def check_item(self, env, var_name, value):
+        """Run the element guard of a typed array or dict on an indexed write"""
+        guard = env.guard_for(var_name)
+        if guard is not None and guard.check_item is not None:
+            guard.check_item(value)
+
+    def eval_receiver(self, target, env):
+        """Evaluate the receiver of an indexed write or method call.
+
+        Returns the value and, when `target` is `obj.field`, the struct or
+        class instance holding it (else None), for item_guard().
+        """
+        if isinstance(target, MemberAccess):
+            owner = self.eval_expr(target.object_expr, env)
+            return self.member_value(owner, target.member_name), owner
+        return self.eval_expr(target, env), None
+
+    def item_guard(self, target, owner, env):
+        """Element check of the typed array or dict variable or field `target`, or None"""
+        if owner is not None:
+            if isinstance(owner, ClassInstance):
+                guard = owner.cls.guards.get(target.member_name)
+            else:
+                guard = owner.struct_type.guards.get(target.member_name)
+        elif isinstance(target, VarRef):
+            guard = env.guard_for(target.name)
+        else:
+            return None
+        return guard.check_item if guard is not None else None
+
+    def assign_item(self, target, collection, owner, index, value, env):
+        """Run `target[index] = value` once the receiver (see eval_receiver()) is evaluated"""
+        if self.guarded:
+            check_item = self.item_guard(target, owner, env)
+            if check_item is not None:
+                check_item(value)
         try:
-            if env is None:
-                env = self.env
+            collection[index] = value
+        except Exception as e:
+            raise RuntimeError(f"Assignment index error: {e}")
+
+    @staticmethod
+    def set_member(obj, name, value):
+        """Run `obj.name = value` on an evaluated object"""
+        if isinstance(obj, (StructInstance, ClassInstance)):
+            # Always allow assignment to any field name, even if not explicitly declared
+            obj.set_field(name, value)
+        else:
+            raise TypeError(f"Cannot assign to member '{name}' on {type(obj).__name__}")
+
+    @staticmethod
+    def member_value(obj, name):
+        """Value of the field `name` of an evaluated object, for `obj.name`"""
+        if isinstance(obj, (StructInstance, ClassInstance)):
+            value = obj.get_field(name, _NO_VALUE)
+            if value is not _NO_VALUE:
+                return value
+            else:
+                obj_type = "Class" if isinstance(obj, ClassInstance) else "Struct"
+                raise AttributeError(f"{obj_type} '{obj.class_name if isinstance(obj, ClassInstance) else obj.struct_name}' has no field '{name}'")
+        else:
+            raise TypeError(f"Cannot access member '{name}' on {type(obj).__name__}")
 
-            if isinstance(node, Literal):
-                return node.value
+    def eval_expr(self, node, env=None):
+        if env is None:
+            env = self.env
 
-            elif isinstance(node, VarRef):
-                if node.name in env:
-                    return env[node.name]
-                else:
-                    raise NameError(f"Undefined variable '{node.name}'")
-            
-            elif isinstance(node, SelfRef):
-                # Handle 'self' keyword - should be in environment when in method context
-                if "self" in env:
-                    return env["self"]
-                else:
-                    raise NameError("'self' used outside of class method")
-            
-            elif isinstance(node, ClassInstantiation):
-                # First attempt: check if class exists
-                if node.class_name in self.classes:
-                    class_decl = self.classes[node.class_name]
-                    instance = ClassInstance(node.class_name, class_decl, self)
-
-                    # Call init method if it exists
-                    if "init" in instance.methods:
-                        init_method = instance.methods["init"]
-                        local_env = Env(parent=self.env)
-
-                        # Add self reference
-                        local_env["self"] = instance
-
-                        # Check number of args
-                        if len(node.args) != len(init_method.params):
-                            raise TypeError(f"init method expects {len(init_method.params)} arguments, got {len(node.args)}")
-                        # Evaluate and bind arguments
-                        for param, arg in zip(init_method.params, node.args):
-                            local_env[param] = self.eval_expr(arg, env)
-
-                        try:
-                            for stmt in init_method.body:
-                                self.exec_stmt(stmt, local_env)
-                        except ReturnException:
-                            pass  # Init usually does not return
-                    return instance
-
-                # Fallback: if no class found, check if a struct exists with that name
-                elif node.class_name in self.structs:
-                    struct_decl = self.structs[node.class_name]
-                    instance = StructInstance(struct_decl.name, struct_decl.fields)
-                    return instance
+        if isinstance(node, Literal):
+            return node.value
 
-                else:
-                    raise NameError(f"Undefined class or struct '{node.class_name}'")
-            
-            elif isinstance(node, MemberAccess):
-                # Handle obj.field access
-                obj = self.eval_expr(node.object_expr, env)
-                if isinstance(obj, (StructInstance, ClassInstance)):
-                    if node.member_name in obj.fields:
-                        return obj.fields[node.member_name]
-                    else:
-                        obj_type = "Class" if isinstance(obj, ClassInstance) else "Struct"
-                        raise AttributeError(f"{obj_type} '{obj.class_name if isinstance(obj, ClassInstance) else obj.struct_name}' has no field '{node.member_name}'")
-                else:
-                    raise TypeError(f"Cannot access member '{node.member_name}' on {type(obj).__name__}")
-            
-            elif isinstance(node, StructInstantiation):
-                if node.struct_name not in self.structs:
-                    raise NameError(f"Undefined struct '{node.struct_name}'")
-                
-                struct_decl = self.structs[node.struct_name]
-                instance = StructInstance(struct_decl.name, struct_decl.fields)
+        elif isinstance(node, VarRef):
+            if node.name in env:
+                return env[node.name]
+            else:
+                raise NameError(f"Undefined variable '{node.name}'")
+        
+        elif isinstance(node, BinaryOp):
+            if type(node) is not BinaryOp:
+                # Quickened: specialized for the operand types seen so far
+                if self.quicken == "verify":
+                    return self.verify_quickened(node, env)
+                return node.quick_eval(self, env)
+
+            left = self.eval_expr(node.left, env) if node.left else None
+            right = self.eval_expr(node.right, env)
+            if self.quicken and node.__dict__.get("quick_budget", 1):
+                observe(node, left, right)
+            return self.apply_binary(node.op, left, right)
+
+        elif isinstance(node, HoistedExpr):
+            # Loop invariant computed before the loop started; if that
+            # failed, evaluate it here so any error surfaces in place
+            if node.slot in env.vars:
+                return env.vars[node.slot]
+            return self.eval_expr(node.expr, env)
+
+        elif isinstance(node, SelfRef):
+            # Handle 'self' keyword - should be in environment when in method context
+            if "self" in env:
+                return env["self"]
+            else:
+                raise NameError("'self' used outside of class method")
+        
+        elif isinstance(node, ClassInstantiation):
+            # First attempt: check if class exists
+            if node.class_name in self.classes:
+                cls = self.classes[node.class_name]
+                instance = cls.new()
+
+                # Call init method if it exists
+                init_method = cls.init
+                if init_method is not None:
+                    self.call(init_method, node.args, env, "method", instance)  # Init usually does not return
                 return instance
 
-            elif isinstance(node, BinaryOp):
-                left = self.eval_expr(node.left, env) if node.left else None
-                right = self.eval_expr(node.right, env)
-                op = node.op
-
-                if op == "+":
-                    # Handle string concatenation with automatic type conversion
-                    if isinstance(left, str) or isinstance(right, str):
-                        return str(left) + str(right)
-                    return left + right
-                elif op == "-":
-                    if left is None:
-                        return -right
-                    else:
-                        return left - right
-                elif op == "*":
-                    return left * right
-                elif op == "/":
-                    return left / right
-                elif op == "%":
-                    return left % right
-                elif op == "==":
-                    return left == right
-                elif op == "!=":
-                    return left != right
-                elif op == "<":
-                    return left < right
-                elif op == "<=":
-                    return left <= right
-                elif op == ">":
-                    return left > right
-                elif op == ">=":
-                    return left >= right
-                elif op == "and":
-                    return left and right
-                elif op == "or":
-                    return left or right
-                elif op == "not":
-                    return not right
-                else:
-                    raise ValueError(f"Unknown operator: {op}")
-
-            elif isinstance(node, ArrayLiteral):
-                # Evaluate each element into a list
-                return [self.eval_expr(elem, env) for elem in node.elements]
-
-            elif isinstance(node, DictLiteral):
-                # Evaluate dictionary literal into a Python dict
-                result = {}
-                for key_expr, value_expr in node.pairs:
-                    key = self.eval_expr(key_expr, env)
-                    value = self.eval_expr(value_expr, env)
-                    result[key] = value
-                return result
-
-            elif isinstance(node, IndexExpr):
-                collection = self.eval_expr(node.collection, env)
-                index = self.eval_expr(node.index, env)
-                try:
-                    return collection[index]
-                except Exception as e:
-                    raise RuntimeError(f"Index error: {e}")
+            # Fallback: if no class found, check if a struct exists with that name
+            elif node.class_name in self.structs:
+                return self.structs[node.class_name].new()
 
-            elif isinstance(node, FuncCall):
-                return self.exec_func_call(node, env)
+            else:
+                raise NameError(f"Undefined class or struct '{node.class_name}'")
+        
+        elif isinstance(node, MemberAccess):
+            # Handle obj.field access
+            return self.member_value(self.eval_expr(node.object_expr, env), node.member_name)
+        
+        elif isinstance(node, StructInstantiation):
+            if node.struct_name not in self.structs:
+                raise NameError(f"Undefined struct '{node.struct_name}'")
             
-            elif isinstance(node, MethodCall):
-                # Handle method calls that return values
-                obj = self.eval_expr(node.object_expr, env)
-                method_name = node.method_name
-                
-                if isinstance(obj, ClassInstance):
-                    if method_name in obj.methods:
-                        method = obj.methods[method_name]
-                        local_env = Env(parent=self.env)
-                        
-                        # Add self reference
-                        local_env["self"] = obj
-                        
-                        # Add arguments
-                        if len(node.args) != len(method.params):
-                            raise TypeError(f"Method '{method_name}' expects {len(method.params)} arguments, got {len(node.args)}")
-                        
-                        for param, arg in zip(method.params, node.args):
-                            local_env[param] = self.eval_expr(arg, env)
-                        
-                        try:
-                            for stmt in method.body:
-                                self.exec_stmt(stmt, local_env)
-                        except ReturnException as ret:
-                            return ret.value
-                        return None
-                    else:
-                        raise AttributeError(f"Class '{obj.class_name}' has no method '{method_name}'")
+            return self.structs[node.struct_name].new()
+
+        elif isinstance(node, ArrayLiteral):
+            # Evaluate each element into a list
+            return [self.eval_expr(elem, env) for elem in node.elements]
+
+        elif isinstance(node, DictLiteral):
+            # Evaluate dictionary literal into a Python dict
+            result = {}
+            for key_expr, value_expr in node.pairs:
+                key = self.eval_expr(key_expr, env)
+                value = self.eval_expr(value_expr, env)
+                result[key] = value
+            return result
+
+        elif isinstance(node, IndexExpr):
+            collection = self.eval_expr(node.collection, env)
+            index = self.eval_expr(node.index, env)
+            try:
+                return collection[index]
+            except Exception as e:
+                raise RuntimeError(f"Index error: {e}")
+
+        elif isinstance(node, FuncCall):
+            return self.exec_func_call(node, env)
+        
+        elif isinstance(node, MethodCall):
+            # Handle method calls that return values
+            obj, owner = self.eval_receiver(node.object_expr, env)
+            method_name = node.method_name
+
+            native = NATIVE_METHODS.get(type(obj))
+            if native is not None:
+                return self.call_native_method(node, obj, native, env, owner)
+            
+            if isinstance(obj, ClassInstance):
+                method = obj.cls.methods.get(method_name)
+                if method is not None:
+                    return self.call(method, node.args, env, "method", obj)
                 else:
-                    raise TypeError(f"Cannot call method '{method_name}' on {type(obj).__name__}")
+                    raise AttributeError(f"Class '{obj.class_name}' has no method '{method_name}'")
+            else:
+                raise TypeError(f"Cannot call method '{method_name}' on {type(obj).__name__}")
 
+        else:
+            raise TypeError(f"Unknown expression node: {node}")
+
+
+    def apply_binary(self, op, left, right):
+        """Apply a binary (or unary, with left None) operator to evaluated operands"""
+        if op == "+":
+            # Handle string concatenation with automatic type conversion
+            if isinstance(left, str) or isinstance(right, str):
+                return str(left) + str(right)
+            return left + right
+        elif op == "-":
+            if left is None:
+                return -right
             else:
-                raise TypeError(f"Unknown expression node: {node}")
-        except SyntaxErrorWithContext:
-            raise
-        except NameError as e:
-            self.error(str(e), hint="Make sure variable exists", error_type=NameError)
-        except TypeError as e:
-            self.error(str(e), hint="Check types", error_type=TypeError)
-        except Exception as e:
-            self.error(
-                f"Error evaluating expression: {str(e)}",
-                getattr(node, 'line_number', None),
-                "This might be a complex expression issue - try breaking it down"
+                return left - right
+        elif op == "*":
+            return left * right
+        elif op == "/":
+            return left / right
+        elif op == "%":
+            return left % right
+        elif op == "==":
+            return left == right
+        elif op == "!=":
+            return left != right
+        elif op == "<":
+            return left < right
+        elif op == "<=":
+            return left <= right
+        elif op == ">":
+            return left > right
+        elif op == ">=":
+            return left >= right
+        elif op == "and":
+            return left and right
+        elif op == "or":
+            return left or right
+        elif op == "not":
+            return not right
+        else:
+            raise ValueError(f"Unknown operator: {op}")
+
+    def verify_quickened(self, node, env):
+        """Evaluate a quickened node both ways and insist they agree"""
+        result = node.quick_eval(self, env)
+        left = self.eval_expr(node.left, env)
+        right = self.eval_expr(node.right, env)
+        expected = self.apply_binary(node.op, left, right)
+        if type(result) is not type(expected) or result != expected:
+            raise QuickeningMismatch(
+                f"{type(node).__name__} gave {result!r} for {left!r} {node.op} {right!r}, "
+                f"generic evaluation gave {expected!r}"
             )
-        
+        return result
 
-    
     def exec_stmt(self, node, env=None):
-        try:
-            if env is None:
-                env = self.env
+        if env is None:
+            env = self.env
+
+        if isinstance(node, ClassDecl):
+            # Build the runtime class once; instances share it
+            cls = self._declared.get(node)
+            if cls is None:
+                cls = self._declared[node] = ClassObject(node, self._proven)
+            self.classes[node.name] = cls
+            if cls.guards:
+                self.guarded = True
         
-            if isinstance(node, ClassDecl):
-                # Store class definition
-                self.classes[node.name] = node
+        elif isinstance(node, StructDecl):
+            # Generate the struct's instance type
+            struct_type = self._declared.get(node)
+            if struct_type is None:
+                struct_type = self._declared[node] = StructType(
+                    node, strict=self.strict_structs, unguarded=self._proven)
+            self.structs[node.name] = struct_type
+            if struct_type.guards:
+                self.guarded = True
+
+        elif isinstance(node, MemberAssignment):
+            # Handle obj.field = value - THIS IS THE KEY FIX
+            obj = self.eval_expr(node.object_expr, env)
+            value = self.eval_expr(node.value_expr, env)
+            self.set_member(obj, node.member_name, value)
+
+        elif isinstance(node, VarDecl):
+            # The declaration (re)defines the binding, type guard included
+            guard = self.decl_guard(node)
+            if guard is not None or env.guards:
+                env.set_guard(node.name, guard)
             
-            elif isinstance(node, StructDecl):
-                # Store struct definition
-                self.structs[node.name] = node
-
-            elif isinstance(node, MemberAssignment):
-                # Handle obj.field = value - THIS IS THE KEY FIX
-                obj = self.eval_expr(node.object_expr, env)
-                value = self.eval_expr(node.value_expr, env)
-                
-                if isinstance(obj, (StructInstance, ClassInstance)):
-                    # Always allow assignment to any field name, even if not explicitly declared
-                    obj.fields[node.member_name] = value
+            if isinstance(node.value, AskStmt):
+                prompt = self.eval_expr(node.value.prompt_expr, env)
+                user_input = self.input.ask(str(prompt), self.output)
+                if guard is not None:
+                    guard.check(user_input)
+                env[node.name] = user_input
+            elif node.value is not None:
+                # Explicitly check for StructInstantiation
+                if isinstance(node.value, StructInstantiation):
+                    if node.value.struct_name not in self.structs:
+                        raise NameError(f"Undefined struct '{node.value.struct_name}'")
+                    value = self.eval_expr(node.value, env)
                 else:
-                    raise TypeError(f"Cannot assign to member '{node.member_name}' on {type(obj).__name__}")
-
-            elif isinstance(node, VarDecl):
-                # Store type information if it exists
-                if hasattr(node, 'var_type') and node.var_type:
-                    self.var_types[node.name] = node.var_type
+                    value = self.eval_expr(node.value, env)
                 
-                if isinstance(node.value, AskStmt):
-                    prompt = self.eval_expr(node.value.prompt_expr, env)
-                    user_input = input(str(prompt))
-                    self.check_type(node.name, user_input)
-                    env[node.name] = user_input
-                elif node.value is not None:
-                    # Explicitly check for StructInstantiation
-                    if isinstance(node.value, StructInstantiation):
-                        if node.value.struct_name not in self.structs:
-                            raise NameError(f"Undefined struct '{node.value.struct_name}'")
-                        value = self.eval_expr(node.value, env)
-                    else:
-                        value = self.eval_expr(node.value, env)
-                    
-                    self.check_type(node.name, value)
-                    env[node.name] = value
+                if guard is not None:
+                    guard.check(value)
+                env[node.name] = value
+            else:
+                # Handle empty declarations
+                if hasattr(node, 'is_array') and node.is_array:
+                    env[node.name] = []
+                elif hasattr(node, 'is_dict') and node.is_dict:
+                    env[node.name] = {}
                 else:
-                    # Handle empty declarations
-                    if hasattr(node, 'is_array') and node.is_array:
-                        env[node.name] = []
-                    elif hasattr(node, 'is_dict') and node.is_dict:
-                        env[node.name] = {}
-                    else:
-                        env[node.name] = None
-
-            elif isinstance(node, AssignIndexStmt):
-                if node.index is None:
-                    # Simple variable assignment: var = value
-                    value = self.eval_expr(node.value, env)
-                    if isinstance(node.collection, VarRef):
-                        var_name = node.collection.name
-                        
-                        # Check if we're in a class method context and trying to assign to a field
-                        if "self" in env and isinstance(env["self"], ClassInstance):
-                            self_instance = env["self"]
-                            # If this variable name matches a field in the class, assign to the field instead
-                            if var_name in self_instance.fields:
-                                self_instance.fields[var_name] = value
-                                return
-                        
-                        self.check_type(var_name, value)  # Check type on assignment
-                        
-                        # SIMPLE FIX: If variable exists in global scope, update it there
-                        if var_name in self.env and env != self.env:
-                            self.env[var_name] = value
-                        else:
-                            env[var_name] = value
-                    elif isinstance(node.collection, MemberAccess):
-                        # Handle member assignment like self.name = value when parsed as AssignIndexStmt
-                        obj = self.eval_expr(node.collection.object_expr, env)
-                        if isinstance(obj, (StructInstance, ClassInstance)):
-                            obj.fields[node.collection.member_name] = value
-                        else:
-                            raise TypeError(f"Cannot assign to member '{node.collection.member_name}' on {type(obj).__name__}")
-                    else:
-                        raise RuntimeError("Invalid assignment target")
+                    env[node.name] = None
+
+        elif isinstance(node, AssignIndexStmt):
+            if node.index is None:
+                # Accumulator pattern `s = s + x` on a string: append in place
+                if isinstance(node.value, BinaryOp) and node.value.op == "+" \
+                        and isinstance(node.collection, VarRef) \
+                        and self.append_string(node.collection.name, node.value, env):
+                    return
+
+                # Simple variable assignment: var = value
+                value = self.eval_expr(node.value, env)
+                if isinstance(node.collection, VarRef):
+                    var_name = node.collection.name
+                    
+                    # Check if we're in a class method context and trying to assign to a field
+                    if "self" in env and isinstance(env["self"], ClassInstance):
+                        self_instance = env["self"]
+                        # If this variable name matches a field in the class, assign to the field instead
+                        if self_instance.has_field(var_name):
+                            self_instance.set_field(var_name, value)
+                            return
+
+                    # SIMPLE FIX: If variable exists in global scope, update it there
+                    owner = self.env if var_name in self.env and env != self.env else env
+                    if self.guarded:
+                        self.check_write(owner, var_name, value)  # Check type on assignment
+                    owner[var_name] = value
+                elif isinstance(node.collection, MemberAccess):
+                    # Handle member assignment like self.name = value when parsed as AssignIndexStmt
+                    obj = self.eval_expr(node.collection.object_expr, env)
+                    self.set_member(obj, node.collection.member_name, value)
                 else:
-                    # Array/Dictionary index assignment: collection[index] = value
-                    collection = self.eval_expr(node.collection, env)
-                    index = self.eval_expr(node.index, env)
-                    value = self.eval_expr(node.value, env)
-                    try:
-                        collection[index] = value
-                    except Exception as e:
-                        raise RuntimeError(f"Assignment index error: {e}")
-            
-            elif isinstance(node, MethodCall):
-                # Handle method calls like obj.method(args) - when used as statements
-                self.eval_expr(node, env)  # Use the eval_expr version
+                    raise RuntimeError("Invalid assignment target")
+            else:
+                # Array/Dictionary index assignment: collection[index] = value
+                collection, owner = self.eval_receiver(node.collection, env)
+                index = self.eval_expr(node.index, env)
+                value = self.eval_expr(node.value, env)
+                self.assign_item(node.collection, collection, owner, index, value, env)
+        
+        elif isinstance(node, MethodCall):
+            # Handle method calls like obj.method(args) - when used as statements
+            self.eval_expr(node, env)  # Use the eval_expr version
 
-            elif isinstance(node, ClassInstantiation):
-                # Handle class instantiation as a statement (shouldn't normally happen)
-                return self.eval_expr(node, env)
-                    
-            elif isinstance(node, SayStmt):
-                result = self.eval_expr(node.expr, env)
-                print(result)
-
-            elif isinstance(node, IfStmt):
-                if self.eval_expr(node.condition, env):
-                    for stmt in node.body:
-                        self.exec_stmt(stmt, env)
-                elif node.else_body:
-                    if isinstance(node.else_body, list):
-                        for stmt in node.else_body:
-                            self.exec_stmt(stmt, env)
-                    else:
-                        self.exec_stmt(node.else_body, env)
-
-            elif isinstance(node, ForEachStmt):
-                iterable = self.eval_expr(node.iterable_expr, env)
+        elif isinstance(node, ClassInstantiation):
+            # Handle class instantiation as a statement (shouldn't normally happen)
+            self.eval_expr(node, env)
                 
-                # Handle dictionary iteration (iterate over keys)
-                if isinstance(iterable, dict):
-                    for key in iterable:
-                        env[node.var_name] = key
-                        try:
-                            for stmt in node.body:
-                                self.exec_stmt(stmt, env)
-                        except BreakException:
-                            break
-                        except ContinueException:
-                            continue
-                # Handle list/array iteration
-                elif isinstance(iterable, list):
-                    for item in iterable:
-                        env[node.var_name] = item
-                        try:
-                            for stmt in node.body:
-                                self.exec_stmt(stmt, env)
-                        except BreakException:
-                            break
-                        except ContinueException:
-                            continue
+        elif isinstance(node, SayStmt):
+            self.output.say(self.eval_expr(node.expr, env))
+
+        elif isinstance(node, IfStmt):
+            if self.eval_expr(node.condition, env):
+                return self.exec_block(node.body, env)
+            elif node.else_body:
+                if isinstance(node.else_body, list):
+                    return self.exec_block(node.else_body, env)
                 else:
-                    raise RuntimeError(f"Cannot iterate over {type(iterable).__name__}")
+                    return self.exec_stmt(node.else_body, env)
 
-            elif isinstance(node, ForStmt):
-                self.exec_for(node, env)
+        elif isinstance(node, ForEachStmt):
+            iterable = self.eval_expr(node.iterable_expr, env)
 
-            elif isinstance(node, BreakStmt):
-                raise BreakException()
+            # Dictionaries iterate over their keys
+            if not isinstance(iterable, (dict, list)):
+                raise RuntimeError(f"Cannot iterate over {type(iterable).__name__}")
+            return self.run_loop(node, env, iterable, node.var_name)
 
-            elif isinstance(node, ContinueStmt):
-                raise ContinueException()
+        elif isinstance(node, ForStmt):
+            return self.exec_for(node, env)
 
-            elif isinstance(node, AskStmt):
-                prompt = self.eval_expr(node.prompt_expr, env)
-                return input(str(prompt))
+        elif isinstance(node, BreakStmt):
+            return BREAK
 
-            elif isinstance(node, FuncDecl):
-                # Store function globally (only top-level supported)
-                self.functions[node.name] = node
+        elif isinstance(node, ContinueStmt):
+            return CONTINUE
 
-            elif isinstance(node, FuncCall):
-                # Call function and return its value
-                return self.exec_func_call(node, env)
+        elif isinstance(node, AskStmt):
+            prompt = self.eval_expr(node.prompt_expr, env)
+            self.input.ask(str(prompt), self.output)
 
-            elif isinstance(node, ReturnStmt):
-                value = self.eval_expr(node.expr, env) if node.expr else None
-                raise ReturnException(value)
+        elif isinstance(node, FuncDecl):
+            # Store function globally (only top-level supported)
+            self.functions[node.name] = node
 
-            else:
-                raise TypeError(f"Unknown statement node: {node}")
-        except (BreakException, ContinueException, ReturnException):
-            raise  # Re-raise control flow exceptions unchanged
-        except SyntaxErrorWithContext:
-            raise  # Re-raise parser errors unchanged - DON'T convert these
-        except NameError as e:
-            raise NameError(str(e))  # Don't use self.error() here
-        except TypeError as e:
-            raise TypeError(str(e))   # Don't use self.error() here
-        except Exception as e:
-            # Only use self.error for truly unexpected errors
-            print(f"DEBUG: Unexpected error in exec_stmt: {type(e).__name__}: {e}")
-            raise RuntimeError(f"Unexpected error: {str(e)}")
-        
+        elif isinstance(node, FuncCall):
+            # Call function, discarding its value
+            self.exec_func_call(node, env)
+
+        elif isinstance(node, ReturnStmt):
+            value = self.eval_expr(node.expr, env) if node.expr else None
+            return ReturnValue(value)
+
+        else:
+            raise TypeError(f"Unknown statement node: {node}")
+
+
+    def exec_block(self, stmts, env):
+        """Run statements in order, stopping at the first break/continue/return"""
+        exec_stmt = self.exec_stmt
+        for stmt in stmts:
+            status = exec_stmt(stmt, env)
+            if status is not None:
+                return status
+        return None
+
+    def append_string(self, var_name, value_expr, env):
+        """Run `s = s + a + b ...` on a string by appending to a StrBuilder.
+
+        Returns False when the statement doesn't fit the pattern and must take
+        the normal assignment path.
+        """
+        # Collect the right-hand operands along the left spine of the '+' chain
+        pieces = []
+        left = value_expr
+        while isinstance(left, BinaryOp) and left.op == "+":
+            pieces.append(left.right)
+            left = left.left
+        if not isinstance(left, VarRef) or left.name != var_name:
+            return False
+
+        # Mirror the assignment rules: existing globals are updated from any scope
+        owner = self.env if var_name in self.env.vars else env
+        if var_name not in owner.vars or (owner is not env and var_name in env.vars):
+            return False  # Read and write would hit different variables
+        if "self" in env and isinstance(env["self"], ClassInstance) and env["self"].has_field(var_name):
+            return False  # Bare name assigns to a field of self
+        if self.guarded:
+            guard = owner.guards.get(var_name) if owner.guards else None
+            if guard is not None and (guard.container or guard.type_name != "str"):
+                return False
+
+        current = owner.vars[var_name]
+        if type(current) is not StrBuilder and type(current) is not str:
+            return False
+
+        # Evaluating a call could read or rebind the variable mid-append
+        pure = self._pure_cache.get(value_expr)
+        if pure is None:
+            pure = self._pure_cache[value_expr] = not any(
+                isinstance(n, CALL_TYPES) for n in walk(value_expr))
+        if not pure:
+            return False
+
+        # Once the left side is a string every '+' is a concatenation. A piece
+        # reading the variable itself (`s = s + s`) joins the builder and
+        # stores the string, so look the value up again afterwards.
+        pieces = [str(self.eval_expr(piece, env)) for piece in reversed(pieces)]
+        current = owner.vars[var_name]
+        if type(current) is StrBuilder:
+            current.parts.extend(pieces)
+        else:
+            owner.vars[var_name] = StrBuilder([current] + pieces)
+        return True
 
     def exec_func_call(self, node, caller_env=None):
         if caller_env is None:
             caller_env = self.env
 
-        if node.name not in self.functions:
-            raise NameError(f"Undefined function '{node.name}'")
-        
-        func = self.functions[node.name]
-        local_env = Env(parent=self.env)
-
-        # Set parameters
-        for param, arg in zip(func.params, node.args):
-            local_env[param] = self.eval_expr(arg, caller_env)
-
-        # Execute function body
+        func = self.functions.get(node.name)
+        if func is None:
+            # Declared functions shadow the builtins
+            native = NATIVE_FUNCTIONS.get(node.name)
+            if native is None:
+                raise NameError(f"Undefined function '{node.name}'")
+            return self.call_native(node.name, native,
+                                    [self.eval_expr(arg, caller_env) for arg in node.args])
+
+        return self.call(func, node.args, caller_env, "function")
+
+    def call_native(self, name, native, args):
+        """Call a builtin function with evaluated arguments, within the item budget"""
+        if self.limits is not None:
+            size = NATIVE_SIZES.get(name)
+            if size is not None:
+                self.limits.reserve(name, size(*args))
+        return native(*args)
+
+    def call(self, decl, args, caller_env, kind, obj=None):
+        """Call a function, method or init: bind `args` by position and run the body.
+
+        Frames are Envs over the globals recycled through a free list; one
+        never outlives its call, as Nexus functions don't capture scopes.
+        """
+        params = decl.params
+        if len(args) != len(params):
+            self.check_arity(decl, len(args))
+        frame = self.new_frame()
+        vars = frame.vars
         try:
-            for stmt in func.body:
-                self.exec_stmt(stmt, local_env)
-            return None  # Default return if no return statement
-        except ReturnException as ret:
-            return ret.value  # Return the value from return statement
+            if obj is not None:
+                vars["self"] = obj
+            eval_expr = self.eval_expr
+            for param, arg in zip(params, args):
+                vars[param] = eval_expr(arg, caller_env)
+            return self.run_body(decl, frame, kind)
+        finally:
+            self.free_frame(frame)
+
+    def new_frame(self):
+        """A cleared call frame from the free list, or a new one"""
+        frames = self._frames
+        return frames.pop() if frames else Env(self.env)
+
+    def free_frame(self, frame):
+        """Return a frame whose call has finished to the free list"""
+        frame.vars.clear()
+        frame.guards = None
+        if len(self._frames) < MAX_POOLED_FRAMES:
+            self._frames.append(frame)
+
+    def call_native_method(self, node, obj, native, env, owner=None, args=None):
+        """Run an array or dict method from natives.NATIVE_METHODS on `obj`.
+
+        `owner` is the instance `obj` is a field of, as from eval_receiver().
+        `args` are the already evaluated arguments, if the caller has them.
+        """
+        kind, methods = native
+        entry = methods.get(node.method_name)
+        if entry is None:
+            raise AttributeError(f"{kind} has no method '{node.method_name}'")
+        fn, fewest, most, item = entry
+        if args is None:
+            args = [self.eval_expr(arg, env) for arg in node.args]
+        if not fewest <= len(args) <= most:
+            expected = fewest if fewest == most else f"{fewest} to {most}"
+            raise TypeError(f"{kind} method '{node.method_name}' expects {expected} "
+                            f"arguments, got {len(args)}")
+        if item is not None and self.guarded:
+            check_item = self.item_guard(node.object_expr, owner, env)
+            if check_item is not None:
+                check_item(args[item])
+        return fn(obj, *args)
+
+    @staticmethod
+    def check_arity(decl, count):
+        """Raise the error for calling `decl` with `count` arguments, if they don't match"""
+        expected = len(decl.params)
+        if count == expected:
+            return
+        if isinstance(decl, FuncDecl):
+            callee = f"Function '{decl.name}'"
+        elif decl.is_init:
+            callee = "init method"
+        else:
+            callee = f"Method '{decl.name}'"
+        raise TypeError(f"{callee} expects {expected} arguments, got {count}")
+
+    def eval_hoisted(self, loop, env):
+        """Evaluate a loop's hoisted invariants into their slots"""
+        for slot, expr in loop.hoisted.items():
+            try:
+                env.define(slot, self.eval_expr(expr, env))
+            except Exception:
+                # Leave it to the loop body, which may never reach it
+                env.vars.pop(slot, None)
+
+    def drop_hoisted(self, loop, env):
+        """Remove a loop's hoisted slots once it has finished"""
+        vars = env.vars
+        for slot in loop.hoisted:
+            vars.pop(slot, None)
 
     def exec_for(self, node: ForStmt, env):
         if node.infinite:
-            while True:
-                try:
-                    for stmt in node.body:
-                        self.exec_stmt(stmt, env)
-                except BreakException:
-                    break
-                except ContinueException:
-                    continue
+            return self.run_loop(node, env, itertools.repeat(None), None, write_var=False)
         else:
             start = self.eval_expr(node.start, env)
             end = self.eval_expr(node.end, env)
             step = self.eval_expr(node.step, env)
-            var = node.var_name
-
-            if step == 0:
-                raise ValueError("Step cannot be zero in for loop.")
+            values = numeric_range(start, end, step, node.inclusive)
+
+            # If nothing in the body can see the loop variable, only its
+            # final value needs to land in the environment
+            return self.run_loop(node, env, values, node.var_name,
+                                 write_var=self._loop_var_observed(node))
+
+    def run_loop(self, node, env, values, var, write_var=True):
+        """Run a loop body once per value, switching to compiled code once hot.
+
+        Returns None, or the ReturnValue of a `return` inside the body.
+        Hoisted invariants only exist while the loop runs.
+        """
+        if not getattr(node, 'hoisted', None):
+            return self.iterate(node, env, values, var, write_var)
+        self.eval_hoisted(node, env)
+        try:
+            return self.iterate(node, env, values, var, write_var)
+        finally:
+            self.drop_hoisted(node, env)
+
+    def iterate(self, node, env, values, var, write_var):
+        body = node.body
+        exec_stmt = self.exec_stmt
+        if self.limits is not None:
+            values = self.limits.meter(values, env)
+        unit = self._tier_units.get(node)
+        budget = 0 if unit is not None else self._tier_budget(node)
+        initial_budget = budget
+        last = _NO_VALUE
+
+        for value in values:
+            if write_var:
+                env.vars[var] = value
+            else:
+                last = value
 
-            def loop_condition(i):
-                if step > 0:
-                    return i <= end if node.inclusive else i < end
+            if unit is not None:
+                status = unit(self, env)
+            else:
+                for stmt in body:
+                    status = exec_stmt(stmt, env)
+                    if status is not None:
+                        break
                 else:
-                    return i >= end if node.inclusive else i > end
-
-            i = start
-            while loop_condition(i):
-                env[var] = i
-                try:
-                    for stmt in node.body:
-                        self.exec_stmt(stmt, env)
-                except BreakException:
+                    status = None
+
+            if status is not None:
+                if status is BREAK:
                     break
-                except ContinueException:
-                    pass  # Just continue to the increment
-                i += step
+                if status is not CONTINUE:
+                    self._save_tier_count(node, initial_budget, budget)
+                    return status  # `return` leaves the loop and the call
+
+            if unit is not None:
+                continue
+
+            if budget:
+                budget -= 1
+                if not budget:
+                    with self._tier_lock:
+                        self._tier_counts[node] = self.tier_threshold
+                    unit = self.tier_up(node, "loop", env)
+
+        if var is not None and last is not _NO_VALUE:
+            env.vars[var] = last
+        self._save_tier_count(node, initial_budget, budget)
+        return None
+
+    def meter(self, values, env):
+        """`values`, counted against the step budget when there is one"""
+        if self.limits is None:
+            return values
+        return self.limits.meter(values, env)
+
+    def _save_tier_count(self, node, initial_budget, budget):
+        if initial_budget and budget:
+            self.count_executions(node, initial_budget - budget)
+
+    def count_executions(self, node, n):
+        """Add `n` executions to the tier count of `node` and return the new count"""
+        with self._tier_lock:
+            count = self._tier_counts.get(node, 0) + n
+            self._tier_counts[node] = count
+        return count
+
+    def run_body(self, decl, local_env, kind):
+        """Run a function or method body and return its return value"""
+        if self.limits is not None:
+            self.limits.tick(local_env)
+        depth = self.depth + 1
+        if depth > self.max_depth:
+            self.too_deep()
+        self.depth = depth
+        try:
+            unit = self._tier_units.get(decl)
+            if unit is None and self.tier_threshold:
+                if self.count_executions(decl, 1) >= self.tier_threshold:
+                    unit = self.tier_up(decl, kind, local_env)
+
+            if unit is not None:
+                return unit(self, local_env)
+
+            status = self.exec_block(decl.body, local_env)
+            if status is None:
+                return None  # Default return if no return statement
+            if type(status) is ReturnValue:
+                return status.value  # Return the value from return statement
+            self.outside_loop(status.kind)
+        finally:
+            self.depth = depth - 1
+
+    def too_deep(self):
+        self.error(f"Maximum recursion depth exceeded: more than {self.max_depth} nested calls",
+                   hint="Make sure the recursion reaches its base case, or allow deeper "
+                        "recursion with max_depth")
+
+    def outside_loop(self, keyword):
+        self.error(f"'{keyword}' used outside of a loop",
+                   hint=f"'{keyword}' only works inside a for or for-each body")
+
+    def _tier_budget(self, node):
+        """Loop iterations left before a loop body is compiled (0: never)"""
+        if not self.tier_threshold:
+            return 0
+        count = self._tier_counts.get(node, 0)
+        if count == _TIER_FAILED:
+            return 0
+        return max(self.tier_threshold - count, 1)
+
+    def tier_up(self, node, kind, env):
+        """Compile a hot body and record the transition; None if it can't be compiled"""
+        if env is self.env:
+            scope = "global"
+        elif "self" in env.vars:
+            scope = "method"
+        else:
+            scope = "function"
+
+        count = self._tier_counts.get(node, 0)
+        try:
+            unit = compile_unit(node.body, "loop" if kind == "loop" else "function", scope)
+        except Exception:
+            with self._tier_lock:
+                self._tier_counts[node] = _TIER_FAILED
+            return None
+        self._tier_units[node] = unit
+
+        name = getattr(node, 'name', None) or getattr(node, 'var_name', None) or "for"
+        event = TierEvent(kind, name, count, node)
+        self.tier_events.append(event)
+        if self.on_tier_event is not None:
+            self.on_tier_event(event)
+        return unit
+
+    def _loop_var_observed(self, node):
+        """Check whether a counted loop's body can read or write its variable"""
+        observed = self._loop_var_cache.get(node)
+        if observed is None:
+            observed = False
+            for child in walk_all(node.body):
+                if isinstance(child, (FuncCall, MethodCall, ClassInstantiation)):
+                    observed = True  # Calls could read it as a global
+                elif getattr(child, 'name', None) == node.var_name or \
+                        getattr(child, 'var_name', None) == node.var_name:
+                    observed = True
+                if observed:
+                    break
+            self._loop_var_cache[node] = observed
+        return observed
+
+    def error_location(self, tb):
+        """Find where an error was raised by reading its traceback.
+
+        Returns the innermost node, the innermost statement and the closest
+        known source line. Nothing is tracked while the program runs: the
+        `node` of each eval_expr / exec_stmt frame and the statement behind
+        each line of compiled code are only looked up here.
+        """
+        node = stmt = line = None
+        while tb is not None:
+            frame = tb.tb_frame
+            is_stmt = _NODE_FRAMES.get(frame.f_code)
+            if is_stmt is not None:
+                current = frame.f_locals.get("node")
+            elif frame.f_code.co_filename.startswith("<nexus "):
+                current, is_stmt = frame.f_globals["_line_nodes"][tb.tb_lineno - 1], True
+            else:
+                current = None
+
+            if current is not None:
+                node = current
+                if is_stmt:
+                    stmt = current
+                line = line_of(current) or line
+            tb = tb.tb_next
+        return node, stmt, line
+
+    def verify_types(self, ast):
+        """Statically check the program, then drop the guards it proved unnecessary"""
+        checked = check_types(ast)
+        if checked.errors:
+            node, message = checked.errors[0]
+            count = len(checked.errors)
+            self.error(
+                f"Type error: {message}",
+                line_of(node),
+                "Fix the types or declare the variable without a type",
+                f"{count} type error{'s' if count > 1 else ''} found before running"
+            )
+        self._proven |= checked.proven
+
+    def prepare(self, ast):
+        """Check and optimize a program before it runs"""
+        if self.unchecked:
+            self.verify_types(ast)
+        if self.optimize:
+            ast = optimize(ast)
+        return ast
 
     def run(self, ast):
         """Execute the AST while preserving parser error formatting"""
+        self.execute(self.prepare(ast))
+
+    def execute(self, ast):
+        """Execute an already prepared AST"""
+        exec_stmt = self.exec_stmt
+        if self.deep_recursion:
+            from .deep import DeepRunner
+            exec_stmt = DeepRunner(self).exec_stmt
         stmt = None  # Initialize stmt variable
+        if self.limits is not None:
+            self.limits.start()
         try:
             for stmt in ast:
-                self.current_line = getattr(stmt, 'line_number', None) or self.current_line
-                result = self.exec_stmt(stmt)
-        except (ReturnException, BreakException, ContinueException):
-            raise  # Re-raise control flow exceptions
-        except SyntaxErrorWithContext:
-            raise  # Re-raise parser errors unchanged
+                status = exec_stmt(stmt, self.env)
+                if status is not None:
+                    if type(status) is ReturnValue:
+                        self.error("'return' used outside of a function",
+                                   hint="'return' only works inside a function or method body")
+                    self.outside_loop(status.kind)
         except Exception as e:
+            self.report_error(e, stmt)
+        finally:
+            self.output.flush()
+            # Embedders reading interpreter.env after a run expect plain strings
+            self.env.flatten_strings()
+
+    async def run_async(self, ast, reader, writer, prompts=None):
+        """Execute the AST with ask() reading from an asyncio stream.
+
+        `reader` is an asyncio.StreamReader (one answer per line) and `writer`
+        anything with write(bytes) and optionally an async drain(), such as an
+        asyncio.StreamWriter. While waiting for an answer the event loop is
+        free to run other sessions.
+        """
+        await self.execute_async(self.prepare(ast), reader, writer, prompts)
+
+    async def execute_async(self, ast, reader, writer, prompts=None):
+        """run_async() for an already prepared AST"""
+        from .aio import AsyncRunner, StreamInput, StreamOutput
+
+        if prompts is None:
+            prompts = self.input.prompts
+        saved = self.input, self.output
+        self.input = StreamInput(reader, prompts)
+        self.output = StreamOutput(writer)
+        if self.limits is not None:
+            self.limits.start()
+        try:
+            await AsyncRunner(self, ast).run(ast)
+        finally:
+            self.output.flush()
+            await self.output.drain()
+            self.env.flatten_strings()
+            self.input, self.output = saved
+
+    def snapshot(self, path, sources=()):
+        """Save globals, functions, classes and structs to `path` (see snapshot.py)"""
+        from .snapshot import save_snapshot
+        save_snapshot(self, path, sources)
+
+    def restore(self, path):
+        """Load the state saved by snapshot(); raises SnapshotError if it is stale"""
+        from .snapshot import load_snapshot
+        load_snapshot(self, path)
+
+    def report_error(self, e, stmt):
+        """Re-raise an error from running `stmt` in the friendly format, with its line"""
+        if isinstance(e, RecursionError):
+            # Python's own recursion limit, reached before max_depth
+            _, _, line = self.error_location(e.__traceback__)
+            self.current_line = line or line_of(stmt)
+            self.error("Maximum recursion depth exceeded", self.current_line,
+                       hint="Make sure the recursion reaches its base case, or turn on deep "
+                            "recursion (--deep-recursion) to go deeper")
+        if isinstance(e, SyntaxErrorWithContext):
+            if e.line_number is None:
+                # Raised by the runtime without a location: add one
+                _, _, line = self.error_location(e.__traceback__)
+                self.current_line = e.line_number = line or line_of(stmt)
+                e.args = (e.format_error(),)
+            raise e
+        else:
             # Convert other errors to our friendly format
-            stmt_info = "unknown statement"
-            if stmt is not None:
-                try:
-                    stmt_info = f"{type(stmt).__name__} at line {self.current_line}"
-                except:
-                    pass
-                    
+            node, inner_stmt, line = self.error_location(e.__traceback__)
+            inner_stmt = inner_stmt or stmt
+            self.current_line = line or line_of(stmt)
+
+            if isinstance(e, NameError):
+                hint = "Make sure variable exists"
+            elif isinstance(e, TypeError):
+                hint = "Check types"
+            elif node is not None and node is not inner_stmt:
+                hint = "This might be a complex expression issue - try breaking it down"
+            else:
+                hint = "This error occurred while executing your program"
+            stmt_info = type(inner_stmt).__name__ if inner_stmt is not None else "unknown statement"
+
             self.error(
                 f"Runtime error: {str(e)}",
-                hint="This error occurred while executing your program",
+                self.current_line,
+                hint,
                 context=f"While executing {stmt_info}"
             )
 
 
+# Interpreter frames whose `node` local is the node being run, and whether
+# that node is a statement (see Interpreter.error_location)
+_NODE_FRAMES = {
+    Interpreter.exec_stmt.__code__: True,
+    Interpreter.eval_expr.__code__: False,
+}
+
+
 if __name__ == "__main__":
     # Debug test for init method
     test_code = '''
@@ -0,0 +1,149 @@
+import time
+from itertools import chain, islice
+from operator import length_hint
+
+from .parser import SyntaxErrorWithContext
+
+
+# Budgets are enforced amortized: loop iterations and calls only count down,
+# and the full check (steps, clock, collection sizes) runs once every
+# CHECK_EVERY of them. Without budgets nothing is counted at all.
+CHECK_EVERY = 1024
+
+# Loops are metered in chunks paid for up front, so the per-iteration work
+# stays in C. Chunks start at FIRST_CHUNK and double, so a loop left early
+# with `break` is charged at most about twice the iterations it ran.
+FIRST_CHUNK = 16
+
+# Marks an exhausted iterator
+_END = object()
+
+# Nested Nexus calls allowed by default (see Interpreter.max_depth)
+DEFAULT_MAX_DEPTH = 100_000
+
+# How deep collection sizes are estimated (a list of lists of lists ...)
+SIZE_DEPTH = 4
+
+
+class BudgetExceeded(SyntaxErrorWithContext):
+    """A run went over one of its execution budgets"""
+    def __init__(self, budget, message, hint):
+        self.budget = budget  # "steps", "time" or "items"
+        super().__init__(message, hint=hint, context="Execution budget exceeded")
+
+
+def collection_items(value, depth=SIZE_DEPTH):
+    """Approximate number of items a value holds, estimated from its first element.
+
+    Struct and class instances hold the items of their fields.
+    """
+    if type(value) is list:
+        n = len(value)
+        return n + n * collection_items(value[0], depth - 1) if n and depth else n
+    if type(value) is dict:
+        n = len(value)
+        return n + n * collection_items(next(iter(value.values())), depth - 1) if n and depth else n
+    from .interpreter import StructInstance, ClassInstance
+    if depth and isinstance(value, (StructInstance, ClassInstance)):
+        return sum(collection_items(field, depth - 1) for field in value.fields.values())
+    return 0
+
+
+class Limits:
+    """Execution budgets of one interpreter: steps, wall-clock time and collection items.
+
+    A step is one loop iteration or one function/method call: every
+    unbounded computation is made of those.
+    """
+
+    def __init__(self, max_steps=None, time_limit=None, max_items=None):
+        self.max_steps = max_steps
+        self.time_limit = time_limit  # Seconds
+        self.max_items = max_items
+        self.start()
+
+    def start(self):
+        """Begin a run: reset the step count and the deadline"""
+        self.steps = 0
+        self.deadline = None if self.time_limit is None else time.monotonic() + self.time_limit
+        self.countdown = self.interval = self._next_interval()
+
+    def _next_interval(self):
+        if self.max_steps is None:
+            return CHECK_EVERY
+        # Land exactly on the step after the last one allowed
+        return max(1, min(CHECK_EVERY, self.max_steps + 1 - self.steps))
+
+    def tick(self, env):
+        """Count one call"""
+        self.countdown -= 1
+        if self.countdown <= 0:
+            self.check(env)
+
+    def meter(self, values, env):
+        """`values`, with every iteration of a loop over them counted"""
+        return chain.from_iterable(self._chunks(iter(values), env))
+
+    def _chunks(self, it, env):
+        size = FIRST_CHUNK
+        while True:
+            # Calls in the loop body tick the same countdown, so it can
+            # run past zero while a chunk is under way
+            if self.countdown <= 0:
+                self.check(env)
+            remaining = length_hint(it, -1)
+            if remaining == 0:
+                return
+            if remaining < 0:
+                # Unknown length (a float range): look ahead to see the end
+                first = next(it, _END)
+                if first is _END:
+                    return
+                it = chain((first,), it)
+                remaining = size
+            n = min(self.countdown, size, remaining)
+            self.countdown -= n
+            yield islice(it, n)
+            if size < CHECK_EVERY:
+                size *= 2
+
+    def check(self, env):
+        self.steps += self.interval - self.countdown  # Counting any overshoot
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise BudgetExceeded(
+                "steps", f"Step limit exceeded: more than {self.max_steps} loop iterations and calls",
+                "Look for a loop that never ends, or allow more steps")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise BudgetExceeded(
+                "time", f"Time limit exceeded: ran for more than {self.time_limit} seconds",
+                "Look for a loop that never ends, or allow more time")
+        if self.max_items is not None:
+            items = self.items_in_scope(env)
+            if items > self.max_items:
+                raise BudgetExceeded(
+                    "items", f"Memory limit exceeded: arrays and dicts hold about {items} items "
+                             f"(limit {self.max_items})",
+                    "Build smaller arrays and dicts, or allow more items")
+        self.countdown = self.interval = self._next_interval()
+
+    def reserve(self, name, items):
+        """Refuse a builtin call that would build more items than the whole budget"""
+        if self.max_items is not None and items > self.max_items:
+            raise BudgetExceeded(
+                "items", f"Memory limit exceeded: {name}() would build {items} items "
+                         f"(limit {self.max_items})",
+                "Build smaller arrays and dicts, or allow more items")
+
+    @staticmethod
+    def items_in_scope(env):
+        """Estimated items in the collections visible from `env`"""
+        total = 0
+        seen = set()
+        while env is not None:
+            for _, value in env.items():
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    total += collection_items(value)
+            env = env.parent
+        return total
+
@@ -0,0 +1,110 @@
+import operator
+
+
+# Native functions: builtins every program can call by name, backed by Python
+# callables. A function the program declares itself always wins over a
+# builtin of the same name (see Interpreter.exec_func_call), so adding a
+# builtin never changes what an existing script does.
+
+
+def _range(*args):
+    # Nexus arrays are lists, so the range is materialized
+    return list(range(*args))
+
+
+def _range_size(*args):
+    return len(range(*args))  # Without building it
+
+
+NATIVE_FUNCTIONS = {
+    "len": len,
+    "min": min,
+    "max": max,
+    "sum": sum,
+    "abs": abs,
+    "round": round,
+    "range": _range,
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+}
+
+# Builtins that build a collection from nothing -> the number of items a
+# call with these arguments creates, so the item budget can refuse it
+# before it is built. Everything else copies or grows a collection the
+# program already holds, which the budget's regular checks see.
+NATIVE_SIZES = {
+    "range": _range_size,
+}
+
+
+# Native methods of arrays (lists) and dicts, by receiver type. Each entry is
+# (function, fewest arguments, most arguments, index of the argument stored
+# as an element or None); the function gets the receiver first. Typed arrays
+# and dicts check the stored argument with their element guard.
+
+def _remove(items, value):
+    try:
+        items.remove(value)
+    except ValueError:
+        raise ValueError(f"{value!r} is not in the array") from None
+
+
+def _index(items, value):
+    try:
+        return items.index(value)
+    except ValueError:
+        raise ValueError(f"{value!r} is not in the array") from None
+
+
+def _slice(items, start, end=None):
+    return items[start:end]
+
+
+def _delete(mapping, key):
+    try:
+        del mapping[key]
+    except KeyError:
+        raise LookupError(f"{key!r} is not in the dict") from None
+
+
+def _pop_key(mapping, key, *default):
+    try:
+        return mapping.pop(key, *default)
+    except KeyError:
+        raise LookupError(f"{key!r} is not in the dict") from None
+
+
+ARRAY_METHODS = {
+    "append": (list.append, 1, 1, 0),
+    "insert": (list.insert, 2, 2, 1),
+    "remove": (_remove, 1, 1, None),
+    "pop": (list.pop, 0, 1, None),
+    "length": (len, 0, 0, None),
+    "index": (_index, 1, 1, None),
+    "sort": (list.sort, 0, 0, None),        # In place
+    "reverse": (list.reverse, 0, 0, None),  # In place
+    "slice": (_slice, 1, 2, None),
+    "contains": (operator.contains, 1, 1, None),
+}
+
+DICT_METHODS = {
+    "set": (operator.setitem, 2, 2, 1),
+    "get": (dict.get, 1, 2, None),
+    "remove": (_delete, 1, 1, None),
+    "pop": (_pop_key, 1, 2, None),
+    "contains": (operator.contains, 1, 1, None),
+    "length": (len, 0, 0, None),
+    "keys": (list, 0, 0, None),
+    "values": (lambda mapping: list(mapping.values()), 0, 0, None),
+}
+
+NATIVE_METHODS = {
+    list: ("Array", ARRAY_METHODS),
+    dict: ("Dict", DICT_METHODS),
+}
+
+# Method name -> index of the argument it stores, for the static checker
+ITEM_ARGS = {name: entry[3] for methods in (ARRAY_METHODS, DICT_METHODS)
+             for name, entry in methods.items() if entry[3] is not None}
@@ -0,0 +1,379 @@
+import copy
+import itertools
+
+from .parser import (
+    Literal, VarRef, BinaryOp, VarDecl, SayStmt, IfStmt, ForStmt,
+    BreakStmt, ContinueStmt, AskStmt, FuncDecl, FuncCall, ReturnStmt,
+    ArrayLiteral, IndexExpr, AssignIndexStmt, ForEachStmt, DictLiteral,
+    StructDecl, StructInstantiation, MemberAccess, MemberAssignment,
+    ClassDecl, MethodCall, ClassInstantiation, MethodDecl, SelfRef
+)
+
+
+class HoistedExpr:
+    """A loop-invariant expression evaluated once before its loop into a slot"""
+    def __init__(self, expr, slot):
+        self.expr = expr
+        self.slot = slot
+
+
+# Every AST node type the parser (or the optimizer) can produce
+NODE_TYPES = (
+    Literal, VarRef, BinaryOp, VarDecl, SayStmt, IfStmt, ForStmt,
+    BreakStmt, ContinueStmt, AskStmt, FuncDecl, FuncCall, ReturnStmt,
+    ArrayLiteral, IndexExpr, AssignIndexStmt, ForEachStmt, DictLiteral,
+    StructDecl, StructInstantiation, MemberAccess, MemberAssignment,
+    ClassDecl, MethodCall, ClassInstantiation, MethodDecl, SelfRef,
+    HoistedExpr
+)
+
+# Nodes that can run arbitrary user code
+CALL_TYPES = (FuncCall, MethodCall, ClassInstantiation, StructInstantiation)
+
+# Nodes whose evaluation has an observable effect (ask() reads input)
+IMPURE_TYPES = CALL_TYPES + (AskStmt,)
+
+# Top-level statements that only declare things and never run user code
+DECLARATION_TYPES = (FuncDecl, ClassDecl, StructDecl)
+
+# Attributes holding statements (or statement lists) rather than expressions
+BLOCK_ATTRS = ("body", "else_body", "fields", "methods")
+
+# Inlining limits
+INLINE_MAX_NODES = 16
+
+
+def children(node):
+    """Yield the direct child nodes of an AST node"""
+    for value in vars(node).values():
+        yield from _nodes_in(value)
+
+
+def _nodes_in(value):
+    if isinstance(value, NODE_TYPES):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _nodes_in(item)
+
+
+def walk(node):
+    """Yield a node and all of its descendants (pre-order)"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(children(current))
+
+
+def walk_all(nodes):
+    """Walk every node in a list of statements"""
+    for node in nodes:
+        yield from walk(node)
+
+
+def count_nodes(node):
+    return sum(1 for _ in walk(node))
+
+
+def replace_children(node, fn):
+    """Replace each direct child with fn(child), rebuilding lists and tuples"""
+    for attr, value in vars(node).items():
+        new_value = _replace_in(value, fn)
+        if new_value is not value:
+            setattr(node, attr, new_value)
+
+
+def _replace_in(value, fn):
+    if isinstance(value, NODE_TYPES):
+        return fn(value)
+    elif isinstance(value, list):
+        value[:] = [_replace_in(item, fn) for item in value]
+        return value
+    elif isinstance(value, tuple):
+        return tuple(_replace_in(item, fn) for item in value)
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Function inlining
+# ---------------------------------------------------------------------------
+
+def _called_names(node):
+    return {n.name for n in walk(node) if isinstance(n, FuncCall)}
+
+
+def _is_recursive(name, call_graph):
+    """Check whether a function can reach itself through the call graph"""
+    seen = set()
+    stack = list(call_graph.get(name, ()))
+    while stack:
+        current = stack.pop()
+        if current == name:
+            return True
+        if current in seen:
+            continue
+        seen.add(current)
+        stack.extend(call_graph.get(current, ()))
+    return False
+
+
+def _find_inline_candidates(ast, max_nodes):
+    """Find small, non-recursive, single-return top-level functions"""
+    decl_counts = {}
+    for node in walk_all(ast):
+        if isinstance(node, FuncDecl):
+            decl_counts[node.name] = decl_counts.get(node.name, 0) + 1
+
+    top_level = {}
+    for index, stmt in enumerate(ast):
+        if isinstance(stmt, FuncDecl):
+            top_level[stmt.name] = (index, stmt)
+
+    call_graph = {name: _called_names(decl) for name, (_, decl) in top_level.items()}
+
+    candidates = {}
+    for name, (index, decl) in top_level.items():
+        if decl_counts[name] != 1:
+            continue  # Redefined somewhere, can't know which body runs
+        if len(decl.body) != 1 or not isinstance(decl.body[0], ReturnStmt):
+            continue
+        expr = decl.body[0].expr
+        if expr is None or count_nodes(expr) > max_nodes:
+            continue
+
+        params = set(decl.params)
+        if len(params) != len(decl.params):
+            continue
+        inlinable = True
+        for node in walk(expr):
+            # Free variables resolve against globals inside the function but
+            # against the caller's scope once inlined, so only params are allowed
+            if isinstance(node, VarRef) and node.name not in params:
+                inlinable = False
+            elif isinstance(node, SelfRef):
+                inlinable = False
+        if not inlinable or _is_recursive(name, call_graph):
+            continue
+
+        candidates[name] = (index, decl)
+    return candidates
+
+
+def _is_pure(node):
+    """Expressions with no calls or input reads have no side effects"""
+    return not any(isinstance(n, IMPURE_TYPES) for n in walk(node))
+
+
+def _inline_call(call, decl):
+    """Return the substituted body of decl for this call, or None if unsafe"""
+    if len(call.args) != len(decl.params):
+        return None
+
+    expr = decl.body[0].expr
+    uses = {param: 0 for param in decl.params}
+    for node in walk(expr):
+        if isinstance(node, VarRef):
+            uses[node.name] += 1
+
+    # Arguments are evaluated once, up front, by a real call. Once inlined they
+    # are evaluated wherever the parameter appears, so only allow arguments
+    # where that can't be observed.
+    for param, arg in zip(decl.params, call.args):
+        if isinstance(arg, Literal):
+            continue
+        if isinstance(arg, VarRef) and uses[param] > 0:
+            continue
+        if uses[param] == 1 and _is_pure(arg):
+            continue
+        return None
+
+    bindings = dict(zip(decl.params, call.args))
+
+    # Substitute all parameters at once so an argument that names another
+    # parameter (e.g. f(b, a)) is not substituted a second time
+    def substitute(node):
+        if isinstance(node, VarRef):
+            return copy.deepcopy(bindings[node.name])
+        replace_children(node, substitute)
+        return node
+
+    return substitute(copy.deepcopy(expr))
+
+
+def _inline_in(stmt, candidates):
+    """Inline candidate calls in expression positions below a statement"""
+    def visit_expr(node):
+        replace_children(node, visit_expr)
+        if isinstance(node, FuncCall) and node.name in candidates:
+            inlined = _inline_call(node, candidates[node.name][1])
+            if inlined is not None:
+                return visit_expr(inlined)
+        return node
+
+    def visit_stmt(node):
+        # A call used as a statement keeps its call; only its arguments change
+        for attr, value in vars(node).items():
+            fn = visit_stmt if attr in BLOCK_ATTRS else visit_expr
+            new_value = _replace_in(value, fn)
+            if new_value is not value:
+                setattr(node, attr, new_value)
+        return node
+
+    visit_stmt(stmt)
+
+
+def inline_functions(ast, max_nodes=INLINE_MAX_NODES):
+    """Substitute calls to small single-return functions with their bodies"""
+    candidates = _find_inline_candidates(ast, max_nodes)
+    if not candidates:
+        return ast
+
+    # A function only exists once its declaration has run. If nothing but
+    # declarations precede it, every call happens after it's defined;
+    # otherwise only inline into top-level code that follows it.
+    first_exec = next(
+        (i for i, stmt in enumerate(ast) if not isinstance(stmt, DECLARATION_TYPES)),
+        len(ast)
+    )
+
+    for index, stmt in enumerate(ast):
+        if isinstance(stmt, DECLARATION_TYPES):
+            visible = {name: c for name, c in candidates.items() if c[0] < first_exec}
+        else:
+            visible = {name: c for name, c in candidates.items() if c[0] < index}
+        if visible:
+            _inline_in(stmt, visible)
+    return ast
+
+
+# ---------------------------------------------------------------------------
+# Loop-invariant code motion
+# ---------------------------------------------------------------------------
+
+# Expressions made only of these nodes are pure reads. Array and dict literals
+# are left out on purpose: each evaluation must build a fresh collection.
+INVARIANT_TYPES = (Literal, VarRef, SelfRef, BinaryOp, IndexExpr, MemberAccess)
+
+# Hoisting a bare name or literal saves nothing
+WORTH_HOISTING_TYPES = (BinaryOp, IndexExpr, MemberAccess)
+
+_slot_ids = itertools.count()
+
+
+class LoopEffects:
+    """What a loop body may write: variable names, collection items, object fields"""
+    def __init__(self):
+        self.names = set()
+        self.items = False
+        self.fields = False
+
+
+def _loop_effects(loop, in_method):
+    """Collect the writes a loop body performs, or None if it makes calls"""
+    effects = LoopEffects()
+    if getattr(loop, 'var_name', None):
+        effects.names.add(loop.var_name)
+
+    for node in walk_all(loop.body):
+        if isinstance(node, CALL_TYPES):
+            return None  # A call can write anything, give up on this loop
+        elif isinstance(node, VarDecl):
+            effects.names.add(node.name)
+        elif isinstance(node, (ForStmt, ForEachStmt)) and node.var_name:
+            effects.names.add(node.var_name)
+        elif isinstance(node, MemberAssignment):
+            effects.fields = True
+        elif isinstance(node, AssignIndexStmt):
+            if node.index is not None:
+                effects.items = True
+            elif isinstance(node.collection, VarRef):
+                effects.names.add(node.collection.name)
+                # Inside a method a bare assignment may land on a field of self
+                if in_method:
+                    effects.fields = True
+            else:
+                effects.fields = True
+    return effects
+
+
+def _is_invariant(expr, effects):
+    for node in walk(expr):
+        if not isinstance(node, INVARIANT_TYPES):
+            return False
+        if isinstance(node, VarRef) and node.name in effects.names:
+            return False
+        if isinstance(node, IndexExpr) and effects.items:
+            return False
+        if isinstance(node, MemberAccess) and effects.fields:
+            return False
+    return True
+
+
+def _hoist_loop(loop, in_method):
+    """Replace invariant subexpressions in a loop body with hoisted slots"""
+    effects = _loop_effects(loop, in_method)
+    if effects is None:
+        return
+    hoisted = {}
+
+    def visit_expr(node):
+        if isinstance(node, HoistedExpr):
+            return node  # Already hoisted by an enclosing loop
+        if isinstance(node, WORTH_HOISTING_TYPES) and _is_invariant(node, effects):
+            slot = f"$inv{next(_slot_ids)}"
+            hoisted[slot] = node
+            return HoistedExpr(node, slot)
+        replace_children(node, visit_expr)
+        return node
+
+    def visit_stmt(node):
+        if isinstance(node, (FuncDecl, ClassDecl, StructDecl)):
+            return node  # Declared bodies don't run in the loop's scope
+        for attr, value in vars(node).items():
+            if attr in BLOCK_ATTRS:
+                fn = visit_stmt
+            elif isinstance(node, AssignIndexStmt) and attr == "collection" and node.index is None:
+                continue  # Assignment target, not a read
+            else:
+                fn = visit_expr
+            new_value = _replace_in(value, fn)
+            if new_value is not value:
+                setattr(node, attr, new_value)
+        return node
+
+    for stmt in loop.body:
+        visit_stmt(stmt)
+    loop.hoisted = hoisted
+
+
+def hoist_loop_invariants(ast):
+    """Move pure, loop-invariant expressions out of for and for-each bodies"""
+    def visit(stmts, in_method):
+        for stmt in stmts:
+            if isinstance(stmt, (ForStmt, ForEachStmt)):
+                # Outer loops first, so invariants leave every loop they can
+                if not hasattr(stmt, 'hoisted'):
+                    _hoist_loop(stmt, in_method)
+                visit(stmt.body, in_method)
+            elif isinstance(stmt, IfStmt):
+                visit(stmt.body, in_method)
+                if isinstance(stmt.else_body, list):
+                    visit(stmt.else_body, in_method)
+                elif stmt.else_body is not None:
+                    visit([stmt.else_body], in_method)
+            elif isinstance(stmt, FuncDecl):
+                visit(stmt.body, False)
+            elif isinstance(stmt, ClassDecl):
+                for method in stmt.methods:
+                    visit(method.body, True)
+
+    visit(ast, False)
+    return ast
+
+
+def optimize(ast):
+    """Run the optimization passes over a parsed program, in place"""
+    inline_functions(ast)
+    hoist_loop_invariants(ast)
+    return ast
@@ -0,0 +1,70 @@
+import sys
+
+
+# Bytes of `say` output collected before they are written out
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class OutputSink:
+    """Destination of `say` output, written in batches.
+
+    `target` is a file-like object with write(), a callable taking a chunk
+    of text, or None for whatever sys.stdout is at the time of writing.
+    With `buffer_size` 0 every line is written and flushed immediately; with
+    None the sink buffers unless the target is a terminal.
+    """
+
+    def __init__(self, target=None, buffer_size=None):
+        self.target = target
+        self.buffer_size = buffer_size
+        self._parts = []
+        self._size = 0
+        self._limit = None  # Resolved from buffer_size on the first write
+
+    def _stream(self):
+        return sys.stdout if self.target is None else self.target
+
+    def _resolve_limit(self):
+        if self.buffer_size is not None:
+            return self.buffer_size
+        isatty = getattr(self._stream(), "isatty", None)
+        try:
+            interactive = callable(isatty) and isatty()
+        except ValueError:  # Closed stream
+            interactive = False
+        return 0 if interactive else DEFAULT_BUFFER_SIZE
+
+    def write(self, text):
+        """Output text as is, e.g. a prompt"""
+        self._parts.append(text)
+        self._size += len(text)
+        if self._limit is None:
+            self._limit = self._resolve_limit()
+        if self._size >= self._limit:
+            self.flush()
+
+    def say(self, value):
+        """Output one line"""
+        text = f"{value}\n"  # Same as write(), inlined for the hot path
+        self._parts.append(text)
+        self._size += len(text)
+        if self._limit is None:
+            self._limit = self._resolve_limit()
+        if self._size >= self._limit:
+            self.flush()
+
+    def flush(self):
+        """Write out everything buffered so far"""
+        if self._parts:
+            data = "".join(self._parts)
+            self._parts.clear()
+            self._size = 0
+            stream = self._stream()
+            write = getattr(stream, "write", None)
+            if write is None:
+                stream(data)  # Callback sink
+                return
+            write(data)
+        stream = self._stream()
+        if hasattr(stream, "flush"):
+            stream.flush()
@@ -1,5 +1,18 @@
+import weakref
+
 from .lexer import lexer
 
+# Source line of each parsed statement and expression. Kept off the nodes so
+# the runtime only looks lines up when an error is being reported.
+node_lines = weakref.WeakKeyDictionary()
+
+def line_of(node):
+    """Source line a node was parsed from, or None if unknown"""
+    try:
+        return node_lines.get(node)
+    except TypeError:
+        return None
+
 class SyntaxErrorWithContext(Exception):
     """Custom syntax error with friendly messaging and context"""
     def __init__(self, message, line_number=None, hint=None, context=None):
@@ -240,6 +253,7 @@ class Parser:
         while self.pos < len(self.tokens):
             try:
                 tok_type, tok_val = self.current()
+                line, start = self.get_current_line(), len(statements)
                 if tok_type == "VAR":
                     statements.append(self.parse_var_decl())
                 elif tok_type == "SAY":
@@ -268,6 +282,7 @@ class Parser:
                     self.eat("NEWLINE")
                 else:
                     self.pos += 1
+                self.mark_lines(statements, start, line)
             except SyntaxErrorWithContext:
                 raise  # Re-raise our custom errors
             except Exception as e:
@@ -825,6 +840,7 @@ class Parser:
         statements = []
         while self.current()[0] not in ("DEDENT", None):
             tok_type, _ = self.current()
+            line, start = self.get_current_line(), len(statements)
             if tok_type == "VAR":
                 statements.append(self.parse_var_decl())
             elif tok_type == "SAY":
@@ -849,13 +865,22 @@ class Parser:
                 self.eat("NEWLINE")
             else:
                 self.pos += 1
+            self.mark_lines(statements, start, line)
         self.eat("DEDENT")
         return statements
 
+    def mark_lines(self, statements, start, line):
+        """Record the source line of statements parsed since `start`"""
+        for stmt in statements[start:]:
+            node_lines[stmt] = line
+
     # Expression parsing methods
     def parse_expression(self):
         try:
-            return self.parse_or()
+            line = self.get_current_line()
+            node = self.parse_or()
+            node_lines[node] = line
+            return node
         except SyntaxErrorWithContext:
             raise
         except Exception:
@@ -969,6 +994,12 @@ class Parser:
                 
                 return node
 
+            elif tok_type == "TYPE" and self.pos + 1 < len(self.tokens) \
+                    and self.tokens[self.pos + 1] == ("PUNCT", "("):
+                # Conversion to a type, such as str(n): a call to the builtin
+                self.eat()
+                return self.parse_call_or_instantiation(tok_value)
+
             elif tok_type == "ID":
                 self.eat()
                 if self.current()[0] == "PUNCT" and self.current()[1] == "(":
@@ -0,0 +1,160 @@
+import sys
+import threading
+from collections import OrderedDict
+
+from .lexer import lexer
+from .parser import Parser, StructDecl, ClassDecl
+from .optimizer import walk_all
+from .interpreter import Interpreter, StructType, ClassObject
+
+
+class Program:
+    """A parsed, checked and optimized Nexus program, ready to run many times.
+
+    A Program never changes after compile(): every run gets its own
+    Interpreter and global environment, and runs may happen on several
+    threads at once. What the runs share is per-node state that only
+    depends on the program: the runtime struct and class types, type
+    guards and code compiled by the tiering JIT. Runs don't quicken, as
+    quickening rewrites the shared AST nodes in place.
+    """
+    __slots__ = ("source", "statements", "options", "_template")
+
+    def __init__(self, source, statements, options, template):
+        object.__setattr__(self, "source", source)
+        object.__setattr__(self, "statements", tuple(statements))
+        object.__setattr__(self, "options", dict(options))
+        object.__setattr__(self, "_template", template)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Program objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Program objects are immutable")
+
+    def interpreter(self, stdin=None, stdout=None, globals=None, prompts=True):
+        """A fresh Interpreter for one run, sharing this program's caches"""
+        interp = Interpreter(output=stdout, input=stdin, prompts=prompts, quicken=False,
+                             **self.options)
+        interp.share_caches(self._template)
+        if globals:
+            for name, value in globals.items():
+                interp.env.define(name, value)
+        return interp
+
+    def run(self, stdin=None, stdout=None, globals=None, prompts=True):
+        """Run the program and return its global variables.
+
+        `stdin` answers ask() (see InputSource), `stdout` receives say()
+        output (see OutputSink) and `globals` maps names to initial values.
+        """
+        interp = self.interpreter(stdin, stdout, globals, prompts)
+        interp.execute(self.statements)
+        return _user_globals(interp)
+
+    async def run_async(self, reader, writer, globals=None, prompts=True):
+        """Run the program with ask() on asyncio streams (see Interpreter.run_async)"""
+        interp = self.interpreter(globals=globals, prompts=prompts)
+        await interp.execute_async(self.statements, reader, writer)
+        return _user_globals(interp)
+
+    def __repr__(self):
+        return f"<Program: {len(self.statements)} statements>"
+
+
+def _user_globals(interp):
+    # Hoisted loop invariants live in "$" slots no program can name
+    return {name: value for name, value in interp.env.items() if not name.startswith("$")}
+
+
+def compile(source, optimize=True, tier_threshold=None, strict_structs=False, unchecked=False,
+            max_steps=None, time_limit=None, max_items=None, deep_recursion=False, max_depth=None):
+    """Lex, parse, check and optimize Nexus source into a reusable Program.
+
+    Raises SyntaxErrorWithContext for syntax errors, and for static type
+    errors when `unchecked` is set. The budgets (see limits.py) apply to
+    each run separately.
+    """
+    options = dict(optimize=False, tier_threshold=tier_threshold,
+                   strict_structs=strict_structs, unchecked=unchecked,
+                   max_steps=max_steps, time_limit=time_limit, max_items=max_items,
+                   deep_recursion=deep_recursion, max_depth=max_depth)
+    template = Interpreter(**dict(options, optimize=optimize))
+    statements = template.prepare(Parser(lexer(source)).parse())
+
+    # Pre-link the top-level struct and class declarations
+    for node in statements:
+        if isinstance(node, StructDecl):
+            template._declared[node] = StructType(node, strict=strict_structs,
+                                                  unguarded=template._proven)
+        elif isinstance(node, ClassDecl):
+            template._declared[node] = ClassObject(node, template._proven)
+    return Program(source, statements, options, template)
+
+
+def approximate_size(program):
+    """Rough memory footprint of a Program in bytes: its source plus its AST nodes"""
+    size = sys.getsizeof(program.source)
+    for node in walk_all(program.statements):
+        size += sys.getsizeof(node) + sys.getsizeof(vars(node))
+    return size
+
+
+class ProgramCache:
+    """Thread-safe LRU cache of compiled Programs keyed by source text and options.
+
+    Bounded by entry count and by the approximate memory of the cached
+    programs; the least recently used programs are evicted first.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0  # Approximate bytes held
+        self._entries = OrderedDict()  # key -> (Program, size)
+        self._lock = threading.Lock()
+
+    def compile(self, source, **options):
+        """Cached nexus.compile(): repeat sources skip lexing, parsing and checking"""
+        key = (source, tuple(sorted(options.items())))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Compile outside the lock; errors are not cached
+        program = compile(source, **options)
+        size = approximate_size(program)
+        with self._lock:
+            if key in self._entries or size > self.max_bytes:
+                return program  # Raced with another thread, or too big to keep
+            self._entries[key] = (program, size)
+            self.size += size
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+        return program
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.size, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, source):
+        with self._lock:
+            return any(key[0] == source for key in self._entries)
@@ -0,0 +1,153 @@
+import operator
+import os
+
+from .parser import BinaryOp, VarRef, Literal
+
+
+# Evaluations with the same operand types before a node specializes itself
+QUICKEN_AFTER = 8
+
+# Deoptimizations after which a node stays generic for good
+MAX_DEOPTS = 3
+
+INT_OPS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "%": operator.mod,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+STR_OPS = {
+    "+": operator.add,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def quicken_mode_from_env():
+    """Read NEXUS_QUICKEN: "0" disables, "verify" checks every specialized result"""
+    value = os.environ.get("NEXUS_QUICKEN", "1").strip().lower()
+    if value in ("0", "off", "false", "no"):
+        return False
+    if value == "verify":
+        return "verify"
+    return True
+
+
+class QuickeningMismatch(AssertionError):
+    """A specialized node disagreed with the generic evaluation (verify mode)"""
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Specialized node variants
+#
+# A quickened node keeps all of its BinaryOp attributes and just swaps its
+# class. Each variant checks its type guard on every evaluation and reverts
+# to BinaryOp when the guard fails.
+# ---------------------------------------------------------------------------
+
+class IntOpLocalConst(BinaryOp):
+    """int variable <op> int literal, e.g. `i < 10` or `n - 1`"""
+    def quick_eval(self, interp, env):
+        value = env[self.left.name]
+        if type(value) is int:
+            return self.quick_op(value, self.right.value)
+        return deoptimize(self, interp, env)
+
+
+class IntOpLocalLocal(BinaryOp):
+    """int variable <op> int variable, e.g. `a + b` or `i < n`"""
+    def quick_eval(self, interp, env):
+        left = env[self.left.name]
+        right = env[self.right.name]
+        if type(left) is int and type(right) is int:
+            return self.quick_op(left, right)
+        return deoptimize(self, interp, env)
+
+
+class StrOpLocalConst(BinaryOp):
+    """str variable <op> str literal, e.g. `name + "!"` or `cmd == "quit"`"""
+    def quick_eval(self, interp, env):
+        value = env[self.left.name]
+        if type(value) is str:
+            return self.quick_op(value, self.right.value)
+        return deoptimize(self, interp, env)
+
+
+class StrOpLocalLocal(BinaryOp):
+    """str variable <op> str variable, e.g. `first + last`"""
+    def quick_eval(self, interp, env):
+        left = env[self.left.name]
+        right = env[self.right.name]
+        if type(left) is str and type(right) is str:
+            return self.quick_op(left, right)
+        return deoptimize(self, interp, env)
+
+
+def _specialization(node, left, right):
+    """Pick a variant for this node shape and operand types, or None"""
+    if not isinstance(node.left, VarRef):
+        return None, None
+    left_type, right_type = type(left), type(right)
+    if left_type is not right_type or left_type not in (int, str):
+        return None, None
+    ops = INT_OPS if left_type is int else STR_OPS
+    if node.op not in ops:
+        return None, None
+
+    if isinstance(node.right, Literal):
+        cls = IntOpLocalConst if left_type is int else StrOpLocalConst
+    elif isinstance(node.right, VarRef):
+        cls = IntOpLocalLocal if left_type is int else StrOpLocalLocal
+    else:
+        return None, None
+    return cls, ops[node.op]
+
+
+def observe(node, left, right):
+    """Record one generic evaluation; specialize once the types look stable"""
+    types = (type(left), type(right))
+    state = node.__dict__
+    if "quick_budget" not in state:
+        if not isinstance(node.left, VarRef) or not isinstance(node.right, (VarRef, Literal)):
+            node.quick_budget = 0  # Shape we never specialize
+            return
+        node.quick_budget = QUICKEN_AFTER
+        node.quick_types = types
+        node.quick_deopts = 0
+
+    if types != node.quick_types:
+        # Still polymorphic, start counting again
+        node.quick_types = types
+        node.quick_budget = QUICKEN_AFTER
+        return
+
+    node.quick_budget -= 1
+    if node.quick_budget:
+        return
+
+    cls, op = _specialization(node, left, right)
+    if cls is None:
+        return  # Budget stays at 0: this node remains generic
+    node.quick_op = op
+    node.__class__ = cls
+
+
+def deoptimize(node, interp, env):
+    """Guard failed: turn back into a generic BinaryOp and evaluate that way"""
+    node.__class__ = BinaryOp
+    node.quick_deopts += 1
+    node.quick_budget = QUICKEN_AFTER if node.quick_deopts < MAX_DEOPTS else 0
+    return interp.eval_expr(node, env)
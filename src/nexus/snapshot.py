@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import pickle
+import sys
+
+from . import __version__
+from .parser import node_lines
+from .optimizer import walk_all
+
+
+# Snapshot file layout: the MAGIC line, one line of JSON header, then the
+# pickled state. The header is checked before anything is unpickled, so an
+# old or foreign snapshot fails with a clear message instead of a pickle
+# error. Bump FORMAT_VERSION whenever the pickled state changes shape.
+MAGIC = b"NEXUS-SNAPSHOT\n"
+FORMAT_VERSION = 1
+
+
+class SnapshotError(Exception):
+    """A snapshot can't be restored: not a snapshot, stale or damaged"""
+    pass
+
+
+def _digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _python_version():
+    return "%d.%d" % sys.version_info[:2]
+
+
+def save_snapshot(interp, path, sources=()):
+    """Write the interpreter's global state to `path`.
+
+    `sources` lists the files the state was built from (usually the
+    prelude script); restoring fails once any of them has changed.
+    """
+    env = interp.env
+    variables = {name: value for name, value in env.items()
+                 if not name.startswith("$")}  # Hoisted invariants are per-run
+    guards = {name: guard for name, guard in (env.guards or {}).items() if name in variables}
+
+    # Line numbers live in a weak side table; carry the declarations' along
+    decls = list(interp.functions.values()) + [c.decl for c in interp.classes.values()] + \
+        [s.decl for s in interp.structs.values()]
+    lines = [(node, node_lines[node]) for node in walk_all(decls) if node in node_lines]
+
+    state = {
+        "variables": variables,
+        "guards": guards,
+        "functions": interp.functions,
+        "classes": interp.classes,
+        "structs": interp.structs,
+        "lines": lines,
+    }
+    header = {
+        "format": FORMAT_VERSION,
+        "nexus": __version__,
+        "python": _python_version(),
+        "sources": {os.path.abspath(source): _digest(source) for source in sources},
+    }
+
+    payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(json.dumps(header).encode() + b"\n")
+        f.write(payload)
+    os.replace(tmp_path, path)  # Never leave a half-written snapshot behind
+
+
+def read_header(f, path):
+    if f.readline() != MAGIC:
+        raise SnapshotError(f"{path} is not a Nexus snapshot")
+    try:
+        header = json.loads(f.readline())
+    except ValueError:
+        raise SnapshotError(f"{path} has a damaged header")
+
+    if header.get("format") != FORMAT_VERSION:
+        raise SnapshotError(f"{path} uses snapshot format {header.get('format')}, "
+                            f"this interpreter reads format {FORMAT_VERSION}; take a new snapshot")
+    if header.get("nexus") != __version__ or header.get("python") != _python_version():
+        raise SnapshotError(f"{path} was taken by Nexus {header.get('nexus')} on Python "
+                            f"{header.get('python')}, this is Nexus {__version__} on Python "
+                            f"{_python_version()}; take a new snapshot")
+    for source, digest in header.get("sources", {}).items():
+        if not os.path.exists(source):
+            raise SnapshotError(f"{path} is stale: {source} no longer exists")
+        if _digest(source) != digest:
+            raise SnapshotError(f"{path} is stale: {source} changed after the snapshot was taken")
+    return header
+
+
+def load_snapshot(interp, path):
+    """Restore global state saved by save_snapshot() into `interp`.
+
+    Snapshots are pickles: only restore files you created yourself.
+    """
+    with open(path, "rb") as f:
+        read_header(f, path)
+        try:
+            state = pickle.load(f)
+        except Exception as e:
+            raise SnapshotError(f"{path} is damaged and can't be restored ({e})")
+
+    for node, line in state["lines"]:
+        node_lines[node] = line
+    interp.functions.update(state["functions"])
+    interp.classes.update(state["classes"])
+    interp.structs.update(state["structs"])
+    env = interp.env
+    env.vars.update(state["variables"])
+    for name, guard in state["guards"].items():
+        env.set_guard(name, guard)
+    if state["guards"] or any(declared.guards for declared in
+                              list(state["classes"].values()) + list(state["structs"].values())):
+        interp.guarded = True  # Typed variables or typed fields
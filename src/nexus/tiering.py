@@ -0,0 +1,388 @@
+import itertools
+import os
+
+from .parser import (
+    Literal, VarRef, BinaryOp, VarDecl, SayStmt, IfStmt, ForStmt,
+    BreakStmt, ContinueStmt, AskStmt, FuncCall, ReturnStmt,
+    ArrayLiteral, IndexExpr, AssignIndexStmt, ForEachStmt, DictLiteral, MemberAccess
+)
+from .optimizer import HoistedExpr
+
+
+# Executions (calls or loop iterations) before a function, method or loop
+# body is compiled. NEXUS_TIER_THRESHOLD=0 turns tiering off.
+DEFAULT_TIER_THRESHOLD = 1000
+
+# Values Python can spell as literals in generated source
+REPR_TYPES = (bool, int, float, str, type(None))
+
+
+def tier_threshold_from_env():
+    """Read the tiering threshold from NEXUS_TIER_THRESHOLD"""
+    value = os.environ.get("NEXUS_TIER_THRESHOLD")
+    if value is None:
+        return DEFAULT_TIER_THRESHOLD
+    try:
+        return max(int(value), 0)
+    except ValueError:
+        return DEFAULT_TIER_THRESHOLD
+
+
+class TierEvent:
+    """A function, method or loop body moving to the compiled tier"""
+    def __init__(self, kind, name, count, node):
+        self.kind = kind      # "function", "method" or "loop"
+        self.name = name
+        self.count = count    # Executions seen before compiling
+        self.node = node
+
+    def __str__(self):
+        return f"tier-up {self.kind} '{self.name}' after {self.count} executions"
+
+
+# ---------------------------------------------------------------------------
+# Runtime helpers shared by all compiled code
+# ---------------------------------------------------------------------------
+
+def _add(left, right):
+    if isinstance(left, str) or isinstance(right, str):
+        return str(left) + str(right)
+    return left + right
+
+
+def _and(left, right):
+    return left and right
+
+
+def _or(left, right):
+    return left or right
+
+
+def _index(collection, index):
+    try:
+        return collection[index]
+    except Exception as e:
+        raise RuntimeError(f"Index error: {e}")
+
+
+def _setindex(collection, index, value):
+    try:
+        collection[index] = value
+    except Exception as e:
+        raise RuntimeError(f"Assignment index error: {e}")
+
+
+def numeric_range(start, end, step, inclusive):
+    """Values of a `for i in (start to end by step)` loop"""
+    if step == 0:
+        raise ValueError("Step cannot be zero in for loop.")
+    if type(start) is int and type(end) is int and type(step) is int:
+        # Counted loop: let Python's range do the stepping and bounds checks
+        if inclusive:
+            end = end + 1 if step > 0 else end - 1
+        return range(start, end, step)
+    return _float_range(start, end, step, inclusive)
+
+
+def _float_range(i, end, step, inclusive):
+    if step > 0:
+        while i <= end if inclusive else i < end:
+            yield i
+            i += step
+    else:
+        while i >= end if inclusive else i > end:
+            yield i
+            i += step
+
+
+def _iterable(value):
+    if isinstance(value, (dict, list)):
+        return value
+    raise RuntimeError(f"Cannot iterate over {type(value).__name__}")
+
+
+# ---------------------------------------------------------------------------
+# Code generation
+# ---------------------------------------------------------------------------
+
+class UnitCompiler:
+    """Turns a statement list into the source of one Python function.
+
+    kind is "function" (body of a function or method, `return` returns) or
+    "loop" (body of a loop run by the interpreter, which handles the loop
+    itself and gets back BREAK, CONTINUE or a ReturnValue). scope is "global", "function" or "method" and decides how plain
+    assignments resolve, mirroring exec_stmt.
+    """
+
+    def __init__(self, kind, scope):
+        self.kind = kind
+        self.scope = scope
+        self.lines = []
+        self.line_nodes = []  # Statement behind each source line, for errors
+        self.current = None
+        self.namespace = {}
+        self.names = itertools.count()
+        self.loop_depth = 0
+
+    def const(self, value):
+        name = f"_k{next(self.names)}"
+        self.namespace[name] = value
+        return name
+
+    def temp(self):
+        return f"_t{next(self.names)}"
+
+    def emit(self, depth, line):
+        self.lines.append("    " * depth + line)
+        self.line_nodes.append(self.current)
+
+    # Expressions ----------------------------------------------------------
+
+    def expr(self, node):
+        if isinstance(node, Literal):
+            if type(node.value) in REPR_TYPES:
+                return repr(node.value)
+            return self.const(node.value)
+
+        elif isinstance(node, VarRef):
+            return f"_get({node.name!r})"
+
+        elif isinstance(node, HoistedExpr):
+            return f"(_vars[{node.slot!r}] if {node.slot!r} in _vars else {self.expr(node.expr)})"
+
+        elif isinstance(node, BinaryOp):
+            op = node.op
+            if op == "not":
+                return f"(not {self.expr(node.right)})"
+            if op == "-" and node.left is None:
+                return f"(-{self.expr(node.right)})"
+            if node.left is None:
+                return self.fallback_expr(node)
+            left, right = self.expr(node.left), self.expr(node.right)
+            if op == "+":
+                return f"_add({left}, {right})"
+            elif op == "and":
+                return f"_and({left}, {right})"
+            elif op == "or":
+                return f"_or({left}, {right})"
+            elif op in ("-", "*", "/", "%", "==", "!=", "<", "<=", ">", ">="):
+                return f"({left} {op} {right})"
+            return self.fallback_expr(node)
+
+        elif isinstance(node, IndexExpr):
+            return f"_index({self.expr(node.collection)}, {self.expr(node.index)})"
+
+        elif isinstance(node, FuncCall):
+            return f"_call({self.const(node)}, env)"
+
+        elif isinstance(node, ArrayLiteral):
+            return "[" + ", ".join(self.expr(e) for e in node.elements) + "]"
+
+        elif isinstance(node, DictLiteral):
+            pairs = ", ".join(f"{self.expr(k)}: {self.expr(v)}" for k, v in node.pairs)
+            return "{" + pairs + "}"
+
+        return self.fallback_expr(node)
+
+    def fallback_expr(self, node):
+        return f"_eval({self.const(node)}, env)"
+
+    # Statements -----------------------------------------------------------
+
+    def block(self, stmts, depth):
+        if not stmts:
+            self.emit(depth, "pass")
+        for stmt in stmts:
+            self.stmt(stmt, depth)
+
+    def stmt(self, node, depth):
+        outer, self.current = self.current, node
+        self.compile_stmt(node, depth)
+        self.current = outer
+
+    def compile_stmt(self, node, depth):
+        if isinstance(node, VarDecl) and node.value is not None \
+                and not isinstance(node.value, AskStmt) and not node.var_type:
+            value = self.temp()
+            self.emit(depth, f"{value} = {self.expr(node.value)}")
+            self.emit(depth, f"if env.guards: env.set_guard({node.name!r}, None)")
+            self.emit(depth, f"_vars[{node.name!r}] = {value}")
+
+        elif isinstance(node, AssignIndexStmt) and node.index is None:
+            if not isinstance(node.collection, VarRef) or self.scope == "method":
+                self.fallback_stmt(node, depth)  # May be a write to a field of self
+                return
+            name = node.collection.name
+            if self._is_accumulator(node):
+                # Strings take the interpreter's StrBuilder path
+                self.emit(depth, f"if type(_vars.get({name!r})) in _STRINGS "
+                                 f"or type(_gvars.get({name!r})) in _STRINGS:")
+                self.fallback_stmt(node, depth + 1)
+                self.emit(depth, "else:")
+                depth += 1
+            value = self.temp()
+            self.emit(depth, f"{value} = {self.expr(node.value)}")
+            if self.scope == "global":
+                self.emit(depth, f"if interp.guarded: _check(env, {name!r}, {value})")
+                self.emit(depth, f"_vars[{name!r}] = {value}")
+            else:
+                self.emit(depth, f"if interp.guarded: _check(interp.env if {name!r} in _gvars else env, "
+                                 f"{name!r}, {value})")
+                self.emit(depth, f"if {name!r} in _gvars: _gvars[{name!r}] = {value}")
+                self.emit(depth, f"else: _vars[{name!r}] = {value}")
+
+        elif isinstance(node, AssignIndexStmt):
+            if isinstance(node.collection, MemberAccess):
+                self.fallback_stmt(node, depth)  # The field's element guard is looked up there
+                return
+            if not isinstance(node.collection, VarRef):
+                self.emit(depth, f"_setindex({self.expr(node.collection)}, "
+                                 f"{self.expr(node.index)}, {self.expr(node.value)})")
+                return
+            collection, index, value = self.temp(), self.temp(), self.temp()
+            self.emit(depth, f"{collection} = {self.expr(node.collection)}")
+            self.emit(depth, f"{index} = {self.expr(node.index)}")
+            self.emit(depth, f"{value} = {self.expr(node.value)}")
+            self.emit(depth, f"if interp.guarded: _check_item(env, {node.collection.name!r}, {value})")
+            self.emit(depth, f"_setindex({collection}, {index}, {value})")
+
+        elif isinstance(node, SayStmt):
+            self.emit(depth, f"_say({self.expr(node.expr)})")
+
+        elif isinstance(node, IfStmt):
+            self.emit(depth, f"if {self.expr(node.condition)}:")
+            self.block(node.body, depth + 1)
+            if isinstance(node.else_body, list):
+                self.emit(depth, "else:")
+                self.block(node.else_body, depth + 1)
+            elif node.else_body is not None:
+                self.emit(depth, "else:")
+                self.stmt(node.else_body, depth + 1)
+
+        elif isinstance(node, ForStmt):
+            self.for_stmt(node, depth)
+
+        elif isinstance(node, ForEachStmt):
+            iterable = self.temp()
+            self.emit(depth, f"{iterable} = {self.expr(node.iterable_expr)}")
+            item = self.temp()
+            depth = self.begin_hoisted(node, depth)
+            self.emit(depth, f"for {item} in _meter(_iterable({iterable}), env):")
+            self.emit(depth + 1, f"_vars[{node.var_name!r}] = {item}")
+            self.loop_body(node.body, depth + 1)
+            self.end_hoisted(node, depth)
+
+        elif isinstance(node, BreakStmt):
+            self.jump(depth, "break", "_BREAK")
+
+        elif isinstance(node, ContinueStmt):
+            self.jump(depth, "continue", "_CONTINUE")
+
+        elif isinstance(node, ReturnStmt):
+            value = self.expr(node.expr) if node.expr else "None"
+            if self.kind == "function":
+                self.emit(depth, f"return {value}")
+            else:
+                self.emit(depth, f"return _ReturnValue({value})")  # Leaves the loop and the call
+
+        elif isinstance(node, FuncCall):
+            self.emit(depth, f"_call({self.const(node)}, env)")
+
+        else:
+            self.fallback_stmt(node, depth)
+
+    def for_stmt(self, node, depth):
+        if node.infinite:
+            depth = self.begin_hoisted(node, depth)
+            self.emit(depth, f"for {self.temp()} in _meter(_forever(None), env):")
+            self.loop_body(node.body, depth + 1)
+            self.end_hoisted(node, depth)
+            return
+
+        start, end, step = self.temp(), self.temp(), self.temp()
+        self.emit(depth, f"{start} = {self.expr(node.start)}")
+        self.emit(depth, f"{end} = {self.expr(node.end)}")
+        self.emit(depth, f"{step} = {self.expr(node.step)}")
+        values = self.temp()
+        self.emit(depth, f"{values} = _range({start}, {end}, {step}, {node.inclusive!r})")
+        i = self.temp()
+        depth = self.begin_hoisted(node, depth)
+        self.emit(depth, f"for {i} in _meter({values}, env):")
+        self.emit(depth + 1, f"_vars[{node.var_name!r}] = {i}")
+        self.loop_body(node.body, depth + 1)
+        self.end_hoisted(node, depth)
+
+    def begin_hoisted(self, node, depth):
+        """Evaluate a loop's hoisted invariants; returns the depth of the loop"""
+        if not getattr(node, 'hoisted', None):
+            return depth
+        self.emit(depth, f"_hoist({self.const(node)}, env)")
+        self.emit(depth, "try:")
+        return depth + 1
+
+    def end_hoisted(self, node, depth):
+        # Hoisted slots only exist while their loop runs
+        if getattr(node, 'hoisted', None):
+            self.emit(depth - 1, "finally:")
+            self.emit(depth, f"_unhoist({self.const(node)}, env)")
+
+    def loop_body(self, body, depth):
+        self.loop_depth += 1
+        self.block(body, depth)
+        self.loop_depth -= 1
+
+    def jump(self, depth, keyword, status):
+        if self.loop_depth:
+            self.emit(depth, keyword)  # Loop compiled into this unit
+        elif self.kind == "loop":
+            self.emit(depth, f"return {status}")  # Loop run by the interpreter
+        else:
+            self.emit(depth, f"interp.outside_loop({keyword!r})")
+
+    def fallback_stmt(self, node, depth):
+        self.emit(depth, f"_exec({self.const(node)}, env)")
+
+    @staticmethod
+    def _is_accumulator(node):
+        left = node.value
+        while isinstance(left, BinaryOp) and left.op == "+":
+            left = left.left
+        return isinstance(left, VarRef) and left.name == node.collection.name
+
+    def source(self, body):
+        self.lines = []
+        self.line_nodes = []
+        self.emit(0, "def unit(interp, env):")
+        self.emit(1, "_vars = env.vars")
+        self.emit(1, "_gvars = interp.env.vars")
+        self.emit(1, "_get = env.__getitem__")
+        self.emit(1, "_check = interp.check_write")
+        self.emit(1, "_say = interp.output.say")
+        self.emit(1, "_check_item = interp.check_item")
+        self.emit(1, "_call = interp.exec_func_call")
+        self.emit(1, "_eval = interp.eval_expr")
+        self.emit(1, "_exec = interp.exec_stmt")
+        self.emit(1, "_hoist = interp.eval_hoisted")
+        self.emit(1, "_unhoist = interp.drop_hoisted")
+        self.emit(1, "_meter = interp.meter")
+        self.block(body, 1)
+        return "\n".join(self.lines) + "\n"
+
+
+def compile_unit(body, kind, scope):
+    """Compile a statement list into a Python function unit(interp, env)"""
+    from .interpreter import BREAK, CONTINUE, ReturnValue, StrBuilder
+
+    compiler = UnitCompiler(kind, scope)
+    source = compiler.source(body)
+    namespace = dict(compiler.namespace)
+    namespace.update(
+        _add=_add, _and=_and, _or=_or, _index=_index, _setindex=_setindex,
+        _range=numeric_range, _iterable=_iterable, _forever=itertools.repeat,
+        _BREAK=BREAK, _CONTINUE=CONTINUE, _ReturnValue=ReturnValue,
+        _STRINGS=(str, StrBuilder), _line_nodes=compiler.line_nodes,
+    )
+    exec(compile(source, f"<nexus {kind}>", "exec"), namespace)
+    unit = namespace["unit"]
+    unit.source = source
+    return unit
@@ -0,0 +1,367 @@
+from .parser import (
+    Literal, VarRef, BinaryOp, VarDecl, IfStmt, ForStmt, AskStmt, FuncDecl,
+    ArrayLiteral, AssignIndexStmt, ForEachStmt, DictLiteral, StructDecl,
+    MemberAccess, MemberAssignment, ClassDecl, MethodCall
+)
+from .optimizer import HoistedExpr, walk_all
+from .natives import ITEM_ARGS
+from .typeguards import SCALAR_CHECKS
+
+
+# Static types are the guard type names ("int", "float", "str", "bool"), a
+# (container, element) tuple for array and dict values, or None (unknown).
+# As with the runtime guards, "int" may hold a bool and "float" an int.
+
+# Element type of an empty array or dict literal: fits any typed container
+NOTHING = "nothing"
+
+# Value types each guard type accepts
+ACCEPTS = {
+    "int": ("int", "bool"),
+    "float": ("int", "float", "bool"),
+    "str": ("str",),
+    "bool": ("bool",),
+}
+
+ARITHMETIC_OPS = ("-", "*", "%")
+COMPARISON_OPS = ("==", "!=", "<", "<=", ">", ">=")
+
+
+class TypeCheckResult:
+    """What the static checker proved about a program"""
+    def __init__(self):
+        self.proven = set()  # VarDecl nodes (variables and fields) whose guard is never needed
+        self.errors = []     # (node, message) for writes that always fail their guard
+
+    def __bool__(self):
+        return not self.errors
+
+
+def _decl_type(decl):
+    """Guard type a VarDecl declares: "int", ("array", "str"), ... or None"""
+    if decl.is_array:
+        return ("array", decl.array_type) if decl.array_type in SCALAR_CHECKS else None
+    if decl.is_dict:
+        return ("dict", decl.dict_type) if decl.dict_type in SCALAR_CHECKS else None
+    return decl.var_type if decl.var_type in SCALAR_CHECKS else None
+
+
+def satisfies(value_type, declared):
+    """Check whether every value of `value_type` passes the guard for `declared`"""
+    if isinstance(declared, tuple):
+        if not isinstance(value_type, tuple) or value_type[0] != declared[0]:
+            return False
+        return value_type[1] == NOTHING or value_type[1] in ACCEPTS[declared[1]]
+    return value_type in ACCEPTS[declared]
+
+
+def violates(value_type, declared):
+    """Check whether no value of `value_type` can pass the guard for `declared`"""
+    if value_type is None:
+        return False
+    if isinstance(value_type, tuple) and isinstance(declared, tuple) \
+            and value_type[0] == declared[0] and value_type[1] is None:
+        return False  # Right container, elements unknown
+    return not satisfies(value_type, declared)
+
+
+def _join(types):
+    """Common type of array elements or dict values"""
+    types = set(types)
+    if not types:
+        return NOTHING
+    if len(types) == 1:
+        return types.pop()
+    if types <= {"int", "bool"}:
+        return "int"
+    if types <= {"int", "float", "bool"}:
+        return "float"
+    return None
+
+
+def describe(static_type):
+    if isinstance(static_type, tuple):
+        kind, element = static_type
+        return f"{kind} of {element}" if element not in (None, NOTHING) else kind
+    return static_type
+
+
+class TypeChecker:
+    """Infers expression types and checks every write to a typed binding.
+
+    Variables are tracked by name across the whole program, so a proof
+    holds whichever scope a write ends up in at runtime. A name gets a
+    static type only when every binding of it agrees on one.
+    """
+
+    def __init__(self):
+        self.bindings = {}     # name -> [VarDecl, "param", ForStmt or ForEachStmt]
+        self.writes = {}       # name -> [value expr] from `name = value`
+        self.item_writes = {}  # name -> [value expr] from `name[i] = value`
+        self.field_writes = {} # field name -> [value expr] from `obj.field = value`
+        self.field_item_writes = {}  # field name -> [value expr] from `obj.field[i] = value`
+        self.method_writes = {}  # name -> [value expr] from `name = value` inside a method
+        self.fields = []       # VarDecl nodes declaring struct or class fields
+        self.field_decls = {}  # field name -> [VarDecl]
+        self.name_types = {}
+        self.assuming = {}     # Names whose type is being checked -> assumed type
+
+    # Collection -----------------------------------------------------------
+
+    def collect(self, stmts, in_method=False):
+        for stmt in stmts:
+            self.collect_stmt(stmt, in_method)
+
+    def collect_stmt(self, node, in_method):
+        if isinstance(node, VarDecl):
+            self.bindings.setdefault(node.name, []).append(node)
+
+        elif isinstance(node, AssignIndexStmt):
+            target = node.collection
+            if isinstance(target, VarRef) and node.index is None:
+                if in_method:
+                    # A bare name in a method may assign a field of self (the
+                    # parser's `self.name = value`), a local or a global: it
+                    # can only stand in the way of a proof, never be an error
+                    self.method_writes.setdefault(target.name, []).append(node.value)
+                else:
+                    self.writes.setdefault(target.name, []).append(node.value)
+            elif isinstance(target, VarRef):
+                self.item_writes.setdefault(target.name, []).append(node.value)
+            elif isinstance(target, MemberAccess) and node.index is None:
+                self.field_writes.setdefault(target.member_name, []).append(node.value)
+            elif isinstance(target, MemberAccess):
+                self.field_item_writes.setdefault(target.member_name, []).append(node.value)
+
+        elif isinstance(node, MemberAssignment):
+            self.field_writes.setdefault(node.member_name, []).append(node.value_expr)
+
+        elif isinstance(node, IfStmt):
+            self.collect(node.body, in_method)
+            if isinstance(node.else_body, list):
+                self.collect(node.else_body, in_method)
+            elif node.else_body is not None:
+                self.collect_stmt(node.else_body, in_method)
+
+        elif isinstance(node, (ForStmt, ForEachStmt)):
+            if not getattr(node, 'infinite', False):
+                self.bindings.setdefault(node.var_name, []).append(node)
+            self.collect(node.body, in_method)
+
+        elif isinstance(node, FuncDecl):
+            for param in node.params:
+                self.bindings.setdefault(param, []).append("param")
+            self.collect(node.body, in_method)
+
+        elif isinstance(node, (StructDecl, ClassDecl)):
+            for field in node.fields:
+                self.fields.append(field)
+                self.field_decls.setdefault(field.name, []).append(field)
+            for method in getattr(node, 'methods', ()):
+                for param in method.params:
+                    self.bindings.setdefault(param, []).append("param")
+                self.collect(method.body, in_method=True)
+
+    # Inference ------------------------------------------------------------
+
+    def expr_type(self, node):
+        if isinstance(node, Literal):
+            name = type(node.value).__name__
+            return name if name in ACCEPTS else None
+
+        elif isinstance(node, VarRef):
+            return self.name_type(node.name)
+
+        elif isinstance(node, HoistedExpr):
+            return self.expr_type(node.expr)
+
+        elif isinstance(node, BinaryOp):
+            return self.binary_type(node)
+
+        elif isinstance(node, ArrayLiteral):
+            return ("array", _join(self.expr_type(e) for e in node.elements))
+
+        elif isinstance(node, DictLiteral):
+            return ("dict", _join(self.expr_type(v) for _, v in node.pairs))
+
+        # Calls, member and index reads can see values no guard covers
+        return None
+
+    def binary_type(self, node):
+        op = node.op
+        right = self.expr_type(node.right)
+        if op == "not" or op in COMPARISON_OPS:
+            return "bool"
+        if node.left is None:
+            return right if op == "-" and right in ("int", "float") else None
+
+        left = self.expr_type(node.left)
+        if op == "+" and (left == "str" or right == "str"):
+            return "str"  # Anything else is converted
+        numeric = ("int", "float", "bool")
+        if op in ("+",) + ARITHMETIC_OPS and left in numeric and right in numeric:
+            return "float" if "float" in (left, right) else "int"
+        if op == "/" and left in numeric and right in numeric:
+            return "float"
+        if op in ("and", "or") and left == right:
+            return left
+        return None
+
+    def loop_var_type(self, loop):
+        if isinstance(loop, ForEachStmt):
+            return None  # Elements can change through aliases
+        bounds = [self.expr_type(e) for e in (loop.start, loop.end, loop.step)]
+        if all(t == "int" for t in bounds):
+            return "int"
+        if all(t in ("int", "float") for t in bounds):
+            return "float"
+        return None
+
+    def name_type(self, name):
+        """Type every value bound to `name` is known to have, or None"""
+        if name in self.name_types:
+            return self.name_types[name]
+        if name in self.assuming:
+            return self.assuming[name]  # Recursive use: assume it until disproved
+
+        sites = self.bindings.get(name, [])
+        declared = {_decl_type(s) for s in sites if isinstance(s, VarDecl)}
+        loops = [s for s in sites if isinstance(s, (ForStmt, ForEachStmt))]
+        candidate = None
+        if "param" in sites or None in declared or len(declared) > 1:
+            pass
+        elif declared:
+            candidate = declared.pop()
+            for decl in sites:
+                if isinstance(decl, VarDecl) and decl.value is None and not isinstance(candidate, tuple):
+                    candidate = None  # Starts out as None
+        elif loops:
+            self.assuming[name] = None
+            candidate = _join(self.loop_var_type(loop) for loop in loops)
+            del self.assuming[name]
+            if candidate == NOTHING:
+                candidate = None
+
+        if candidate is not None:
+            # Every store to the name has to fit, guarded or not
+            self.assuming[name] = candidate
+            values = [self.loop_var_type(loop) for loop in loops]
+            values += [self.expr_type(v) for v in self.writes.get(name, ())]
+            values += [self.expr_type(v) for v in self.method_writes.get(name, ())]
+            if not all(t is not None and satisfies(t, candidate) for t in values):
+                candidate = None
+            del self.assuming[name]
+
+        if not self.assuming:
+            self.name_types[name] = candidate  # Only cache results that assumed nothing
+        return candidate
+
+    # Checking -------------------------------------------------------------
+
+    def check(self, ast):
+        result = TypeCheckResult()
+        self.collect(ast)
+        # Native methods storing an element (xs.append(v), d.set(k, v)) write items
+        for node in walk_all(ast):
+            if isinstance(node, MethodCall):
+                arg = ITEM_ARGS.get(node.method_name)
+                if arg is None or arg >= len(node.args):
+                    continue
+                receiver = node.object_expr
+                if isinstance(receiver, VarRef):
+                    self.item_writes.setdefault(receiver.name, []).append(node.args[arg])
+                elif isinstance(receiver, MemberAccess):
+                    self.field_item_writes.setdefault(receiver.member_name, []).append(node.args[arg])
+
+        for name, sites in self.bindings.items():
+            for decl in sites:
+                if isinstance(decl, VarDecl) and _decl_type(decl) is not None:
+                    self.check_variable(decl, sites, result)
+
+        for field in self.fields:
+            self.check_field(field, result)
+        return result
+
+    def check_variable(self, decl, sites, result):
+        declared = _decl_type(decl)
+        name = decl.name
+        proven = not isinstance(decl.value, AskStmt)  # Input is only known at runtime
+
+        if decl.value is not None and not isinstance(decl.value, AskStmt):
+            value_type = self.expr_type(decl.value)
+            if violates(value_type, declared):
+                result.errors.append((decl, f"'{name}' is declared {describe(declared)} "
+                                            f"but initialized with {describe(value_type)}"))
+            proven = proven and value_type is not None and satisfies(value_type, declared)
+
+        # Writes to the name only always hit this binding if every binding is typed alike
+        all_typed = all(isinstance(s, VarDecl) and _decl_type(s) == declared for s in sites)
+        for value in self.writes.get(name, ()):
+            value_type = self.expr_type(value)
+            if all_typed and violates(value_type, declared):
+                result.errors.append((value, f"'{name}' is declared {describe(declared)} "
+                                             f"but assigned {describe(value_type)}"))
+            proven = proven and value_type is not None and satisfies(value_type, declared)
+        proven = proven and self.all_satisfy(self.method_writes.get(name, ()), declared)
+
+        if isinstance(declared, tuple):
+            element = declared[1]
+            for value in self.item_writes.get(name, ()):
+                value_type = self.expr_type(value)
+                if all_typed and violates(value_type, element):
+                    result.errors.append((value, f"'{name}' holds {element} values "
+                                                 f"but is given {describe(value_type)}"))
+                proven = proven and value_type is not None and satisfies(value_type, element)
+
+        if proven:
+            result.proven.add(decl)
+
+    def all_satisfy(self, values, declared):
+        """Check whether every value expression is known to pass the guard for `declared`"""
+        for value in values:
+            value_type = self.expr_type(value)
+            if value_type is None or not satisfies(value_type, declared):
+                return False
+        return True
+
+    def check_field(self, field, result):
+        declared = _decl_type(field)
+        if declared is None:
+            return
+        if isinstance(field.value, Literal) and not isinstance(declared, tuple):
+            value_type = self.expr_type(field.value)
+            if violates(value_type, declared):
+                result.errors.append((field, f"Field '{field.name}' is declared {declared} "
+                                             f"but defaults to {describe(value_type)}"))
+
+        # The object behind `x.field = v` is unknown, so check against every declaration
+        same_name = self.field_decls[field.name]
+        everywhere_typed = all(_decl_type(f) == declared for f in same_name)
+        proven = True
+        for value in self.field_writes.get(field.name, ()):
+            value_type = self.expr_type(value)
+            if everywhere_typed and violates(value_type, declared):
+                result.errors.append((value, f"Field '{field.name}' is declared {describe(declared)} "
+                                             f"but assigned {describe(value_type)}"))
+            proven = proven and value_type is not None and satisfies(value_type, declared)
+        proven = proven and self.all_satisfy(self.method_writes.get(field.name, ()), declared)
+
+        if isinstance(declared, tuple):
+            element = declared[1]
+            for value in self.field_item_writes.get(field.name, ()):
+                value_type = self.expr_type(value)
+                if everywhere_typed and violates(value_type, element):
+                    result.errors.append((value, f"Field '{field.name}' holds {element} values "
+                                                 f"but is given {describe(value_type)}"))
+                proven = proven and value_type is not None and satisfies(value_type, element)
+        if proven:
+            result.proven.add(field)
+
+
+def check_types(ast):
+    """Statically check a program's typed declarations.
+
+    Returns a TypeCheckResult listing the declarations whose runtime type
+    guard can never fail, and the writes that always fail theirs.
+    """
+    return TypeChecker().check(ast)
@@ -0,0 +1,72 @@
+# A guard is built once per typed declaration (`var x int`, `var xs[] str`,
+# `var d{} int`, a typed struct or class field) and attached to the binding
+# it declares. It only runs when that binding is written.
+
+# Value checks for each type name the lexer knows
+SCALAR_CHECKS = {
+    "int": lambda value: isinstance(value, int),
+    "float": lambda value: isinstance(value, (int, float)),
+    "str": lambda value: isinstance(value, str),
+    "bool": lambda value: isinstance(value, bool),
+}
+
+
+def _describe(value):
+    return type(value).__name__
+
+
+class TypeGuard:
+    """Validator for one typed declaration.
+
+    check(value) validates a write to the whole binding; check_item(value)
+    validates a write through an index (`xs[i] = v`, `d[k] = v`).
+    """
+    __slots__ = ("type_name", "container", "check", "check_item")
+
+    def __init__(self, type_name, container=None):
+        self.type_name = type_name
+        self.container = container  # None, "array" or "dict"
+        item = SCALAR_CHECKS.get(type_name)
+
+        if container is None:
+            def check(value):
+                if not item(value):
+                    raise TypeError(f"Expected {type_name}, got {_describe(value)}")
+            self.check = check
+            self.check_item = None
+            return
+
+        kind, python_type = ("array", list) if container == "array" else ("dict", dict)
+
+        def check_item(value):
+            if not item(value):
+                raise TypeError(f"Expected {type_name} in {kind}, got {_describe(value)}")
+
+        def check(value):
+            if not isinstance(value, python_type):
+                raise TypeError(f"Expected {kind} of {type_name}, got {_describe(value)}")
+            for element in (value.values() if python_type is dict else value):
+                if not item(element):
+                    raise TypeError(f"Expected {kind} of {type_name}, "
+                                    f"found {_describe(element)} element")
+
+        self.check = check
+        self.check_item = check_item
+
+    def __reduce__(self):
+        return TypeGuard, (self.type_name, self.container)
+
+    def __repr__(self):
+        suffix = {"array": "[]", "dict": "{}"}.get(self.container, "")
+        return f"<guard {suffix}{self.type_name}>"
+
+
+def guard_for_decl(decl):
+    """Build the guard a VarDecl asks for, or None if it is untyped"""
+    if decl.is_array:
+        return TypeGuard(decl.array_type, "array") if decl.array_type in SCALAR_CHECKS else None
+    if decl.is_dict:
+        return TypeGuard(decl.dict_type, "dict") if decl.dict_type in SCALAR_CHECKS else None
+    if decl.var_type in SCALAR_CHECKS:
+        return TypeGuard(decl.var_type)
+    return None
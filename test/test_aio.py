@@ -0,0 +1,173 @@
+import pytest # type: ignore
+import sys
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.nexus.interpreter import Interpreter
+from src.nexus.parser import Parser, SyntaxErrorWithContext
+from src.nexus.lexer import lexer
+
+
+CHATBOT = '''func ask_name():
+    var name = ask("Name? ")
+    return name
+say("Hello")
+var who = ask_name()
+for i in (0 to 3 by 1):
+    var answer = ask("Q" + i + "? ")
+    if answer == "stop":
+        break
+    say(who + " said " + answer)
+say("Bye " + who)'''
+
+
+class MemoryWriter:
+    """In-memory stand-in for an asyncio.StreamWriter"""
+    def __init__(self):
+        self.data = bytearray()
+        self.drains = 0
+
+    def write(self, data):
+        self.data.extend(data)
+
+    async def drain(self):
+        self.drains += 1
+
+
+async def session(code, answers, writer=None):
+    reader = asyncio.StreamReader()
+    reader.feed_data(answers.encode())
+    reader.feed_eof()
+    writer = writer or MemoryWriter()
+    await Interpreter().run_async(Parser(lexer(code)).parse(), reader, writer)
+    return writer.data.decode()
+
+
+class TestAsyncExecution:
+    """Test run_async() with ask() answered from asyncio streams"""
+
+    def test_session_matches_scripted_run(self):
+        output = asyncio.run(session(CHATBOT, "Ann\nhi\nstop\n"))
+        assert output == "Hello\nName? Q0? Ann said hi\nQ1? Bye Ann\n"
+
+    def test_waiting_sessions_do_not_block_each_other(self):
+        async def main():
+            readers = [asyncio.StreamReader() for _ in range(50)]
+            writers = [MemoryWriter() for _ in range(50)]
+            ast = Parser(lexer(CHATBOT)).parse()
+            tasks = [asyncio.create_task(Interpreter().run_async(ast, r, w))
+                     for r, w in zip(readers, writers)]
+            await asyncio.sleep(0)
+            # Every session is now waiting on its first ask()
+            assert all(w.data.decode() == "Hello\nName? " for w in writers)
+            for n, reader in enumerate(reversed(readers)):
+                reader.feed_data(f"user{n}\nstop\n".encode())
+                reader.feed_eof()
+            await asyncio.gather(*tasks)
+            return writers
+
+        threads_before = threading.active_count()
+        writers = asyncio.run(main())
+        assert threading.active_count() == threads_before
+        assert writers[0].data.decode().endswith("Bye user49\n")
+
+    def test_ask_nested_in_an_expression(self):
+        code = '''func get(prompt):
+    var value = ask(prompt)
+    return value
+say("got " + get("A? ") + " and " + get("B? "))'''
+        assert asyncio.run(session(code, "x\ny\n")) == "A? B? got x and y\n"
+
+    def test_nested_asks_hold_no_executor_thread(self):
+        code = '''func get(prompt):
+    var value = ask(prompt)
+    return value
+say("Hello, " + get("Name? "))'''
+
+        async def main():
+            # Far fewer workers than idle sessions: none may wait on one
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=2))
+            ast = Parser(lexer(code)).parse()
+            readers = [asyncio.StreamReader() for _ in range(8)]
+            writers = [MemoryWriter() for _ in range(8)]
+            tasks = [asyncio.create_task(Interpreter().run_async(ast, r, w))
+                     for r, w in zip(readers, writers)]
+            await asyncio.sleep(0)
+            assert all(w.data.decode() == "Name? " for w in writers)
+            # Only the last sessions get answers; the others stay idle meanwhile
+            for n in (6, 7):
+                readers[n].feed_data(f"user{n}\n".encode())
+                readers[n].feed_eof()
+            await asyncio.wait_for(asyncio.gather(*tasks[6:]), timeout=5)
+            for n in range(6):
+                readers[n].feed_data(f"user{n}\n".encode())
+                readers[n].feed_eof()
+            await asyncio.gather(*tasks[:6])
+            return writers
+
+        writers = asyncio.run(main())
+        assert [w.data.decode() for w in writers] == \
+            [f"Name? Hello, user{n}\n" for n in range(8)]
+
+    def test_ask_in_method(self):
+        code = '''class Bot():
+    var name str
+    func greet():
+        var reply = ask("How are you? ")
+        self.name = reply
+        return "ok"
+var bot = Bot()
+var status = bot.greet()
+say(bot.name + " " + status)'''
+        assert asyncio.run(session(code, "fine\n")) == "How are you? fine ok\n"
+
+    def test_errors_keep_friendly_format(self):
+        code = '''say("Start")
+var n int = ask("Number? ")'''
+        with pytest.raises(SyntaxErrorWithContext) as exc_info:
+            asyncio.run(session(code, "3\n"))
+        assert exc_info.value.line_number == 2
+        assert "Expected int, got str" in str(exc_info.value)
+
+    def test_native_method_on_typed_field(self):
+        # A class method named append() makes `append` calls possibly ask
+        code = '''class Log():
+    func append(line):
+        var reply = ask(line)
+        return reply
+struct Bag():
+    var items[] int
+var bag = Bag()
+bag.items.append("oops")'''
+        with pytest.raises(SyntaxErrorWithContext) as exc_info:
+            asyncio.run(session(code, ""))
+        assert exc_info.value.line_number == 8
+        assert "Expected int in array, got str" in str(exc_info.value)
+
+    def test_local_socket_session(self):
+        async def main():
+            ast = Parser(lexer(CHATBOT)).parse()
+
+            async def handle(reader, writer):
+                await Interpreter().run_async(ast, reader, writer)
+                writer.close()
+
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"Bo\nyes\nno\nmaybe\n")
+                output = await reader.read()
+                writer.close()
+            return output.decode()
+
+        assert asyncio.run(main()) == ("Hello\nName? Q0? Bo said yes\nQ1? Bo said no\n"
+                                       "Q2? Bo said maybe\nBye Bo\n")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
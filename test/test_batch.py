@@ -0,0 +1,68 @@
+import pytest # type: ignore
+import sys
+import os
+import json
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.nexus.batch import collect_scripts, run_batch, run_one
+
+
+SRC = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+
+@pytest.fixture
+def scripts(tmp_path):
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "a_hello.nx").write_text('say("hello")')
+    (tmp_path / "b_broken.nx").write_text('say(missing)')
+    (tmp_path / "nested" / "c_loop.nx").write_text('''var total = 0
+for i in (0 to 10 by 1):
+    total = total + i
+say(total)''')
+    (tmp_path / "d_ask.nx").write_text('var name = ask("Name? ")\nsay("Hi " + name)')
+    (tmp_path / "notes.txt").write_text('not a script')
+    return tmp_path
+
+
+class TestBatchRunner:
+    """Test running many scripts with captured output"""
+
+    def test_collects_scripts_recursively(self, scripts):
+        found = [os.path.relpath(p, scripts) for p in collect_scripts([scripts])]
+        assert found == ["a_hello.nx", "b_broken.nx", "d_ask.nx", os.path.join("nested", "c_loop.nx")]
+
+    def test_run_one_captures_output_and_errors(self, scripts):
+        ok = run_one(str(scripts / "a_hello.nx"))
+        assert ok["status"] == "ok" and ok["output"] == "hello\n"
+        broken = run_one(str(scripts / "b_broken.nx"))
+        assert broken["status"] == "error"
+        assert "Undefined variable 'missing'" in broken["error"]
+        no_input = run_one(str(scripts / "d_ask.nx"))
+        assert no_input["status"] == "error"
+        assert run_one(str(scripts / "d_ask.nx"), answers=["Ann"])["output"] == "Hi Ann\n"
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_report(self, scripts, jobs):
+        report = run_batch(collect_scripts([scripts]), jobs=jobs, answers=["Bo"])
+        assert report["summary"]["total"] == 4
+        assert report["summary"]["failed"] == 1
+        assert report["summary"]["workers"] == jobs
+        outputs = {os.path.basename(e["script"]): e["output"] for e in report["scripts"]}
+        assert outputs == {"a_hello.nx": "hello\n", "b_broken.nx": "",
+                           "d_ask.nx": "Hi Bo\n", "c_loop.nx": "45\n"}
+        assert all(e["seconds"] >= 0 for e in report["scripts"])
+
+    def test_run_many_command(self, scripts):
+        result = subprocess.run(
+            [sys.executable, "-m", "nexus.cli", "run-many", str(scripts), "-j", "2", "--no-output"],
+            capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=SRC))
+        assert result.returncode == 1  # b_broken.nx fails, d_ask.nx has no answers
+        report = json.loads(result.stdout)
+        assert report["summary"]["ok"] == 2
+        assert "output" not in report["scripts"][0]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,84 @@
+import pytest # type: ignore
+import sys
+import os
+import threading
+import subprocess
+from io import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.nexus.daemon import NexusDaemon
+from src.nexus.client import run_remote
+
+
+SRC = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    path = str(tmp_path / "nexus.sock")
+    server = NexusDaemon(path)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def remote(daemon, script, stdin="", args=()):
+    out, err = StringIO(), StringIO()
+    status = run_remote(str(script), args, daemon.server_address, StringIO(stdin), out, err)
+    return status, out.getvalue(), err.getvalue()
+
+
+class TestDaemon:
+    """Test running scripts in the warm daemon through the thin client"""
+
+    def test_runs_script_with_relayed_input(self, daemon, tmp_path):
+        script = tmp_path / "greet.nx"
+        script.write_text('say("Hello")\nvar name = ask("Name? ")\nsay("Hi " + name)')
+        assert remote(daemon, script, "Ann\n") == (0, "Hello\nName? Hi Ann\n", "")
+        assert remote(daemon, script, "Bob\n", ["--no-prompts"]) == (0, "Hello\nHi Bob\n", "")
+
+    def test_requests_are_isolated_and_programs_cached(self, daemon, tmp_path):
+        script = tmp_path / "count.nx"
+        script.write_text('var n = 1\nsay(n)')
+        for _ in range(3):
+            assert remote(daemon, script)[:2] == (0, "1\n")
+        assert daemon.cache.misses == 1
+        assert daemon.cache.hits == 2
+
+    def test_errors_are_reported(self, daemon, tmp_path):
+        script = tmp_path / "broken.nx"
+        script.write_text('say("before")\nsay(missing)')
+        status, out, err = remote(daemon, script)
+        assert status == 1
+        assert out == "before\n"
+        assert "Undefined variable 'missing'" in err
+
+        status, _, err = remote(daemon, tmp_path / "absent.nx")
+        assert status == 1 and "File not found" in err
+
+        script = tmp_path / "asks.nx"
+        script.write_text('var name = ask("Name? ")')
+        status, _, err = remote(daemon, script, "")
+        assert status == 1 and "no more input" in err
+
+    def test_missing_daemon(self, tmp_path):
+        err = StringIO()
+        status = run_remote(str(tmp_path / "x.nx"), (), str(tmp_path / "none.sock"),
+                            StringIO(), StringIO(), err)
+        assert status == 2
+        assert "nexus daemon" in err.getvalue()
+
+    def test_thin_client_process(self, daemon, tmp_path):
+        script = tmp_path / "add.nx"
+        script.write_text('var a = ask("")\nsay(a + "!")')
+        result = subprocess.run(
+            [sys.executable, "-m", "nexus.client", "--socket", daemon.server_address, str(script)],
+            input="wow\n", capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=SRC))
+        assert (result.returncode, result.stdout) == (0, "wow!\n")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -6,9 +6,10 @@ from unittest.mock import patch
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from src.nexus.interpreter import Interpreter
-from src.nexus.parser import Parser
+from src.nexus.interpreter import Interpreter, Env, StrBuilder
+from src.nexus.parser import Parser, SyntaxErrorWithContext
 from src.nexus.lexer import lexer
+from src.nexus.input import InputSource
 
 class TestInterpreterBasicOperations:
     """Test basic interpreter operations"""
@@ -37,6 +38,61 @@ say("Hello, " + name)'''
             interpreter.run(Parser(lexer(code)).parse())
             assert fake_out.getvalue().strip() == "Hello, World"
 
+    def test_string_accumulation_in_loop(self):
+        code = '''var s = ""
+for i in (0 to 5 by 1):
+    s = s + i
+    if s == "012":
+        say(s[1])
+say(s)'''
+        interpreter = Interpreter()
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue().splitlines() == ["1", "01234"]
+        assert interpreter.env["s"] == "01234"
+
+    @pytest.mark.parametrize("tier_threshold", [0, 1])
+    def test_string_accumulation_reading_itself(self, tier_threshold):
+        code = '''var s = "a"
+s = s + "b"
+s = s + s
+var t = "a"
+for i in (0 to 3 by 1):
+    t = t + "b"
+    t = t + t[0] + t
+say(s)
+say(t)'''
+        interpreter = Interpreter(tier_threshold=tier_threshold)
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue().splitlines() == ["abab", "abaabbaabaabbbaabaabbaabaabbb"]
+
+    def test_string_accumulation_on_global_from_function(self):
+        code = '''var log = "start"
+func note(x):
+    log = log + "," + x
+note("a")
+note("b")
+say(log)'''
+        interpreter = Interpreter()
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue().strip() == "start,a,b"
+
+    def test_pending_strings_are_joined_for_wholesale_readers(self):
+        env = Env()
+        env.define("s", StrBuilder(["a", "b"]))
+        assert dict(env.items()) == {"s": "ab"}
+        assert type(env.vars["s"]) is str
+
+    def test_numeric_accumulation_is_unchanged(self):
+        code = '''var n = 1
+for i in (0 to 3 by 1):
+    n = n + i'''
+        interpreter = Interpreter()
+        interpreter.run(Parser(lexer(code)).parse())
+        assert interpreter.env["n"] == 4
+
 class TestControlFlow:
     """Test control flow statements"""
     
@@ -59,6 +115,57 @@ else:
             interpreter.run(Parser(lexer(code)).parse())
             assert fake_out.getvalue().splitlines() == ["0", "1", "2"]
 
+    def test_inclusive_reverse_loop(self):
+        code = '''for i in (inclusive 3 to 0 by -1):
+    say(i)'''
+        interpreter = Interpreter()
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue().splitlines() == ["3", "2", "1", "0"]
+
+    def test_float_loop(self):
+        code = '''for x in (0 to 1 by 0.25):
+    say(x)'''
+        interpreter = Interpreter()
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue().splitlines() == ["0", "0.25", "0.5", "0.75"]
+
+    def test_loop_variable_keeps_last_value(self):
+        code = '''var count = 0
+for i in (0 to 10 by 1):
+    count = count + 1
+    if count == 4:
+        break
+for j in (0 to 5 by 1):
+    count = count + 1'''
+        interpreter = Interpreter()
+        interpreter.run(Parser(lexer(code)).parse())
+        assert interpreter.env["i"] == 3
+        assert interpreter.env["j"] == 4
+        assert interpreter.env["count"] == 9
+
+    def test_break_only_leaves_inner_loop(self):
+        code = '''for i in (0 to 3 by 1):
+    for j in (0 to 3 by 1):
+        if j == 1:
+            break
+        say(i + ":" + j)'''
+        interpreter = Interpreter()
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue().splitlines() == ["0:0", "1:0", "2:0"]
+
+    def test_break_outside_loop(self):
+        code = '''func stop():
+    break
+for i in (0 to 3 by 1):
+    stop()'''
+        interpreter = Interpreter()
+        with pytest.raises(SyntaxErrorWithContext) as exc_info:
+            interpreter.run(Parser(lexer(code)).parse())
+        assert "'break' used outside of a loop" in str(exc_info.value)
+
 class TestFunctions:
     """Test function execution"""
     
@@ -81,6 +188,54 @@ say(result)'''
             interpreter.run(Parser(lexer(code)).parse())
             assert fake_out.getvalue().strip() == "7"
 
+    def test_return_from_nested_loop(self):
+        code = '''func find(grid, target):
+    for row in grid:
+        for cell in row:
+            if cell == target:
+                return "found " + cell
+    return "missing"
+var grid[] = [[1, 2], [3, 4]]
+say(find(grid, 3))
+say(find(grid, 7))'''
+        interpreter = Interpreter()
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue().splitlines() == ["found 3", "missing"]
+
+    @pytest.mark.parametrize("call", ["add(1, 2, 3)", "add(1)", "adder.add(1)", "Adder(1)"])
+    def test_argument_count_is_checked(self, call):
+        code = '''func add(a, b):
+    return a + b
+class Adder():
+    func init(a, b):
+        self.a = a
+    func add(a, b):
+        return a + b
+var adder = Adder(1, 2)
+say(''' + call + ''')'''
+        interpreter = Interpreter()
+        with patch('sys.stdout', new=StringIO()):
+            with pytest.raises(SyntaxErrorWithContext) as exc_info:
+                interpreter.run(Parser(lexer(code)).parse())
+        assert "expects 2 arguments" in str(exc_info.value)
+
+    def test_recycled_frames_start_empty(self):
+        code = '''var seen = "global"
+func first(x):
+    var seen = x
+    return seen
+func second():
+    return seen
+say(first("local"))
+say(second())
+say(first("again"))'''
+        interpreter = Interpreter(tier_threshold=0)
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue().splitlines() == ["local", "global", "again"]
+        assert len(interpreter._frames) == 1
+
 class TestDataStructures:
     """Test data structure operations"""
     
@@ -105,6 +260,161 @@ say(person["age"])'''
             assert fake_out.getvalue().splitlines() == ["Alice", "30"]
 
 
+class TestClasses:
+    """Test class instances"""
+
+    POINT = '''class Point():
+    var x int
+    var tags[]
+    func init(x):
+        self.x = x
+    func moved(dx):
+        return self.x + dx
+'''
+
+    def test_instances_share_class_object(self):
+        code = self.POINT + '''var a = Point(1)
+var b = Point(2)
+say(a.moved(10))
+say(b.x)'''
+        interpreter = Interpreter()
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue().splitlines() == ["11", "2"]
+        a, b = interpreter.env["a"], interpreter.env["b"]
+        assert a.cls is b.cls is interpreter.classes["Point"]
+        assert a.methods is b.methods
+        assert a.fields["tags"] is not b.fields["tags"]
+        assert not hasattr(a, "__dict__")
+
+    def test_undeclared_field_belongs_to_one_instance(self):
+        code = self.POINT + '''var a = Point(1)
+var b = Point(2)
+a.label = "first"
+say(a.label)
+say(b.label)'''
+        interpreter = Interpreter()
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            with pytest.raises(SyntaxErrorWithContext) as exc_info:
+                interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue().splitlines() == ["first"]
+        assert "has no field 'label'" in str(exc_info.value)
+
+class TestStructs:
+    """Test struct instances"""
+
+    DOG = '''struct Dog():
+    var name str
+    var age int
+    var legs = 4
+    var tags[]
+    var owner
+var pet = Dog()
+'''
+
+    def test_typed_defaults(self):
+        interpreter = Interpreter()
+        interpreter.run(Parser(lexer(self.DOG)).parse())
+        pet = interpreter.env["pet"]
+        assert pet.fields == {"name": "", "age": 0, "legs": 4, "tags": [], "owner": None}
+        assert pet.struct_name == "Dog"
+        assert not hasattr(pet, "__dict__")
+
+    def test_undeclared_field_allowed_by_default(self):
+        code = self.DOG + '''pet.color = "brown"
+say(pet.color)'''
+        interpreter = Interpreter()
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue().strip() == "brown"
+
+    def test_strict_structs_reject_undeclared_field(self):
+        code = self.DOG + '''pet.age = 3
+pet.color = "brown"'''
+        interpreter = Interpreter(strict_structs=True)
+        with pytest.raises(SyntaxErrorWithContext) as exc_info:
+            interpreter.run(Parser(lexer(code)).parse())
+        assert "has no field 'color'" in str(exc_info.value)
+        assert interpreter.env["pet"].get_field("age") == 3
+
+class TestTypeChecking:
+    """Test type guards on typed declarations"""
+
+    def run_error(self, code):
+        interpreter = Interpreter()
+        with patch('sys.stdout', new=StringIO()):
+            with pytest.raises(SyntaxErrorWithContext) as exc_info:
+                interpreter.run(Parser(lexer(code)).parse())
+        return str(exc_info.value)
+
+    def test_typed_array_elements(self):
+        assert "Expected array of str" in self.run_error('''var fruits[] str = []
+fruits = ["apple", 1]''')
+        assert "Expected str in array" in self.run_error('''var fruits[] str = ["apple"]
+fruits[0] = 5''')
+
+    def test_typed_dict_values(self):
+        assert "Expected int in dict" in self.run_error('''var nums{} int = {}
+nums["a"] = "one"''')
+
+    def test_struct_and_class_fields(self):
+        assert "Expected str, got int" in self.run_error('''struct Dog():
+    var name str
+var pet = Dog()
+pet.name = 1''')
+        assert "Expected int, got str" in self.run_error('''class Counter():
+    var count int
+    func init(start):
+        self.count = start
+var c = Counter("zero")''')
+
+    @pytest.mark.parametrize("tier_threshold", [0, 1])
+    @pytest.mark.parametrize("write, message", [
+        ('bag.items[0] = "x"', "Expected int in array, got str"),
+        ('bag.items.append("oops")', "Expected int in array, got str"),
+        ('box.counts["b"] = "two"', "Expected int in dict, got str"),
+        ('box.counts.set("b", "two")', "Expected int in dict, got str"),
+    ])
+    def test_typed_collection_fields(self, write, message, tier_threshold):
+        code = f'''struct Bag():
+    var items[] int
+class Box():
+    var counts{{}} int
+    func init():
+        self.counts = {{}}
+var bag = Bag()
+var box = Box()
+for i in (0 to 3 by 1):
+    bag.items.append(i)
+    box.counts[i] = i
+    if i == 2:
+        {write}'''
+        interpreter = Interpreter(tier_threshold=tier_threshold)
+        with pytest.raises(SyntaxErrorWithContext) as exc_info:
+            interpreter.run(Parser(lexer(code)).parse())
+        assert message in str(exc_info.value)
+        assert exc_info.value.line_number == 13
+
+    def test_same_name_in_different_functions(self):
+        code = '''func first():
+    var count int = 1
+    return count
+func second():
+    var count = "many"
+    return count
+say(first())
+say(second())'''
+        interpreter = Interpreter()
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue().splitlines() == ["1", "many"]
+
+    def test_global_guard_applies_inside_function(self):
+        assert "Expected int, got str" in self.run_error('''var total int = 0
+func reset():
+    total = "none"
+reset()''')
+
 class TestBuiltins:
     """Test built-in functions"""
     
@@ -115,5 +425,197 @@ class TestBuiltins:
             interpreter.run(Parser(lexer(code)).parse())
             assert interpreter.env["name"] == "Alice"
 
+    def test_native_functions(self):
+        code = '''var nums[] = [3, 1, 4, 1, 5]
+say(len(nums) + " " + min(nums) + " " + max(nums) + " " + sum(nums))
+say(max(2, 9) + abs(-4))
+var total = 0
+for i in range(1, 4):
+    total = total + i
+say(str(total) + "!")
+say(int("12") + float("0.5"))'''
+        interpreter = Interpreter()
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue().splitlines() == ["5 1 5 14", "13", "6!", "12.5"]
+
+    def test_declared_function_shadows_native(self):
+        code = '''func len(x):
+    return "mine"
+say(len([1, 2]))'''
+        interpreter = Interpreter()
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue().strip() == "mine"
+
+    def test_native_errors_are_friendly(self):
+        interpreter = Interpreter()
+        with pytest.raises(SyntaxErrorWithContext) as exc_info:
+            interpreter.run(Parser(lexer('var n = 5\nsay(len(n))')).parse())
+        assert "has no len()" in str(exc_info.value)
+        assert exc_info.value.line_number == 2
+
+class TestNativeMethods:
+    """Test array and dict methods"""
+
+    def run(self, code):
+        interpreter = Interpreter()
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer(code)).parse())
+            return fake_out.getvalue().splitlines()
+
+    def test_array_methods(self):
+        assert self.run('''var xs[] = [3, 1, 2]
+xs.append(5)
+xs.insert(0, 9)
+xs.remove(1)
+say(xs)
+say(xs.pop() + " " + xs.pop(0) + " " + xs.length() + " " + xs.index(2))
+xs.append(0)
+xs.sort()
+say(xs)
+xs.reverse()
+say(xs.slice(0, 2))
+say(xs.contains(3))''') == ["[9, 3, 2, 5]", "5 9 2 1", "[0, 2, 3]", "[3, 2]", "True"]
+
+    def test_dict_methods(self):
+        assert self.run('''var d{} = {"a": 1}
+d.set("b", 2)
+say(d.get("a") + d.length())
+say(d.contains("b"))
+say(d.keys())
+say(d.values())
+say(d.pop("a"))
+d.remove("b")
+say(d)''') == ["3", "True", "['a', 'b']", "[1, 2]", "1", "{}"]
+
+    def test_sort_is_in_place(self):
+        code = '''var xs[] = [2, 1]
+var alias = xs
+xs.sort()'''
+        interpreter = Interpreter()
+        interpreter.run(Parser(lexer(code)).parse())
+        assert interpreter.env["alias"] is interpreter.env["xs"] == [1, 2]
+
+    @pytest.mark.parametrize("code, message", [
+        ('var xs[] int = []\nxs.append("a")', "Expected int in array, got str"),
+        ('var d{} int = {}\nvar v = "x"\nd.set("k", v)', "Expected int in dict, got str"),
+        ('var xs[] = []\nxs.frob()', "Array has no method 'frob'"),
+        ('var d{} = {}\nd.set("k")', "Dict method 'set' expects 2 arguments, got 1"),
+        ('var xs[] = [1]\nxs.remove(7)', "7 is not in the array"),
+        ('var d{} = {}\nd.remove("k")', "'k' is not in the dict"),
+    ])
+    def test_method_errors(self, code, message):
+        interpreter = Interpreter()
+        with pytest.raises(SyntaxErrorWithContext) as exc_info:
+            interpreter.run(Parser(lexer(code)).parse())
+        assert message in str(exc_info.value)
+        assert exc_info.value.line_number == code.count("\n") + 1
+
+class TestRuntimeErrors:
+    """Test runtime error reporting"""
+
+    def test_error_reports_line_inside_function(self):
+        code = '''func lookup(d):
+    var key = "k"
+    return d[key] + 1
+var d{} = {}
+say(lookup(d))'''
+        interpreter = Interpreter()
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            with pytest.raises(SyntaxErrorWithContext) as exc_info:
+                interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue() == ""
+        assert exc_info.value.line_number == 3
+        assert "Index error" in str(exc_info.value)
+        assert "ReturnStmt" in str(exc_info.value)
+
+    def test_undefined_variable_keeps_hint(self):
+        code = '''var x = 1
+say(x + y)'''
+        interpreter = Interpreter()
+        with pytest.raises(SyntaxErrorWithContext) as exc_info:
+            interpreter.run(Parser(lexer(code)).parse())
+        assert exc_info.value.line_number == 2
+        assert "Undefined variable 'y'" in str(exc_info.value)
+        assert "Make sure variable exists" in str(exc_info.value)
+
+class TestOutput:
+    """Test the buffered output sink behind say()"""
+
+    def test_output_to_stream_without_patching_stdout(self):
+        out = StringIO()
+        interpreter = Interpreter(output=out)
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer('say("a")\nsay(1 + 2)')).parse())
+            assert fake_out.getvalue() == ""
+        assert out.getvalue() == "a\n3\n"
+
+    def test_callback_receives_batched_output(self):
+        chunks = []
+        code = '''for i in (0 to 3 by 1):
+    say(i)'''
+        Interpreter(output=chunks.append).run(Parser(lexer(code)).parse())
+        assert chunks == ["0\n1\n2\n"]
+
+    def test_unbuffered_writes_every_line(self):
+        chunks = []
+        code = '''for i in (0 to 3 by 1):
+    say(i)'''
+        Interpreter(output=chunks.append, buffer_size=0).run(Parser(lexer(code)).parse())
+        assert chunks == ["0\n", "1\n", "2\n"]
+
+    def test_output_is_flushed_before_ask(self):
+        out = StringIO()
+        seen = []
+        code = '''say("Welcome")
+var name = ask("Name? ")
+say("Hi " + name)'''
+        interpreter = Interpreter(output=out)
+        with patch('builtins.input', side_effect=lambda prompt: seen.append(out.getvalue()) or "Ann"):
+            interpreter.run(Parser(lexer(code)).parse())
+        assert seen == ["Welcome\n"]
+        assert out.getvalue() == "Welcome\nHi Ann\n"
+
+    def test_output_is_flushed_when_an_error_stops_the_program(self):
+        out = StringIO()
+        code = '''say("before")
+say(missing)'''
+        with pytest.raises(SyntaxErrorWithContext):
+            Interpreter(output=out).run(Parser(lexer(code)).parse())
+        assert out.getvalue() == "before\n"
+
+class TestInput:
+    """Test scripted answers for ask()"""
+
+    CODE = '''var name = ask("Name? ")
+var age = ask("Age? ")
+say(name + " is " + age)'''
+
+    def test_answers_from_list(self):
+        out = StringIO()
+        Interpreter(output=out, input=["Ann", "31"]).run(Parser(lexer(self.CODE)).parse())
+        assert out.getvalue() == "Name? Age? Ann is 31\n"
+
+    def test_answers_from_stream_without_prompts(self):
+        out = StringIO()
+        interpreter = Interpreter(output=out, input=StringIO("Bob\n40\n"), prompts=False)
+        interpreter.run(Parser(lexer(self.CODE)).parse())
+        assert out.getvalue() == "Bob is 40\n"
+
+    def test_answers_from_file(self, tmp_path):
+        answers = tmp_path / "answers.txt"
+        answers.write_text("Cy\n22\n")
+        out = StringIO()
+        interpreter = Interpreter(output=out, input=InputSource.from_file(answers, prompts=False))
+        interpreter.run(Parser(lexer(self.CODE)).parse())
+        assert out.getvalue() == "Cy is 22\n"
+
+    def test_running_out_of_answers(self):
+        with pytest.raises(SyntaxErrorWithContext) as exc_info:
+            Interpreter(output=StringIO(), input="Dee").run(Parser(lexer(self.CODE)).parse())
+        assert exc_info.value.line_number == 2
+        assert "no more input" in str(exc_info.value)
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
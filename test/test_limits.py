@@ -0,0 +1,242 @@
+import pytest # type: ignore
+import sys
+import os
+import threading
+from io import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.nexus import compile
+from src.nexus.limits import BudgetExceeded, Limits, collection_items
+from src.nexus.parser import SyntaxErrorWithContext
+
+
+SPIN = '''var y = 0
+for:
+    y = y + 1'''
+
+COUNTED = '''var total = 0
+for i in (0 to 10 by 1):
+    total = total + i
+say(total)'''
+
+CALLS = '''func f(x):
+    return x + 1
+var t = 0
+for i in (0 to 4 by 1):
+    t = f(t)
+say(t)'''
+
+
+class TestLimits:
+    """Test step, time and memory budgets"""
+
+    def test_step_budget_stops_infinite_loop(self):
+        with pytest.raises(BudgetExceeded) as info:
+            compile(SPIN, max_steps=5000).run()
+        assert info.value.budget == "steps"
+        assert info.value.line_number == 2
+        assert "Step limit exceeded" in str(info.value)
+
+    @pytest.mark.parametrize("tier_threshold", [0, 1])
+    def test_steps_are_counted_exactly(self, tier_threshold):
+        out = StringIO()
+        compile(COUNTED, tier_threshold=tier_threshold, max_steps=10).run(stdout=out)
+        assert out.getvalue() == "45\n"
+        with pytest.raises(BudgetExceeded):
+            compile(COUNTED, tier_threshold=tier_threshold, max_steps=9).run()
+
+    def test_calls_count_as_steps(self):
+        # Not optimized, so f() isn't inlined: 4 iterations + 4 calls
+        compile(CALLS, optimize=False, max_steps=8).run(stdout=StringIO())
+        with pytest.raises(BudgetExceeded):
+            compile(CALLS, optimize=False, max_steps=7).run()
+
+    def test_long_loop_with_calls(self):
+        # Calls tick the countdown the loop's chunks were charged against
+        code = '''func f(a):
+    return a
+var total = 0
+for i in (0 to 5000 by 1):
+    total = total + f(i)
+say(total)'''
+        out = StringIO()
+        compile(code, optimize=False, tier_threshold=0, max_steps=10**9).run(stdout=out)
+        assert out.getvalue() == "12497500\n"
+        with pytest.raises(BudgetExceeded) as info:
+            compile(code, optimize=False, tier_threshold=0, max_steps=6000).run()
+        assert info.value.budget == "steps"
+
+    def test_time_budget(self):
+        with pytest.raises(BudgetExceeded) as info:
+            compile(SPIN, time_limit=0.05).run()
+        assert info.value.budget == "time"
+
+    def test_memory_budget_sees_nested_collections_in_functions(self):
+        code = '''func build():
+    var rows{} = {}
+    var i = 0
+    for:
+        rows[i] = [1, 2, 3]
+        i = i + 1
+build()'''
+        with pytest.raises(BudgetExceeded) as info:
+            compile(code, max_items=10000).run()
+        assert info.value.budget == "items"
+
+    def test_memory_budget_refuses_a_huge_range_up_front(self):
+        with pytest.raises(BudgetExceeded) as info:
+            compile("var xs = range(50000000)", max_items=1000).run()
+        assert info.value.budget == "items"
+        assert "range() would build 50000000 items" in str(info.value)
+        out = StringIO()
+        compile("say(len(range(0, 1000, 2)))", max_items=1000).run(stdout=out)
+        assert out.getvalue() == "500\n"
+
+    @pytest.mark.parametrize("kind", ["struct", "class"])
+    def test_memory_budget_sees_collections_in_fields(self, kind):
+        code = f'''{kind} Bag():
+    var items[] int
+var b = Bag()
+var i = 0
+for:
+    b.items.append(i)
+    i = i + 1'''
+        with pytest.raises(BudgetExceeded) as info:
+            compile(code, max_items=1000, max_steps=10**6).run()
+        assert info.value.budget == "items"
+
+    def test_budgets_apply_to_each_run(self):
+        program = compile(COUNTED, max_steps=10)
+        for _ in range(3):
+            program.run(stdout=StringIO())
+
+    def test_collection_items_estimate(self):
+        assert collection_items([[1, 2], [3, 4], [5, 6]]) == 9
+        assert collection_items({"a": [1, 2, 3]}) == 4
+        assert collection_items("text") == 0
+        bag = compile('''struct Bag():
+    var rows[]
+var bag = Bag()
+bag.rows = [[1, 2], [3, 4]]''').run()["bag"]
+        assert collection_items(bag) == 6
+        assert collection_items([bag, bag]) == 14
+
+    def test_meter_charges_partial_loops_at_most_twice(self):
+        limits = Limits(max_steps=10 ** 6)
+        for value in limits.meter(range(1000), None):
+            if value == 99:
+                break
+        charged = limits.interval - limits.countdown
+        assert 100 <= charged <= 2 * 100 + 16
+
+
+DEPTH = '''func depth(n):
+    if n == 0:
+        return 0
+    return 1 + depth(n - 1)
+say(depth(N))'''
+
+WALKER = '''class Walker():
+    var steps int
+    func init():
+        self.steps = 0
+    func walk(n):
+        if n == 0:
+            return self.steps
+        self.steps = self.steps + 1
+        return self.walk(n - 1)
+var w = Walker()
+say(w.walk(N))'''
+
+MIXED = '''class Counter():
+    var total int
+    func init(start):
+        self.total = start
+    func add(n):
+        self.total = self.total + n
+        return self.total
+struct Box():
+    var items[] int
+func twice(n):
+    return n * 2
+func walk(n):
+    if n == 0:
+        return []
+    var rest = walk(n - 1)
+    rest.append(twice(n))
+    return rest
+var c = Counter(twice(1))
+var box = Box()
+for i in (0 to 6 by 1):
+    if i == 4:
+        continue
+    if i == 5:
+        break
+    box.items.append(c.add(twice(i)))
+say(box.items)
+say(walk(4))
+var pairs = {"a": twice(3), "b": [twice(4), c.add(1)]}
+say(pairs)
+for item in walk(3):
+    say(item + twice(item))
+say(c.total)'''
+
+
+class TestRecursion:
+    """Test deep recursion and the Nexus-level depth limit"""
+
+    @pytest.mark.parametrize("code", [DEPTH, WALKER])
+    def test_deep_recursion(self, code):
+        out = StringIO()
+        compile(code.replace("N", "20000"), deep_recursion=True).run(stdout=out)
+        assert out.getvalue() == "20000\n"
+
+    def test_python_limit_gives_friendly_error(self):
+        with pytest.raises(SyntaxErrorWithContext) as info:
+            compile(DEPTH.replace("N", "20000")).run()
+        assert "Maximum recursion depth exceeded" in str(info.value)
+        assert "--deep-recursion" in str(info.value)
+
+    @pytest.mark.parametrize("deep_recursion", [False, True])
+    def test_max_depth(self, deep_recursion):
+        program = compile(DEPTH.replace("N", "50"), optimize=False,
+                          deep_recursion=deep_recursion, max_depth=50)
+        with pytest.raises(SyntaxErrorWithContext) as info:
+            program.run()
+        assert "more than 50 nested calls" in str(info.value)
+        assert info.value.line_number == 4
+        out = StringIO()
+        compile(DEPTH.replace("N", "49"), max_depth=50).run(stdout=out)
+        assert out.getvalue() == "49\n"
+
+    def test_deep_mode_runs_like_normal_mode(self):
+        outputs = []
+        for deep_recursion in (False, True):
+            out = StringIO()
+            compile(MIXED, deep_recursion=deep_recursion).run(stdout=out)
+            outputs.append(out.getvalue())
+        assert outputs[1] == outputs[0] == \
+            "[2, 4, 8, 14]\n[2, 4, 6, 8]\n{'a': 6, 'b': [8, 15]}\n6\n12\n18\n15\n"
+
+    def test_deep_recursion_changes_nothing_process_wide(self, monkeypatch):
+        def refuse(*args):
+            raise AssertionError("deep recursion changed a process-wide setting")
+        monkeypatch.setattr(sys, "setrecursionlimit", refuse)
+        monkeypatch.setattr(threading, "stack_size", refuse)
+
+        # Safe on ordinary threads, next to each other
+        program = compile(DEPTH.replace("N", "5000"), deep_recursion=True)
+        outputs = []
+
+        def run():
+            out = StringIO()
+            program.run(stdout=out)
+            outputs.append(out.getvalue())
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert outputs == ["5000\n"] * 4
@@ -0,0 +1,196 @@
+import pytest # type: ignore
+import sys
+import os
+from io import StringIO
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.nexus.interpreter import Interpreter
+from src.nexus.optimizer import optimize, walk_all, HoistedExpr, _inline_call
+from src.nexus.parser import Parser, FuncCall, BinaryOp, AskStmt, Literal
+from src.nexus.lexer import lexer
+
+
+def calls_in(ast, name):
+    return [n for n in walk_all(ast) if isinstance(n, FuncCall) and n.name == name]
+
+
+def run_optimized(code):
+    interpreter = Interpreter(optimize=True)
+    with patch('sys.stdout', new=StringIO()) as fake_out:
+        interpreter.run(Parser(lexer(code)).parse())
+        return fake_out.getvalue().splitlines()
+
+
+class TestInlining:
+    """Test the small-function inlining pass"""
+
+    def test_inlines_single_return_function(self):
+        code = '''func add(a, b):
+    return a + b
+var x = 2
+say(add(x, 3))'''
+        ast = optimize(Parser(lexer(code)).parse())
+        assert calls_in(ast, "add") == []
+        assert isinstance(ast[2].expr, BinaryOp)
+        assert run_optimized(code) == ["5"]
+
+    def test_swapped_arguments_are_substituted_simultaneously(self):
+        code = '''func sub(a, b):
+    return a - b
+var a = 10
+var b = 3
+say(sub(b, a))'''
+        ast = optimize(Parser(lexer(code)).parse())
+        assert calls_in(ast, "sub") == []
+        assert run_optimized(code) == ["-7"]
+
+    def test_recursive_function_is_not_inlined(self):
+        code = '''func loop(n):
+    return loop(n)
+var x = loop(1)'''
+        ast = optimize(Parser(lexer(code)).parse())
+        assert len(calls_in(ast, "loop")) == 2
+
+    def test_function_reading_globals_is_not_inlined(self):
+        code = '''var scale = 10
+func scaled(a):
+    return a * scale
+func run(scale):
+    say(scaled(scale))
+run(2)'''
+        ast = optimize(Parser(lexer(code)).parse())
+        assert len(calls_in(ast, "scaled")) == 1
+        assert run_optimized(code) == ["20"]
+
+    def test_call_argument_used_twice_is_not_inlined(self):
+        code = '''func square(a):
+    return a * a
+func next():
+    say("called")
+    return 3
+say(square(next()))'''
+        ast = optimize(Parser(lexer(code)).parse())
+        assert len(calls_in(ast, "square")) == 1
+        assert run_optimized(code) == ["called", "9"]
+
+    def test_ask_argument_is_not_inlined(self):
+        # Inlined, ask() would run after greet() has already said hello
+        code = '''func shout(a):
+    return greet() + a'''
+        decl = Parser(lexer(code)).parse()[0]
+        call = FuncCall("shout", [AskStmt(Literal("Name? "))])
+        assert _inline_call(call, decl) is None
+
+    def test_call_before_declaration_is_not_inlined(self):
+        code = '''say("start")
+var x = double(2)
+func double(a):
+    return a * 2
+say(double(4))'''
+        ast = optimize(Parser(lexer(code)).parse())
+        assert len(calls_in(ast, "double")) == 1
+
+    def test_statement_call_is_kept(self):
+        code = '''func add(a, b):
+    return a + b
+func main():
+    add(1, 2)
+    say(add(1, 2))
+main()'''
+        ast = optimize(Parser(lexer(code)).parse())
+        assert len(calls_in(ast, "add")) == 1
+        assert run_optimized(code) == ["3"]
+
+
+def hoisted_in(ast):
+    return [n for n in walk_all(ast) if isinstance(n, HoistedExpr)]
+
+
+class TestLoopInvariantHoisting:
+    """Test loop-invariant code motion"""
+
+    def test_hoists_invariant_arithmetic(self):
+        code = '''var limit = 3
+var total = 0
+for i in (0 to 4 by 1):
+    total = total + limit * 2'''
+        ast = optimize(Parser(lexer(code)).parse())
+        hoisted = hoisted_in(ast)
+        assert len(hoisted) == 1
+        assert isinstance(hoisted[0].expr, BinaryOp)
+        assert hoisted[0].expr.op == "*"
+
+        interpreter = Interpreter(optimize=True)
+        interpreter.run(Parser(lexer(code)).parse())
+        assert interpreter.env["total"] == 24
+
+    @pytest.mark.parametrize("tier_threshold", [0, 1])
+    def test_hoisted_slots_are_removed_after_the_loop(self, tier_threshold):
+        code = '''var limit = 3
+var total = 0
+func run():
+    for j in (0 to 3 by 1):
+        for i in (0 to 4 by 1):
+            total = total + limit * j
+        if j == 1:
+            break
+run()
+for i in (0 to 4 by 1):
+    total = total + limit * 2'''
+        interpreter = Interpreter(optimize=True, tier_threshold=tier_threshold)
+        interpreter.run(Parser(lexer(code)).parse())
+        assert interpreter.env["total"] == 36
+        assert [name for name in interpreter.env.vars if name.startswith("$")] == []
+
+    def test_hoists_dict_lookup_in_for_each(self):
+        code = '''var config{} = {"threshold": 2}
+var items[] = [1, 2, 3, 4]
+for item in items:
+    if item > config["threshold"]:
+        say(item)'''
+        ast = optimize(Parser(lexer(code)).parse())
+        assert len(hoisted_in(ast)) == 1
+        assert run_optimized(code) == ["3", "4"]
+
+    def test_written_variable_is_not_hoisted(self):
+        code = '''var step = 1
+var total = 0
+for i in (0 to 3 by 1):
+    total = total + step * 2
+    step = step + 1'''
+        ast = optimize(Parser(lexer(code)).parse())
+        assert hoisted_in(ast) == []
+
+        interpreter = Interpreter(optimize=True)
+        interpreter.run(Parser(lexer(code)).parse())
+        assert interpreter.env["total"] == 12
+
+    def test_index_read_not_hoisted_when_body_writes_items(self):
+        code = '''var nums[] = [1, 2]
+var alias = nums
+for i in (0 to 3 by 1):
+    alias[0] = i
+    say(nums[0] + 1)'''
+        ast = optimize(Parser(lexer(code)).parse())
+        assert hoisted_in(ast) == []
+        assert run_optimized(code) == ["1", "2", "3"]
+
+    def test_body_with_call_is_left_alone(self):
+        code = '''var factor = 2
+func bump():
+    say("bump")
+for i in (0 to 2 by 1):
+    bump()
+    say(factor * 10)'''
+        ast = optimize(Parser(lexer(code)).parse())
+        assert hoisted_in(ast) == []
+
+    def test_failing_invariant_only_errors_when_reached(self):
+        code = '''var d{} = {}
+for i in (0 to 3 by 1):
+    if i > 10:
+        say(d["missing"] + 1)
+say("done")'''
+        assert run_optimized(code) == ["done"]
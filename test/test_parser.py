@@ -385,6 +385,17 @@ class TestFunctions:
         assert isinstance(ast[0].args[0], Literal)
         assert ast[0].args[0].value == "Dale"
 
+    def test_type_conversion_call(self):
+        code = 'say(str(5))'
+        tokens = lexer(code)
+        parser = Parser(tokens)
+        ast = parser.parse()
+        
+        call = ast[0].expr
+        assert isinstance(call, FuncCall)
+        assert call.name == "str"
+        assert isinstance(call.args[0], Literal)
+
 
 class TestArrays:
     """Test array declaration and operations"""
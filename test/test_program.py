@@ -0,0 +1,194 @@
+import pytest # type: ignore
+import sys
+import os
+import threading
+from io import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.nexus import compile, Program, ProgramCache
+from src.nexus.parser import SyntaxErrorWithContext, BinaryOp, FuncDecl
+from src.nexus.optimizer import walk_all
+
+
+GREETER = '''struct Point():
+    var x int
+    var y int
+func label(p):
+    return "(" + p.x + ", " + p.y + ")"
+var name = ask("Name? ")
+var p = Point()
+p.x = offset
+p.y = offset * 2
+say("Hi " + name + " at " + label(p))'''
+
+
+class TestProgram:
+    """Test compiled programs shared between runs"""
+
+    def test_runs_are_independent(self):
+        program = compile(GREETER)
+        first, second = StringIO(), StringIO()
+        g1 = program.run(stdin=["Ann"], stdout=first, globals={"offset": 1})
+        g2 = program.run(stdin=["Bob"], stdout=second, globals={"offset": 5}, prompts=False)
+        assert first.getvalue() == "Name? Hi Ann at (1, 2)\n"
+        assert second.getvalue() == "Hi Bob at (5, 10)\n"
+        assert g1["name"] == "Ann" and g2["name"] == "Bob"
+        # The struct type is built once, when the program is compiled
+        assert type(g1["p"]) is type(g2["p"])
+
+    def test_program_is_immutable(self):
+        program = compile('say("hi")')
+        with pytest.raises(AttributeError):
+            program.statements = ()
+        assert isinstance(program, Program)
+        assert isinstance(program.statements, tuple)
+
+    def test_errors_are_raised_per_run_and_at_compile_time(self):
+        with pytest.raises(SyntaxErrorWithContext):
+            compile('var = 1')
+        with pytest.raises(SyntaxErrorWithContext):
+            compile('var n int = "x"', unchecked=True)
+
+        program = compile('say(missing)')
+        with pytest.raises(SyntaxErrorWithContext) as exc_info:
+            program.run(stdout=StringIO())
+        assert "Undefined variable 'missing'" in str(exc_info.value)
+
+    def test_concurrent_runs_from_many_threads(self):
+        program = compile('''class Counter():
+    var count int
+    func init():
+        self.count = 0
+    func bump(amount):
+        self.count = self.count + amount
+var c = Counter()
+var total = 0
+for i in (0 to 200 by 1):
+    c.bump(i)
+    total = total + seed
+say(c.count + total)''', tier_threshold=10)
+        results = {}
+
+        def worker(n):
+            outputs = []
+            for _ in range(20):
+                out = StringIO()
+                program.run(stdout=out, globals={"seed": n})
+                outputs.append(out.getvalue())
+            results[n] = outputs
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(results) == list(range(8))
+        for n, outputs in results.items():
+            assert outputs == [f"{19900 + 200 * n}\n"] * 20
+
+
+    def test_concurrent_runs_share_no_mutable_node_state(self):
+        # Quickening would specialize `i < limit` and `total + i` in place
+        program = compile('''class Bag():
+    var n int
+func shout(word):
+    var loud = word + "!"
+    return loud
+var total = 0
+var text = ""
+for i in (0 to 300 by 1):
+    if i < limit:
+        total = total + i
+    text = shout("x")
+var bag = Bag()
+bag.n = total
+bag.extra = text
+say(total + " " + text)''', tier_threshold=10 ** 9)
+        failures = []
+
+        def worker(n):
+            try:
+                for _ in range(10):
+                    out = StringIO()
+                    result = program.run(stdout=out, globals={"limit": n * 10})
+                    total = sum(range(n * 10))
+                    assert out.getvalue() == f"{total} x!\n"
+                    assert result["bag"].fields == {"n": total, "extra": "x!"}
+            except Exception as e:
+                failures.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert failures == []
+        assert all(type(node) is BinaryOp for node in walk_all(program.statements)
+                   if isinstance(node, BinaryOp))
+        shout = next(node for node in program.statements if isinstance(node, FuncDecl))
+        assert program._template._tier_counts[shout] == 8 * 10 * 300
+
+class TestProgramCache:
+    """Test the LRU cache of compiled programs"""
+
+    def test_hits_return_the_same_program(self):
+        cache = ProgramCache()
+        first = cache.compile('say("a")')
+        assert cache.compile('say("a")') is first
+        assert cache.compile('say("a")', unchecked=True) is not first
+        assert cache.stats() == {"entries": 2, "bytes": cache.size, "hits": 1,
+                                 "misses": 2, "evictions": 0}
+
+    def test_least_recently_used_is_evicted(self):
+        cache = ProgramCache(max_entries=2)
+        cache.compile('say(1)')
+        cache.compile('say(2)')
+        cache.compile('say(1)')  # Now say(2) is the oldest
+        cache.compile('say(3)')
+        assert 'say(1)' in cache and 'say(3)' in cache
+        assert 'say(2)' not in cache
+        assert cache.evictions == 1
+
+    def test_memory_bound(self):
+        small = ProgramCache()
+        small.compile('say(1)')
+        one_program = small.size
+        cache = ProgramCache(max_bytes=one_program * 2 + 1)
+        for n in range(5):
+            cache.compile(f'say({n})')
+        assert len(cache) == 2
+        assert cache.size <= cache.max_bytes
+        assert cache.evictions == 3
+
+    def test_errors_are_not_cached(self):
+        cache = ProgramCache()
+        for _ in range(2):
+            with pytest.raises(SyntaxErrorWithContext):
+                cache.compile('var = 1')
+        assert len(cache) == 0
+        assert cache.misses == 2
+
+    def test_shared_between_threads(self):
+        cache = ProgramCache(max_entries=4)
+        sources = [f'say({n})' for n in range(6)]
+
+        def worker():
+            for _ in range(50):
+                for source in sources:
+                    out = StringIO()
+                    cache.compile(source).run(stdout=out)
+                    assert out.getvalue() == source[4:-1] + "\n"
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = cache.stats()
+        assert stats["hits"] + stats["misses"] == 4 * 50 * 6
+        assert stats["entries"] == 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
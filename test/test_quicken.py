@@ -0,0 +1,88 @@
+import pytest # type: ignore
+import sys
+import os
+from io import StringIO
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.nexus.interpreter import Interpreter
+from src.nexus.parser import Parser, BinaryOp
+from src.nexus.lexer import lexer
+from src.nexus.quicken import IntOpLocalConst, StrOpLocalLocal
+
+
+def run(code, quicken=True):
+    ast = Parser(lexer(code)).parse()
+    interpreter = Interpreter(quicken=quicken, tier_threshold=0)
+    with patch('sys.stdout', new=StringIO()) as fake_out:
+        interpreter.run(ast)
+    return ast, fake_out.getvalue().splitlines()
+
+
+class TestQuickening:
+    """Test self-specializing BinaryOp nodes"""
+
+    def test_stable_int_compare_specializes(self):
+        code = '''var n = 0
+for i in (0 to 20 by 1):
+    if i < 10:
+        n = n + 1
+say(n)'''
+        ast, output = run(code)
+        assert output == ["10"]
+        condition = ast[1].body[0].condition
+        assert type(condition) is IntOpLocalConst
+        assert isinstance(condition, BinaryOp)
+
+    def test_string_concat_of_two_locals(self):
+        code = '''func greet(first, last):
+    return first + last
+for i in (0 to 10 by 1):
+    say(greet("a", "b"))'''
+        ast, output = run(code)
+        assert output == ["ab"] * 10
+        assert type(ast[0].body[0].expr) is StrOpLocalLocal
+
+    def test_type_change_deoptimizes(self):
+        code = '''func add(a, b):
+    return a + b
+for i in (0 to 12 by 1):
+    say(add(i, 1))
+say(add("x", 1))
+say(add(2.5, 1))'''
+        ast, output = run(code)
+        assert output[-2:] == ["x1", "3.5"]
+        node = ast[0].body[0].expr
+        assert type(node) is BinaryOp
+        assert node.quick_deopts == 1
+
+    def test_disabled_quickening_leaves_nodes_alone(self):
+        code = '''for i in (0 to 20 by 1):
+    var x = i + 1'''
+        ast, _ = run(code, quicken=False)
+        assert type(ast[0].body[0].value) is BinaryOp
+
+    def test_verify_mode_matches_generic(self):
+        code = '''var total = 0
+var label = ""
+for i in (0 to 30 by 1):
+    total = total + i % 7
+    if i >= 15:
+        label = "hi"
+    else:
+        label = "lo"
+    var tag = label + label
+    if tag == "hihi":
+        total = total - 1
+say(total)
+say(label)'''
+        _, expected = run(code, quicken=False)
+        _, verified = run(code, quicken="verify")
+        assert verified == expected
+
+    def test_mode_from_environment(self):
+        with patch.dict(os.environ, {"NEXUS_QUICKEN": "0"}):
+            assert Interpreter().quicken is False
+        with patch.dict(os.environ, {"NEXUS_QUICKEN": "verify"}):
+            assert Interpreter().quicken == "verify"
@@ -0,0 +1,122 @@
+import pytest # type: ignore
+import sys
+import os
+from io import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.nexus.interpreter import Interpreter
+from src.nexus.parser import Parser, SyntaxErrorWithContext
+from src.nexus.lexer import lexer
+from src.nexus.output import OutputSink
+from src.nexus.snapshot import SnapshotError, MAGIC
+
+
+PRELUDE = '''struct Point():
+    var x int
+    var y int
+class Counter():
+    var count int
+    func init(start):
+        self.count = start
+    func bump():
+        self.count = self.count + 1
+        return self.count
+func area(p):
+    return p.x * p.y
+var origin = Point()
+origin.label = "o"
+var counter = Counter(10)
+counter.note = "added"
+var log str = ""
+for i in (0 to 3 by 1):
+    log = log + i
+var limit int = 5
+var names[] str = ["a", "b"]'''
+
+MAIN = '''var p = Point()
+p.x = 3
+p.y = 4
+say(area(p))
+say(counter.bump())
+say(counter.note + " " + origin.label + " " + log)
+say(names[1])'''
+
+
+def run(code, interpreter=None):
+    interpreter = interpreter or Interpreter()
+    out = StringIO()
+    interpreter.output = OutputSink(out)
+    interpreter.run(Parser(lexer(code)).parse())
+    return out.getvalue(), interpreter
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    prelude = tmp_path / "prelude.nx"
+    prelude.write_text(PRELUDE)
+    path = tmp_path / "prelude.snap"
+    _, interpreter = run(PRELUDE)
+    interpreter.snapshot(path, sources=[prelude])
+    return path, prelude
+
+
+class TestSnapshot:
+    """Test saving and restoring interpreter state"""
+
+    def test_restore_matches_running_the_prelude(self, snapshot):
+        path, _ = snapshot
+        expected, _ = run(PRELUDE + "\n" + MAIN)
+
+        restored = Interpreter()
+        restored.restore(path)
+        output, _ = run(MAIN, restored)
+        assert output == expected == "12\n11\nadded o 012\nb\n"
+
+    def test_type_guards_survive(self, snapshot):
+        path, _ = snapshot
+        for code, message in [('limit = "many"', "Expected int, got str"),
+                              ('names[0] = 1', "Expected str in array, got int"),
+                              ('counter.count = "x"', "Expected int, got str"),
+                              ('origin.x = 1.5', "Expected int, got float")]:
+            restored = Interpreter()
+            restored.restore(path)
+            with pytest.raises(SyntaxErrorWithContext) as exc_info:
+                run(code, restored)
+            assert message in str(exc_info.value)
+
+    def test_restored_functions_keep_error_lines(self, snapshot):
+        path, _ = snapshot
+        restored = Interpreter()
+        restored.restore(path)
+        with pytest.raises(SyntaxErrorWithContext) as exc_info:
+            run('say(area(5))', restored)
+        assert exc_info.value.line_number == 12
+
+    def test_stale_snapshots_are_refused(self, snapshot):
+        path, prelude = snapshot
+        prelude.write_text(PRELUDE + "\nvar extra = 1")
+        with pytest.raises(SnapshotError, match="changed after the snapshot was taken"):
+            Interpreter().restore(path)
+
+    def test_unknown_format_and_foreign_files(self, snapshot, tmp_path):
+        path, _ = snapshot
+        data = path.read_bytes().replace(b'"format": 1', b'"format": 99', 1)
+        path.write_bytes(data)
+        with pytest.raises(SnapshotError, match="format 99"):
+            Interpreter().restore(path)
+
+        other = tmp_path / "other.snap"
+        other.write_bytes(b"hello")
+        with pytest.raises(SnapshotError, match="not a Nexus snapshot"):
+            Interpreter().restore(other)
+
+        damaged = tmp_path / "damaged.snap"
+        damaged.write_bytes(MAGIC + b'{"format": 1, "nexus": "0.1.0", "python": "%d.%d"}\n'
+                            % sys.version_info[:2] + b"garbage")
+        with pytest.raises(SnapshotError, match="damaged"):
+            Interpreter().restore(damaged)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
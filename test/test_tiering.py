@@ -0,0 +1,157 @@
+import pytest # type: ignore
+import sys
+import os
+from io import StringIO
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.nexus.interpreter import Interpreter
+from src.nexus.parser import Parser, SyntaxErrorWithContext
+from src.nexus.lexer import lexer
+
+
+PROGRAMS = {
+    "loop control": '''var total = 0
+for i in (0 to 20 by 1):
+    if i % 2 == 0:
+        continue
+    if i > 15:
+        break
+    total = total + i
+say(total)
+say(i)''',
+
+    "nested loops and floats": '''var count = 0
+for i in (inclusive 3 to 0 by -1):
+    for x in (0 to 1 by 0.5):
+        count = count + 1
+        say(i + ":" + x)
+say(count)''',
+
+    "functions and globals": '''var calls = 0
+func fib(n):
+    calls = calls + 1
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+func first_over(items, limit):
+    for item in items:
+        if item > limit:
+            return item
+    return -1
+say(fib(10))
+say(calls)
+say(first_over([1, 5, 9, 12], 8))
+say(first_over([1, 2], 8))''',
+
+    "early returns": '''func sign(n):
+    if n < 0:
+        return -1
+    if n == 0:
+        return 0
+    return 1
+func first_even(items):
+    for item in items:
+        if item % 2 == 1:
+            continue
+        return item
+var total = 0
+for i in (-3 to 4 by 1):
+    total = total + sign(i)
+    say(first_even([i, i + 1, i + 2]))
+say(total)''',
+
+    "strings and collections": '''var s = ""
+var seen{} = {}
+var words[] = ["a", "b", "a", "c"]
+for w in words:
+    s = s + w + "-"
+    seen[w] = True
+for key in seen:
+    say(key)
+say(s)
+say(words[1] + words[2])''',
+
+    "classes": '''class Counter():
+    var count int
+    func init(start):
+        self.count = start
+    func bump(amount):
+        self.count = self.count + amount
+        return self.count
+var c = Counter(1)
+for i in (0 to 5 by 1):
+    c.bump(i)
+say(c.count)''',
+}
+
+
+def run(code, tier_threshold):
+    interpreter = Interpreter(tier_threshold=tier_threshold)
+    with patch('sys.stdout', new=StringIO()) as fake_out:
+        interpreter.run(Parser(lexer(code)).parse())
+    return fake_out.getvalue().splitlines(), interpreter
+
+
+class TestTieredExecution:
+    """Compiled code must behave exactly like the tree-walker"""
+
+    @pytest.mark.parametrize("name", sorted(PROGRAMS))
+    def test_compiled_tier_matches_interpreter(self, name):
+        code = PROGRAMS[name]
+        interpreted, _ = run(code, tier_threshold=0)
+        compiled, interpreter = run(code, tier_threshold=1)
+        assert compiled == interpreted
+        assert interpreter.tier_events
+
+    def test_disabled_tiering_compiles_nothing(self):
+        _, interpreter = run(PROGRAMS["functions and globals"], tier_threshold=0)
+        assert interpreter.tier_events == []
+
+    def test_hot_loop_tiers_up_once(self):
+        code = '''var total = 0
+for i in (0 to 50 by 1):
+    total = total + i
+say(total)'''
+        output, interpreter = run(code, tier_threshold=10)
+        assert output == ["1225"]
+        assert [(e.kind, e.name, e.count) for e in interpreter.tier_events] == [("loop", "i", 10)]
+
+    def test_tier_event_callback(self):
+        code = '''func double(x):
+    return x * 2
+for i in (0 to 5 by 1):
+    say(double(i))'''
+        events = []
+        interpreter = Interpreter(tier_threshold=3, on_tier_event=events.append)
+        with patch('sys.stdout', new=StringIO()):
+            interpreter.run(Parser(lexer(code)).parse())
+        assert ("function", "double") in [(e.kind, e.name) for e in events]
+
+    def test_threshold_from_environment(self):
+        with patch.dict(os.environ, {"NEXUS_TIER_THRESHOLD": "0"}):
+            assert Interpreter().tier_threshold == 0
+        with patch.dict(os.environ, {"NEXUS_TIER_THRESHOLD": "25"}):
+            assert Interpreter().tier_threshold == 25
+
+    def test_errors_in_compiled_code_stay_friendly(self):
+        code = '''var d{} = {}
+for i in (0 to 5 by 1):
+    say(d[i])'''
+        with pytest.raises(SyntaxErrorWithContext) as interpreted:
+            run(code, tier_threshold=0)
+        with pytest.raises(SyntaxErrorWithContext) as compiled:
+            run(code, tier_threshold=1)
+        assert "Index error" in str(interpreted.value)
+        assert "Index error" in str(compiled.value)
+        assert interpreted.value.line_number == compiled.value.line_number == 3
+
+    def test_break_outside_loop_in_compiled_function(self):
+        code = '''func stop():
+    break
+for i in (0 to 5 by 1):
+    stop()'''
+        with pytest.raises(SyntaxErrorWithContext) as compiled:
+            run(code, tier_threshold=1)
+        assert "'break' used outside of a loop" in str(compiled.value)
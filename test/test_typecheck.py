@@ -0,0 +1,171 @@
+import pytest # type: ignore
+import sys
+import os
+from io import StringIO
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.nexus.interpreter import Interpreter
+from src.nexus.parser import Parser, SyntaxErrorWithContext
+from src.nexus.typecheck import check_types
+from src.nexus.lexer import lexer
+
+
+def proven_names(code):
+    result = check_types(Parser(lexer(code)).parse())
+    return sorted(decl.name for decl in result.proven)
+
+
+def error_messages(code):
+    result = check_types(Parser(lexer(code)).parse())
+    return [message for _, message in result.errors]
+
+
+class TestStaticTypeChecker:
+    """Test the static checker behind unchecked mode"""
+
+    def test_proves_arithmetic_and_loop_variables(self):
+        code = '''var total int = 0
+for i in (0 to 10 by 1):
+    total = total + i
+var average float = total / 10
+var label str = "average " + average'''
+        assert proven_names(code) == ["average", "label", "total"]
+        assert error_messages(code) == []
+
+    def test_unknown_values_stay_checked(self):
+        code = '''func f():
+    return 1
+var x int = f()
+var name str = ask("Name?")'''
+        assert proven_names(code) == []
+
+    def test_native_methods_write_items(self):
+        code = '''var xs[] int = []
+xs.append(1)
+func next_name():
+    return "ann"
+var names[] str = []
+names.append(next_name())
+var ages{} int = {}
+ages.set("ann", "old")'''
+        assert proven_names(code) == ["xs"]
+        assert error_messages(code) == ["'ages' holds int values but is given str"]
+
+    def test_reports_definite_errors(self):
+        code = '''var n int = 1
+n = "many"'''
+        assert error_messages(code) == ["'n' is declared int but assigned str"]
+
+    def test_typed_containers_and_fields(self):
+        code = '''struct Dog():
+    var name str
+    var age int
+var scores[] int = [1, 2]
+scores[0] = 5
+var pet = Dog()
+pet.name = "Rex"
+pet.age = "old"'''
+        assert proven_names(code) == ["name", "scores"]
+        assert error_messages(code) == ["Field 'age' is declared int but assigned str"]
+
+    def test_indexed_field_writes(self):
+        code = '''struct Bag():
+    var items[] int
+    var names[] str
+var bag = Bag()
+bag.items[0] = 5
+bag.names[0] = 5'''
+        assert proven_names(code) == ["items"]
+        assert error_messages(code) == ["Field 'names' holds str values but is given int"]
+
+    def test_native_methods_write_field_items(self):
+        code = '''struct Bag():
+    var items[] int
+    var names[] str
+    var tags{} str
+var bag = Bag()
+bag.items.append(1)
+bag.names.insert(0, 2)
+func tag():
+    return "x"
+bag.tags.set("k", tag())'''
+        assert proven_names(code) == ["items"]
+        assert error_messages(code) == ["Field 'names' holds str values but is given int"]
+
+    def test_method_field_sharing_a_global_name(self):
+        # The parser reads `self.label = v` as a bare write to `label`
+        code = '''var label int = 1
+class Tag():
+    var label str
+    func init(text):
+        self.label = text
+    func rename():
+        self.label = "renamed"
+var t = Tag("first")
+t.rename()
+say(label)
+say(t.label)'''
+        assert error_messages(code) == []
+        assert proven_names(code) == []
+        interpreter = Interpreter(unchecked=True)
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue().splitlines() == ["1", "renamed"]
+
+    def test_local_with_same_name_blocks_proof(self):
+        code = '''var count int = 0
+func bump(count):
+    return count + 1
+count = bump(count)'''
+        assert proven_names(code) == []
+
+
+class TestUncheckedMode:
+    """Test running with the guards the checker proved unnecessary removed"""
+
+    def test_proven_bindings_have_no_guards(self):
+        code = '''var total int = 0
+for i in (0 to 10 by 1):
+    total = total + i
+say(total)'''
+        interpreter = Interpreter(unchecked=True)
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue().strip() == "45"
+        assert interpreter.guarded is False
+        assert not interpreter.env.guards
+
+    def test_unproven_bindings_keep_runtime_checks(self):
+        code = '''func parse():
+    return "not a number"
+var n int = parse()'''
+        interpreter = Interpreter(unchecked=True)
+        with pytest.raises(SyntaxErrorWithContext) as exc_info:
+            interpreter.run(Parser(lexer(code)).parse())
+        assert "Expected int, got str" in str(exc_info.value)
+
+    def test_unproven_field_keeps_element_guard(self):
+        code = '''struct Bag():
+    var items[] int
+func next_item():
+    return "oops"
+var bag = Bag()
+bag.items.append(next_item())'''
+        interpreter = Interpreter(unchecked=True)
+        with pytest.raises(SyntaxErrorWithContext) as exc_info:
+            interpreter.run(Parser(lexer(code)).parse())
+        assert "Expected int in array, got str" in str(exc_info.value)
+
+    def test_type_errors_stop_the_program_before_it_runs(self):
+        code = '''say("started")
+var n int = 1
+n = "many"'''
+        interpreter = Interpreter(unchecked=True)
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            with pytest.raises(SyntaxErrorWithContext) as exc_info:
+                interpreter.run(Parser(lexer(code)).parse())
+            assert fake_out.getvalue() == ""
+        assert exc_info.value.line_number == 3
+        assert "Type error" in str(exc_info.value)